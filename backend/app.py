@@ -1,47 +1,66 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, current_app, has_app_context, request, jsonify, stream_with_context
+from flask.cli import with_appcontext
+import click
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
+from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 import os
+import sys
 import uuid
 from datetime import datetime, timedelta, date, timezone
 import secrets
 import string
-import pytz
-import google.generativeai as genai
 from werkzeug.utils import secure_filename
+from sqlalchemy import and_, or_, case, text, table, column
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload, object_session, selectinload
 import json
-from dotenv import load_dotenv
+from werkzeug.wsgi import ClosingIterator
 import base64
-from PIL import Image
 import io
+import threading
+import atexit
+import fcntl
+import mmap
+import hashlib
+import re
+import shutil
+import struct
+import zipfile
+import zlib
+import html
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left
+from itertools import repeat
+from collections import Counter, OrderedDict, deque, namedtuple
+import time
+import queue
+import contextvars
+from functools import lru_cache, wraps
+import urllib.request
+from contextlib import contextmanager
+from serializers import (
+    orjson, OrjsonProvider, timestamp_to_iso, optional_isoformat, entry_to_dict, public_entry_to_dict,
+    date_range_entry_to_dict, content_to_dict, trip_to_dict, blog_to_dict, traveler_to_dict
+)
+from trip_stats import EARTH_RADIUS_KM, haversine_km, summarize_track
 
-# Load environment variables
-load_dotenv()
-
-app = Flask(__name__, static_folder=None)
-CORS(app, 
-     origins=['*'],
-     methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
-     allow_headers=['Content-Type', 'Authorization', 'X-Auth-Token'],
-     supports_credentials=True)
-
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///roadweave.db')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string')
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=30)
-app.config['JWT_TOKEN_LOCATION'] = ['headers', 'query_string']
-app.config['JWT_HEADER_NAME'] = 'X-Auth-Token'
-app.config['JWT_HEADER_TYPE'] = 'Bearer'
-app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
-app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))  # 32MB max file size
-
-# Create uploads directory
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-
-db = SQLAlchemy(app)
-jwt = JWTManager(app)
+# Settings are read from the environment at import time, so .env is loaded by the entry points
+# before this module is imported: wsgi.py, the flask command (by itself) and here when run directly.
+# Run directly, it is also registered as `app` so the route modules import it instead of a second copy.
+if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv()
+    sys.modules['app'] = sys.modules[__name__]
+
+# Same location Flask picks for this module; also used before an app exists
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+# Extensions, bound to the application by create_app()
+db = SQLAlchemy()
+jwt = JWTManager()
 
 # Configure JWT to also accept tokens from X-Auth-Token header
 @jwt.token_in_blocklist_loader
@@ -62,21 +81,18 @@ def get_jwt_from_custom_header():
     return None
 
 # Error handlers
-@app.errorhandler(413)
 def request_entity_too_large(error):
-    max_size_mb = app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
+    max_size_mb = current_app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
     return jsonify({
         'error': f'File too large. Maximum file size is {max_size_mb:.0f}MB.',
-        'max_size_bytes': app.config['MAX_CONTENT_LENGTH'],
+        'max_size_bytes': current_app.config['MAX_CONTENT_LENGTH'],
         'max_size_mb': max_size_mb
     }), 413
 
-@app.errorhandler(400)
 def bad_request(error):
     return jsonify({'error': 'Bad request. Please check your input.'}), 400
 
 # CORS preflight handler
-@app.before_request
 def handle_preflight():
     if request.method == "OPTIONS":
         response = jsonify({})
@@ -100,7 +116,273 @@ def unauthorized_callback(error):
 
 # Configure Gemini AI
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'your-gemini-api-key-here')
-genai.configure(api_key=GEMINI_API_KEY)
+_genai = None
+_genai_lock = threading.Lock()
+
+def get_genai():
+    """The google.generativeai module, imported and configured on first AI use
+    
+    Importing the SDK takes about a quarter of a second, which every test run,
+    CLI command and worker start would otherwise pay.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                _genai = genai
+    return _genai
+
+# Tracing: timed spans around the stages of the entry ingest pipeline. The API mirrors the part of
+# OpenTelemetry's Tracer/Span API used here, and finished traces are kept in a ring buffer for
+# /api/admin/traces, optionally appended to a JSON-lines file and sent to an OTLP/HTTP collector
+TRACE_BUFFER_SIZE = int(os.getenv('TRACE_BUFFER_SIZE', 200))
+OTLP_EXPORT_INTERVAL = 2.0  # Seconds between batches sent to the collector
+OTLP_QUEUE_SIZE = 2048  # Spans waiting for the collector; more are dropped
+
+class StatusCode:
+    """Span status codes, same values as opentelemetry.trace.StatusCode"""
+    UNSET = 0
+    OK = 1
+    ERROR = 2
+
+SpanContext = namedtuple('SpanContext', ['trace_id', 'span_id'])
+
+class Span:
+    """One timed stage of a trace (start/end in nanoseconds since the epoch, like OpenTelemetry)"""
+    
+    def __init__(self, name, trace_id, parent_id, attributes=None):
+        self.name = name
+        self.context = SpanContext(trace_id, secrets.randbits(64) or 1)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = StatusCode.UNSET
+        self.status_description = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+    
+    def get_span_context(self):
+        return self.context
+    
+    def is_recording(self):
+        return self.end_time is None
+    
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+    
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+    
+    def add_event(self, name, attributes=None):
+        self.events.append({'name': name, 'time': time.time_ns(), 'attributes': dict(attributes or {})})
+    
+    def record_exception(self, exception):
+        self.add_event('exception', {'exception.type': type(exception).__name__, 'exception.message': str(exception)})
+    
+    def set_status(self, status, description=None):
+        self.status = status
+        self.status_description = description
+    
+    def end(self, end_time=None):
+        if self.end_time is None:
+            self.end_time = end_time or time.time_ns()
+    
+    @property
+    def duration_ms(self):
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e6
+
+current_span = contextvars.ContextVar('current_span', default=None)
+
+class Tracer:
+    """Creates spans; each root span collects its descendants and is handed to the exporters when it ends"""
+    
+    def __init__(self, buffer_size=TRACE_BUFFER_SIZE):
+        self.traces = deque(maxlen=buffer_size)
+        self.exporters = []
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None, record_exception=True, set_status_on_exception=True):
+        parent = current_span.get()
+        span = Span(name, parent.context.trace_id if parent else secrets.randbits(128) or 1,
+                    parent.context.span_id if parent else None, attributes)
+        span.trace = parent.trace if parent else []
+        span.trace.append(span)
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if record_exception:
+                span.record_exception(e)
+            if set_status_on_exception:
+                span.set_status(StatusCode.ERROR, f'{type(e).__name__}: {e}')
+            raise
+        finally:
+            current_span.reset(token)
+            span.end()
+            if parent is None:
+                self._export(span.trace)
+    
+    def _export(self, spans):
+        with self._lock:
+            self.traces.append(spans)
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                print(f"⚠️  Trace export failed ({type(exporter).__name__}): {e}")
+    
+    def recent_traces(self):
+        with self._lock:
+            return list(self.traces)
+
+tracer = Tracer()
+
+def get_current_span():
+    return current_span.get()
+
+def traced(name):
+    """Decorator running the function inside a span named `name`"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def trace_to_dict(spans):
+    """A finished trace with the stage breakdown shown by /api/admin/traces and the JSON-lines exporter"""
+    root = spans[0]
+    depths = {root.context.span_id: 0}
+    stages = []
+    for span in spans:
+        depth = depths[span.context.span_id] = depths.get(span.parent_id, -1) + 1
+        stages.append({
+            'name': span.name,
+            'span_id': f'{span.context.span_id:016x}',
+            'parent_span_id': f'{span.parent_id:016x}' if span.parent_id else None,
+            'depth': depth,
+            'offset_ms': round((span.start_time - root.start_time) / 1e6, 3),
+            'duration_ms': round(span.duration_ms, 3),
+            'status': 'error' if span.status == StatusCode.ERROR else 'ok',
+            'attributes': span.attributes,
+            **({'error': span.status_description} if span.status == StatusCode.ERROR else {}),
+        })
+    return {
+        'trace_id': f'{root.context.trace_id:032x}',
+        'name': root.name,
+        'start_time': timestamp_to_iso(datetime.utcfromtimestamp(root.start_time / 1e9)),
+        'duration_ms': round(root.duration_ms, 3),
+        'status': 'error' if any(span.status == StatusCode.ERROR for span in spans) else 'ok',
+        'stages': stages,
+    }
+
+class JsonLinesTraceExporter:
+    """Appends every finished trace as one JSON line to a file"""
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def export(self, spans):
+        line = json.dumps(trace_to_dict(spans), default=str) + '\n'
+        with self._lock, open(self.path, 'a', encoding='utf-8') as trace_file:
+            trace_file.write(line)
+
+def otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+def otlp_attributes(attributes):
+    return [{'key': key, 'value': otlp_value(value)} for key, value in attributes.items()]
+
+class OtlpTraceExporter:
+    """Sends spans to an OpenTelemetry collector (OTLP/HTTP with JSON encoding) from a background thread
+    
+    Spans are queued and posted in batches every OTLP_EXPORT_INTERVAL seconds,
+    so a slow or unreachable collector never delays a request; when the queue
+    is full new spans are dropped.
+    """
+    
+    def __init__(self, endpoint, service_name='roadweave', headers=None):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self._queue = queue.Queue(OTLP_QUEUE_SIZE)
+        self._pid = None
+    
+    def export(self, spans):
+        if self._pid != os.getpid():
+            # Threads do not survive fork(): each worker process sends its own spans
+            self._pid = os.getpid()
+            self._queue = queue.Queue(OTLP_QUEUE_SIZE)
+            threading.Thread(target=self._run, name='otlp-export', daemon=True).start()
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                break
+    
+    def encode(self, spans):
+        return {'resourceSpans': [{
+            'resource': {'attributes': otlp_attributes({'service.name': self.service_name})},
+            'scopeSpans': [{
+                'scope': {'name': 'roadweave'},
+                'spans': [{
+                    'traceId': f'{span.context.trace_id:032x}',
+                    'spanId': f'{span.context.span_id:016x}',
+                    **({'parentSpanId': f'{span.parent_id:016x}'} if span.parent_id else {}),
+                    'name': span.name,
+                    'kind': 1,  # SPAN_KIND_INTERNAL
+                    'startTimeUnixNano': str(span.start_time),
+                    'endTimeUnixNano': str(span.end_time),
+                    'attributes': otlp_attributes(span.attributes),
+                    'events': [{'name': event['name'], 'timeUnixNano': str(event['time']),
+                                'attributes': otlp_attributes(event['attributes'])} for event in span.events],
+                    'status': {'code': span.status, **({'message': span.status_description} if span.status_description else {})},
+                } for span in spans],
+            }],
+        }]}
+    
+    def flush(self):
+        """Send everything queued, returning the number of spans sent"""
+        spans = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if spans:
+            body = json.dumps(self.encode(spans)).encode('utf-8')
+            request_ = urllib.request.Request(self.endpoint, data=body, headers=self.headers, method='POST')
+            with urllib.request.urlopen(request_, timeout=10) as response:
+                response.read()
+        return len(spans)
+    
+    def _run(self):
+        while True:
+            time.sleep(OTLP_EXPORT_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  Sending spans to {self.endpoint} failed: {e}")
+
+def configure_tracing(app):
+    """Exporters for the finished traces, from the app configuration"""
+    exporters = []
+    if app.config.get('TRACE_EXPORT_FILE'):
+        exporters.append(JsonLinesTraceExporter(app.config['TRACE_EXPORT_FILE']))
+    if app.config.get('OTLP_TRACES_ENDPOINT'):
+        exporters.append(OtlpTraceExporter(app.config['OTLP_TRACES_ENDPOINT'], os.getenv('OTEL_SERVICE_NAME', 'roadweave')))
+    tracer.exporters = exporters
 
 # Models
 class Trip(db.Model):
@@ -114,6 +396,10 @@ class Trip(db.Model):
     public_enabled = db.Column(db.Boolean, default=False)  # Whether public access is enabled
     public_token = db.Column(db.String(100), unique=True)  # Token for public access
     reactions_enabled = db.Column(db.Boolean, default=True)  # Whether reactions are enabled in public view
+    content_version = db.Column(db.Integer, default=0, nullable=False)  # Bumped on every change to the trip, its entries or content
+    deleted_at = db.Column(db.DateTime)  # Set when the trip is deleted; its rows and files are removed in the background
+    storage_bytes = db.Column(db.Integer, default=0, nullable=False)  # Total file_size of the trip's entries (kept up to date on flush)
+    sync_horizon = db.Column(db.Integer, default=0, nullable=False)  # Newest content_version whose tombstones were pruned (delta sync)
     
     travelers = db.relationship('Traveler', backref='trip', lazy=True, cascade='all, delete-orphan')
     entries = db.relationship('Entry', backref='trip', lazy=True, cascade='all, delete-orphan')
@@ -138,6 +424,16 @@ class Entry(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     filename = db.Column(db.String(255))  # For uploaded files
     disabled = db.Column(db.Boolean, default=False, nullable=False)  # Whether entry is disabled from AI processing
+    entry_date = db.Column(db.Date)  # Local calendar day of timestamp (set automatically, indexed for date queries)
+    place_name = db.Column(db.String(200))  # Nearest known place to the coordinates (set automatically, offline geocoder)
+    sync_version = db.Column(db.Integer, default=0, nullable=False)  # trip.content_version of the last change (delta sync)
+    file_size = db.Column(db.Integer)  # Bytes of the uploaded file (set automatically on insert)
+    
+    __table_args__ = (
+        db.Index('ix_entry_trip_date', 'trip_id', 'entry_date'),
+        db.Index('ix_entry_trip_timestamp', 'trip_id', 'timestamp'),
+        db.Index('ix_entry_trip_sync_version', 'trip_id', 'sync_version'),
+    )
 
 class TripContent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -147,10 +443,31 @@ class TripContent(db.Model):
     latitude = db.Column(db.Float)
     longitude = db.Column(db.Float)
     original_text = db.Column(db.Text)  # Original user input that prompted this generation
-    entry_ids = db.Column(db.Text)  # JSON array of related entry IDs
+    entry_ids = db.Column(db.Text)  # Legacy JSON array of related entry IDs (superseded by ContentEntry)
     content_date = db.Column(db.Date, nullable=False)  # Date for calendar grouping (extracted from timestamp)
+    sync_version = db.Column(db.Integer, default=0, nullable=False)  # trip.content_version of the last change (delta sync)
     
     trip = db.relationship('Trip', backref=db.backref('content_pieces', lazy=True, cascade='all, delete-orphan'))
+    entry_links = db.relationship('ContentEntry', backref='content_piece', lazy=True, cascade='all, delete-orphan',
+                                  order_by='ContentEntry.entry_id')
+    
+    __table_args__ = (
+        db.Index('ix_trip_content_trip_date', 'trip_id', 'content_date'),
+        db.Index('ix_trip_content_trip_timestamp', 'trip_id', 'timestamp'),
+        db.Index('ix_trip_content_trip_sync_version', 'trip_id', 'sync_version'),
+    )
+    
+    @property
+    def entry_id_list(self):
+        """IDs of the entries this content piece was generated from"""
+        return [link.entry_id for link in self.entry_links]
+
+class ContentEntry(db.Model):
+    """Association between a content piece and the entries it was generated from"""
+    content_piece_id = db.Column(db.Integer, db.ForeignKey('trip_content.id'), primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('entry.id'), primary_key=True, index=True)
+    
+    entry = db.relationship('Entry', backref=db.backref('content_links', lazy=True, cascade='all, delete-orphan'))
 
 class PostReaction(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -164,21 +481,519 @@ class PostReaction(db.Model):
     trip = db.relationship('Trip', backref=db.backref('reactions', lazy=True, cascade='all, delete-orphan'))
     content_piece = db.relationship('TripContent', backref=db.backref('reactions', lazy=True, cascade='all, delete-orphan'))
     
-    __table_args__ = (db.UniqueConstraint('content_piece_id', 'reaction_type', name='unique_content_reaction'),)
+    __table_args__ = (
+        db.UniqueConstraint('content_piece_id', 'reaction_type', name='unique_content_reaction'),
+        db.Index('ix_post_reaction_trip', 'trip_id'),
+    )
+
+class TripEvent(db.Model):
+    """Bounded per-trip log of content and reaction changes, replayed by the live feed"""
+    id = db.Column(db.Integer, primary_key=True)
+    trip_id = db.Column(db.Integer, db.ForeignKey('trip.id'), nullable=False)
+    event_type = db.Column(db.String(30), nullable=False)  # 'content.created', 'content.updated', 'content.deleted', 'reactions', 'closed'
+    data = db.Column(db.Text, nullable=False)  # JSON payload
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    trip = db.relationship('Trip', backref=db.backref('events', lazy=True, cascade='all, delete-orphan'))
+    
+    __table_args__ = (
+        db.Index('ix_trip_event_trip_id', 'trip_id', 'id'),
+    )
+
+class SyncTombstone(db.Model):
+    """Deleted entry or content piece, reported by the delta sync endpoints"""
+    id = db.Column(db.Integer, primary_key=True)
+    trip_id = db.Column(db.Integer, db.ForeignKey('trip.id'), nullable=False)
+    row_type = db.Column(db.String(20), nullable=False)  # 'entry' or 'content'
+    row_id = db.Column(db.Integer, nullable=False)
+    sync_version = db.Column(db.Integer, nullable=False)  # trip.content_version of the deletion
+    
+    trip = db.relationship('Trip', backref=db.backref('sync_tombstones', lazy=True, cascade='all, delete-orphan'))
+    
+    __table_args__ = (
+        db.Index('ix_sync_tombstone_trip_sync_version', 'trip_id', 'sync_version'),
+    )
+
+class DataMigration(db.Model):
+    """Progress of the data backfills run at startup ('done', or e.g. the last row processed)"""
+    name = db.Column(db.String(50), primary_key=True)
+    state = db.Column(db.String(100), nullable=False)
+
+@db.event.listens_for(Entry, 'before_insert')
+@db.event.listens_for(Entry, 'before_update')
+def set_entry_date(mapper, connection, entry):
+    """Keep the indexed entry_date column in sync with the entry timestamp"""
+    if entry.timestamp is None:
+        entry.timestamp = datetime.utcnow()
+    entry.entry_date = local_date(entry.timestamp)
+
+@db.event.listens_for(Entry, 'before_insert')
+@db.event.listens_for(Entry, 'before_update')
+def set_place_name(mapper, connection, entry):
+    """Cache the nearest place name whenever the entry coordinates are set or changed"""
+    state = db.inspect(entry)
+    if state.persistent and not (state.attrs.latitude.history.has_changes() or
+                                 state.attrs.longitude.history.has_changes()):
+        return
+    entry.place_name = reverse_geocode(entry.latitude, entry.longitude)
+
+@db.event.listens_for(Entry, 'before_insert')
+def set_file_size(mapper, connection, entry):
+    """Record the size of the uploaded file for the per-trip storage totals"""
+    if entry.filename and entry.file_size is None and has_app_context():
+        try:
+            entry.file_size = os.path.getsize(os.path.join(current_app.config['UPLOAD_FOLDER'], entry.filename))
+        except OSError:
+            entry.file_size = 0
+
+# Storage accounting: trip.storage_bytes follows the file sizes of inserted, changed and deleted
+# entries in the same flush (collect-uploads recomputes it from scratch)
+def add_storage_delta(entry, delta):
+    if delta:
+        deltas = object_session(entry).info.setdefault('storage_deltas', {})
+        deltas[entry.trip_id] = deltas.get(entry.trip_id, 0) + delta
+
+@db.event.listens_for(Entry, 'after_insert')
+@db.event.listens_for(Entry, 'after_update')
+def mark_storage_changed(mapper, connection, entry):
+    history = db.inspect(entry).attrs.file_size.history
+    add_storage_delta(entry, sum(size or 0 for size in history.added) - sum(size or 0 for size in history.deleted))
+
+@db.event.listens_for(Entry, 'after_delete')
+def mark_storage_released(mapper, connection, entry):
+    add_storage_delta(entry, -(entry.file_size or 0))
+
+@db.event.listens_for(Session, 'after_flush')
+def apply_storage_deltas(session, flush_context):
+    trips = Trip.__table__
+    for trip_id, delta in session.info.pop('storage_deltas', {}).items():
+        session.execute(trips.update().where(trips.c.id == trip_id).values(
+            storage_bytes=trips.c.storage_bytes + delta
+        ))
+
+# Per-trip caches of data derived from entry coordinates (marker clusters, ...)
+class TripCache:
+    """Thread-safe LRU cache of per-trip derived values
+    
+    Values are stored per (trip, key) and dropped for the whole trip by
+    invalidate(), which runs after every commit that touched one of its entries.
+    A value computed while the trip was invalidated is returned but not stored.
+    Callers pass the trip's content_version so that changes committed by other
+    worker processes, which never reach this process's invalidate(), also
+    replace the cached values.
+    """
+    
+    def __init__(self, max_trips=64):
+        self.max_trips = max_trips
+        self._trips = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, trip_id, key, compute, version=None):
+        with self._lock:
+            cached = self._trips.get(trip_id)
+            if cached is not None and cached[0] == version and key in cached[1]:
+                self._trips.move_to_end(trip_id)
+                return cached[1][key]
+            generation = self._generations.get(trip_id, 0)
+        
+        value = compute()
+        
+        with self._lock:
+            if self._generations.get(trip_id, 0) == generation:
+                cached = self._trips.get(trip_id)
+                if cached is None or cached[0] != version:
+                    cached = self._trips[trip_id] = (version, {})
+                cached[1][key] = value
+                self._trips.move_to_end(trip_id)
+                while len(self._trips) > self.max_trips:
+                    self._trips.popitem(last=False)
+        return value
+    
+    def invalidate(self, trip_id):
+        with self._lock:
+            self._trips.pop(trip_id, None)
+            self._generations[trip_id] = self._generations.get(trip_id, 0) + 1
+    
+    def clear(self):
+        with self._lock:
+            for trip_id in self._trips:
+                self._generations[trip_id] = self._generations.get(trip_id, 0) + 1
+            self._trips.clear()
+
+trip_cache = TripCache(int(os.getenv('TRIP_CACHE_SIZE', 64)))
+
+@db.event.listens_for(Entry, 'after_insert')
+@db.event.listens_for(Entry, 'after_update')
+@db.event.listens_for(Entry, 'after_delete')
+def mark_trip_changed(mapper, connection, entry):
+    """Remember trips whose entries changed so their cached data is dropped on commit"""
+    object_session(entry).info.setdefault('changed_trips', set()).add(entry.trip_id)
+
+@db.event.listens_for(Session, 'after_commit')
+def invalidate_changed_trips(session):
+    for trip_id in session.info.pop('changed_trips', ()):
+        trip_cache.invalidate(trip_id)
+
+@db.event.listens_for(Session, 'after_rollback')
+def discard_changed_trips(session):
+    session.info.pop('changed_trips', None)
+    session.info.pop('changed_rows', None)
+    session.info.pop('deleted_rows', None)
+    session.info.pop('relinked_content', None)
+    session.info.pop('renamed_travelers', None)
+    session.info.pop('storage_deltas', None)
+
+# Per-trip content versions: every flush touching a trip, its travelers, entries or content bumps
+# trip.content_version in the same transaction, so cached public responses can be keyed by it
+@db.event.listens_for(Trip, 'after_insert')
+@db.event.listens_for(Trip, 'after_update')
+@db.event.listens_for(Traveler, 'after_insert')
+@db.event.listens_for(Traveler, 'after_update')
+@db.event.listens_for(Traveler, 'after_delete')
+@db.event.listens_for(Entry, 'after_insert')
+@db.event.listens_for(Entry, 'after_update')
+@db.event.listens_for(Entry, 'after_delete')
+@db.event.listens_for(TripContent, 'after_insert')
+@db.event.listens_for(TripContent, 'after_update')
+@db.event.listens_for(TripContent, 'after_delete')
+def mark_trip_modified(mapper, connection, target):
+    trip_id = target.id if isinstance(target, Trip) else target.trip_id
+    object_session(target).info.setdefault('modified_trips', set()).add(trip_id)
+
+# Delta sync: changed entries and content pieces are stamped with the bumped version,
+# deleted ones leave a tombstone carrying it; a content piece whose entry links change counts as changed
+SYNC_ROW_TYPES = {Entry: 'entry', TripContent: 'content'}
+SYNC_TOMBSTONE_RETENTION = int(os.getenv('SYNC_TOMBSTONE_RETENTION', 1000))
+
+@db.event.listens_for(Entry, 'after_insert')
+@db.event.listens_for(Entry, 'after_update')
+@db.event.listens_for(TripContent, 'after_insert')
+@db.event.listens_for(TripContent, 'after_update')
+def mark_row_changed(mapper, connection, target):
+    object_session(target).info.setdefault('changed_rows', {}).setdefault(type(target), set()).add(target.id)
+
+@db.event.listens_for(Entry, 'after_delete')
+@db.event.listens_for(TripContent, 'after_delete')
+def mark_row_deleted(mapper, connection, target):
+    object_session(target).info.setdefault('deleted_rows', []).append(
+        (target.trip_id, SYNC_ROW_TYPES[type(target)], target.id)
+    )
+
+@db.event.listens_for(ContentEntry, 'after_insert')
+@db.event.listens_for(ContentEntry, 'after_delete')
+def mark_content_links_changed(mapper, connection, target):
+    object_session(target).info.setdefault('relinked_content', set()).add(target.content_piece_id)
+
+@db.event.listens_for(Traveler, 'after_update')
+def mark_traveler_renamed(mapper, connection, target):
+    """A renamed traveler changes traveler_name of all their entries"""
+    if db.inspect(target).attrs.name.history.has_changes():
+        object_session(target).info.setdefault('renamed_travelers', set()).add(target.id)
+
+@db.event.listens_for(Session, 'after_flush')
+def bump_modified_trip_versions(session, flush_context):
+    trip_ids = session.info.pop('modified_trips', set())
+    changed_rows = session.info.pop('changed_rows', {})
+    
+    # Content pieces inserted or updated in this flush are stamped anyway
+    relinked = session.info.pop('relinked_content', set()) - changed_rows.get(TripContent, set())
+    if relinked:
+        content = TripContent.__table__.c
+        relinked_rows = session.execute(
+            db.select(content.id, content.trip_id).where(content.id.in_(relinked))
+        ).all()
+        changed_rows.setdefault(TripContent, set()).update(content_id for content_id, _ in relinked_rows)
+        trip_ids = trip_ids | {trip_id for _, trip_id in relinked_rows}
+    
+    if trip_ids:
+        bump_trip_versions(trip_ids, session)
+    
+    trip_versions = Trip.__table__.c
+    renamed_travelers = session.info.pop('renamed_travelers', None)
+    if renamed_travelers:
+        changed_rows.setdefault(Entry, set())
+    for model, row_ids in changed_rows.items():
+        table = model.__table__
+        condition = table.c.id.in_(row_ids)
+        if model is Entry and renamed_travelers:
+            condition = condition | table.c.traveler_id.in_(renamed_travelers)
+        session.execute(table.update().where(condition).values(
+            sync_version=db.select(trip_versions.content_version).where(
+                trip_versions.id == table.c.trip_id
+            ).scalar_subquery()
+        ))
+    
+    deleted_trips = {target.id for target in session.deleted if isinstance(target, Trip)}
+    tombstones = [row for row in session.info.pop('deleted_rows', []) if row[0] not in deleted_trips]
+    if tombstones:
+        versions = dict(session.execute(db.select(trip_versions.id, trip_versions.content_version).where(
+            trip_versions.id.in_({trip_id for trip_id, _, _ in tombstones})
+        )).all())
+        session.execute(SyncTombstone.__table__.insert(), [
+            {'trip_id': trip_id, 'row_type': row_type, 'row_id': row_id, 'sync_version': versions[trip_id]}
+            for trip_id, row_type, row_id in tombstones
+        ])
+        prune_sync_tombstones(session, versions)
+
+def prune_sync_tombstones(session, trip_ids):
+    """Keep the newest SYNC_TOMBSTONE_RETENTION tombstones per trip
+    
+    The trip's sync_horizon is moved up to the version of the newest dropped
+    tombstone; a cursor older than that gets a full resync from the changes
+    endpoints, since deletions it has not seen may be gone.
+    """
+    tombstones = SyncTombstone.__table__.c
+    for trip_id in trip_ids:
+        newest_dropped = session.execute(text("""
+            SELECT id, sync_version FROM sync_tombstone WHERE trip_id = :trip_id ORDER BY id DESC LIMIT 1 OFFSET :keep
+        """), {'trip_id': trip_id, 'keep': SYNC_TOMBSTONE_RETENTION}).first()
+        if newest_dropped is None:
+            continue
+        session.execute(SyncTombstone.__table__.delete().where(
+            tombstones.trip_id == trip_id, tombstones.id <= newest_dropped.id
+        ))
+        session.execute(Trip.__table__.update().where(Trip.__table__.c.id == trip_id).values(
+            sync_horizon=newest_dropped.sync_version
+        ))
+
+def bump_trip_versions(trip_ids, session=None):
+    """Increment content_version of the given trips (needed after bulk statements that skip ORM events)"""
+    (session or db.session).execute(
+        Trip.__table__.update().where(Trip.__table__.c.id.in_(trip_ids)).values(
+            content_version=Trip.__table__.c.content_version + 1
+        )
+    )
+
+def trip_content_version(trip_id):
+    return db.session.query(Trip.content_version).filter(Trip.id == trip_id).scalar()
+
+# Live feed event log: content piece changes are recorded in the flush that makes them,
+# reaction count changes in batches by the reaction aggregator or the live feed thread
+TRIP_EVENT_LOG_SIZE = int(os.getenv('LIVE_FEED_LOG_SIZE', 500))
+
+def record_trip_events(session, events):
+    """Append (trip_id, event_type, payload) events to the trip event log and trim it per trip"""
+    if not events:
+        return
+    now = datetime.utcnow()
+    session.execute(TripEvent.__table__.insert(), [
+        {'trip_id': trip_id, 'event_type': event_type, 'data': current_app.json.dumps(payload), 'created_at': now}
+        for trip_id, event_type, payload in events
+    ])
+    for trip_id in {event[0] for event in events}:
+        session.execute(text("""
+            DELETE FROM trip_event WHERE trip_id = :trip_id AND id < (
+                SELECT id FROM trip_event WHERE trip_id = :trip_id ORDER BY id DESC LIMIT 1 OFFSET :keep
+            )
+        """), {'trip_id': trip_id, 'keep': TRIP_EVENT_LOG_SIZE - 1})
+    session.info['trip_events_recorded'] = True
+
+def record_reaction_events(session, trip_id, content_ids):
+    """Record the current reaction counts of content pieces (call before committing the change)"""
+    record_trip_events(session, [
+        (trip_id, 'reactions', {'content_id': content_id, 'reactions': counts})
+        for content_id, counts in get_trip_reaction_counts(trip_id, content_ids).items()
+    ])
+
+def close_live_feeds(session, trip_id):
+    """End the trip's live feed streams in every worker process (call before committing the change)"""
+    record_trip_events(session, [(trip_id, 'closed', {})])
+
+@db.event.listens_for(Session, 'after_flush')
+def record_content_events(session, flush_context):
+    deleted_trips = {target.id for target in session.deleted if isinstance(target, Trip)}
+    events = []
+    for content in session.new:
+        if isinstance(content, TripContent):
+            events.append((content.trip_id, 'content.created', content_to_dict(content)))
+    for content in session.dirty:
+        if isinstance(content, TripContent) and session.is_modified(content):
+            events.append((content.trip_id, 'content.updated', content_to_dict(content)))
+    for content in session.deleted:
+        if isinstance(content, TripContent) and content.trip_id not in deleted_trips:
+            events.append((content.trip_id, 'content.deleted', {'id': content.id}))
+    record_trip_events(session, events)
+
+@db.event.listens_for(Session, 'after_commit')
+def wake_live_feed(session):
+    if session.info.pop('trip_events_recorded', False) and has_app_context():
+        live_feed = current_app.extensions.get('live_feed')
+        if live_feed:
+            live_feed.notify()
+
+@db.event.listens_for(Session, 'after_rollback')
+def discard_trip_events(session):
+    session.info.pop('trip_events_recorded', None)
+
+# Full-text search: FTS5 indexes over content pieces and entries, kept in sync by triggers
+SEARCH_INDEXES = {
+    'trip_content_fts': ('trip_content', 'generated_content'),
+    'entry_fts': ('entry', 'content'),
+}
+
+def search_index_ddl(fts_table, source_table, text_column):
+    """Statements creating an external-content FTS5 table and its sync triggers"""
+    columns = f"{text_column}, trip_id"
+    new_values = f"new.{text_column}, new.trip_id"
+    old_values = f"old.{text_column}, old.trip_id"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{columns}, content='{source_table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source_table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {text_column}, trip_id ON {source_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts_table}(rowid, {columns}) VALUES (new.id, {new_values}); END",
+    ]
+
+def create_search_index(connection, fts_table, rebuild=False):
+    """Create one search index (if missing), optionally re-indexing all existing rows"""
+    if connection.dialect.name != 'sqlite':
+        return
+    try:
+        for statement in search_index_ddl(fts_table, *SEARCH_INDEXES[fts_table]):
+            connection.exec_driver_sql(statement)
+        if rebuild:
+            connection.exec_driver_sql(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+    except Exception as e:
+        print(f"⚠️  Full-text search unavailable ({fts_table}): {e}")
+
+def drop_virtual_table(connection, name):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {name}")
+
+@db.event.listens_for(TripContent.__table__, 'after_create')
+def create_trip_content_search_index(target, connection, **kw):
+    create_search_index(connection, 'trip_content_fts')
+
+@db.event.listens_for(Entry.__table__, 'after_create')
+def create_entry_search_index(target, connection, **kw):
+    create_search_index(connection, 'entry_fts')
+
+@db.event.listens_for(TripContent.__table__, 'before_drop')
+def drop_trip_content_search_index(target, connection, **kw):
+    drop_virtual_table(connection, 'trip_content_fts')
+
+@db.event.listens_for(Entry.__table__, 'before_drop')
+def drop_entry_search_index(target, connection, **kw):
+    drop_virtual_table(connection, 'entry_fts')
+
+def rebuild_search_indexes():
+    """Create missing search indexes and re-index all existing content and entries"""
+    with db.engine.begin() as connection:
+        for fts_table in SEARCH_INDEXES:
+            create_search_index(connection, fts_table, rebuild=True)
+
+# Spatial index: R*Tree over entry and content piece coordinates, kept in sync by triggers
+SPATIAL_INDEXES = {
+    'entry_rtree': 'entry',
+    'trip_content_rtree': 'trip_content',
+}
+
+def spatial_index_ddl(rtree_table, source_table):
+    """Statements creating an R*Tree table (points stored as zero-size boxes) and its sync triggers"""
+    insert_new = (f"INSERT INTO {rtree_table} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude, "
+                  f"new.trip_id WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;")
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree_table} USING rtree(id, min_lat, max_lat, min_lng, max_lng, +trip_id)",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree_table}_ai AFTER INSERT ON {source_table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree_table}_ad AFTER DELETE ON {source_table} BEGIN "
+        f"DELETE FROM {rtree_table} WHERE id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree_table}_au AFTER UPDATE OF latitude, longitude, trip_id ON {source_table} BEGIN "
+        f"DELETE FROM {rtree_table} WHERE id = old.id; {insert_new} END",
+    ]
+
+def create_spatial_index(connection, rtree_table, rebuild=False):
+    """Create one spatial index (if missing), optionally reloading all existing coordinates"""
+    if connection.dialect.name != 'sqlite':
+        return
+    source_table = SPATIAL_INDEXES[rtree_table]
+    try:
+        for statement in spatial_index_ddl(rtree_table, source_table):
+            connection.exec_driver_sql(statement)
+        if rebuild:
+            connection.exec_driver_sql(f"DELETE FROM {rtree_table}")
+            connection.exec_driver_sql(
+                f"INSERT INTO {rtree_table} SELECT id, latitude, latitude, longitude, longitude, trip_id "
+                f"FROM {source_table} WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            )
+    except Exception as e:
+        print(f"⚠️  Spatial index unavailable ({rtree_table}): {e}")
+
+@db.event.listens_for(TripContent.__table__, 'after_create')
+def create_trip_content_spatial_index(target, connection, **kw):
+    create_spatial_index(connection, 'trip_content_rtree')
+
+@db.event.listens_for(Entry.__table__, 'after_create')
+def create_entry_spatial_index(target, connection, **kw):
+    create_spatial_index(connection, 'entry_rtree')
+
+@db.event.listens_for(TripContent.__table__, 'before_drop')
+def drop_trip_content_spatial_index(target, connection, **kw):
+    drop_virtual_table(connection, 'trip_content_rtree')
+
+@db.event.listens_for(Entry.__table__, 'before_drop')
+def drop_entry_spatial_index(target, connection, **kw):
+    drop_virtual_table(connection, 'entry_rtree')
+
+# Lightweight table handles for querying the R*Tree tables (not part of the ORM metadata)
+entry_rtree = table('entry_rtree', column('id'), column('min_lat'), column('max_lat'),
+                    column('min_lng'), column('max_lng'), column('trip_id'))
+trip_content_rtree = table('trip_content_rtree', column('id'), column('min_lat'), column('max_lat'),
+                           column('min_lng'), column('max_lng'), column('trip_id'))
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Backfill the full-text search index from existing content and entries"""
+    rebuild_search_indexes()
+    print("✅ Search index rebuilt")
 
 def generate_random_password(length=12):
     """Generate a secure random password"""
     characters = string.ascii_letters + string.digits + "!@#$%^&*"
     return ''.join(secrets.choice(characters) for _ in range(length))
 
-def setup_admin_credentials():
+def load_generated_password(path):
+    """Read the generated admin password from path, creating it on first use
+    
+    The file is created exclusively so that every worker process of a
+    multi-process server ends up with the same password. Returns the password
+    and whether this call created it.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    password = generate_random_password()
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another process may still be writing it
+        for _ in range(50):
+            with open(path) as f:
+                existing = f.read().strip()
+            if existing:
+                return existing, False
+            time.sleep(0.1)
+        raise RuntimeError(f"Generated admin password file {path} is empty")
+    with os.fdopen(fd, 'w') as f:
+        f.write(password)
+    return password, True
+
+def setup_admin_credentials(instance_path):
     """Setup admin credentials from environment or generate random password"""
     username = os.getenv('ADMIN_USERNAME', 'admin')
     password = os.getenv('ADMIN_PASSWORD')
     
     if not password:
-        # Generate random password if not set in environment
-        password = generate_random_password()
+        # Generate random password if not set in environment, shared by all workers through a file
+        password_file = os.getenv('ADMIN_PASSWORD_FILE', os.path.join(instance_path, 'admin_password'))
+        password, created = load_generated_password(password_file)
+        if not created:
+            print(f"✅ Using generated admin password from {password_file} (username: {username})")
+            return username, password
+        
         print("=" * 60)
         print("🔐 ADMIN CREDENTIALS")
         print("=" * 60)
@@ -186,6 +1001,7 @@ def setup_admin_credentials():
         print(f"Password: {password}")
         print("=" * 60)
         print("⚠️  SAVE THESE CREDENTIALS - Password is randomly generated!")
+        print(f"   It is kept in {password_file} until you delete that file.")
         print("   Set ADMIN_PASSWORD in .env to use a custom password.")
         print("=" * 60)
     else:
@@ -193,14 +1009,12 @@ def setup_admin_credentials():
     
     return username, password
 
-# Setup admin credentials
-ADMIN_USERNAME, ADMIN_PASSWORD = setup_admin_credentials()
-
 def generate_token():
     return secrets.token_urlsafe(32)
 
 def format_timestamp_local(utc_timestamp, timezone_name='Europe/Berlin'):
     """Convert UTC timestamp to local timezone and format it"""
+    import pytz
     try:
         # Get timezone from environment or use default
         local_tz_name = os.getenv('TIMEZONE', timezone_name)
@@ -218,16 +1032,24 @@ def format_timestamp_local(utc_timestamp, timezone_name='Europe/Berlin'):
         # Fallback to UTC
         return utc_timestamp.strftime('%Y-%m-%d %H:%M UTC')
 
-def timestamp_to_iso(utc_timestamp):
-    """Convert UTC timestamp to ISO format with timezone info"""
+def local_date(utc_timestamp, timezone_name='Europe/Berlin'):
+    """Return the calendar day of a UTC timestamp in the trip timezone"""
+    import pytz
     try:
+        local_tz = pytz.timezone(os.getenv('TIMEZONE', timezone_name))
         if utc_timestamp.tzinfo is None:
-            # Add UTC timezone info if missing
             utc_timestamp = pytz.utc.localize(utc_timestamp)
-        return utc_timestamp.isoformat()
+        return utc_timestamp.astimezone(local_tz).date()
     except Exception as e:
-        print(f"ISO timestamp conversion error: {e}")
-        return utc_timestamp.isoformat()
+        print(f"Timezone conversion error: {e}")
+        return utc_timestamp.date()
+
+def parse_date_param(value):
+    """Parse a YYYY-MM-DD string, returning None if it is invalid"""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
 
 # Simple daily usage tracking (in-memory for MVP)
 daily_usage_tracker = {}
@@ -272,30 +1094,35 @@ def is_audio_file(filename):
     AUDIO_EXTENSIONS = {'mp3', 'wav', 'ogg', 'webm', 'm4a', 'aac'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in AUDIO_EXTENSIONS
 
+@traced('analyze_image')
 def analyze_image_with_ai(image_path, user_comment=""):
     """Analyze image using Gemini Vision API with cost tracking"""
     try:
         # Read and prepare image
-        with open(image_path, 'rb') as img_file:
+        with tracer.start_as_current_span('image.read') as span, open(image_path, 'rb') as img_file:
             image_data = img_file.read()
+            span.set_attribute('file.size', len(image_data))
         
-        # Convert to PIL Image for processing
-        image = Image.open(io.BytesIO(image_data))
-        original_size = image.size
-        
-        # Resize if too large (Gemini has size limits and cost optimization)
-        max_image_size = int(os.getenv('MAX_IMAGE_SIZE', 1024))
-        max_size = (max_image_size, max_image_size)
-        resized = False
-        if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            resized = True
+        with tracer.start_as_current_span('image.resize') as span:
+            # Convert to PIL Image for processing
+            from PIL import Image
+            image = Image.open(io.BytesIO(image_data))
+            original_size = image.size
             
-            # Save resized image to bytes
-            img_byte_arr = io.BytesIO()
-            format = 'JPEG' if image.mode == 'RGB' else 'PNG'
-            image.save(img_byte_arr, format=format)
-            image_data = img_byte_arr.getvalue()
+            # Resize if too large (Gemini has size limits and cost optimization)
+            max_image_size = int(os.getenv('MAX_IMAGE_SIZE', 1024))
+            max_size = (max_image_size, max_image_size)
+            resized = False
+            if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
+                image.thumbnail(max_size, Image.Resampling.LANCZOS)
+                resized = True
+                
+                # Save resized image to bytes
+                img_byte_arr = io.BytesIO()
+                format = 'JPEG' if image.mode == 'RGB' else 'PNG'
+                image.save(img_byte_arr, format=format)
+                image_data = img_byte_arr.getvalue()
+            span.set_attributes({'image.width': image.size[0], 'image.height': image.size[1], 'image.resized': resized})
         
         # Calculate estimated token usage (1290 tokens for 1024x1024)
         final_size = image.size
@@ -312,13 +1139,14 @@ def analyze_image_with_ai(image_path, user_comment=""):
             print(f"   Estimated input cost: ${estimated_input_cost:.6f}")
         
         # Use Gemini vision model (stable version)
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = get_genai().GenerativeModel('gemini-2.5-flash-lite')
         
         # Prepare the image for Gemini
-        image_part = {
-            "mime_type": "image/jpeg",
-            "data": base64.b64encode(image_data).decode('utf-8')
-        }
+        with tracer.start_as_current_span('image.encode'):
+            image_part = {
+                "mime_type": "image/jpeg",
+                "data": base64.b64encode(image_data).decode('utf-8')
+            }
         
         # Create analysis prompt
         prompt = f"""
@@ -337,7 +1165,8 @@ def analyze_image_with_ai(image_path, user_comment=""):
         Focus on creating vivid imagery that helps readers visualize the scene.
         """
         
-        response = model.generate_content([prompt, image_part])
+        with tracer.start_as_current_span('gemini.generate', {'gen_ai.request.model': 'gemini-2.5-flash-lite'}):
+            response = model.generate_content([prompt, image_part])
         
         # Estimate output cost
         output_length = len(response.text.split())
@@ -356,6 +1185,7 @@ def analyze_image_with_ai(image_path, user_comment=""):
         print(f"❌ Image analysis error: {e}")
         return f"A photo was shared{f': {user_comment}' if user_comment else '.'}"
 
+@traced('transcribe_audio')
 def transcribe_audio_with_ai(audio_path):
     """Transcribe audio using Gemini API with cost tracking"""
     try:
@@ -366,8 +1196,9 @@ def transcribe_audio_with_ai(audio_path):
             return "Voice message shared"
 
         # Read audio file
-        with open(audio_path, 'rb') as audio_file:
+        with tracer.start_as_current_span('audio.read') as span, open(audio_path, 'rb') as audio_file:
             audio_data = audio_file.read()
+            span.set_attribute('file.size', len(audio_data))
         
         # Get file size for cost estimation
         file_size_mb = len(audio_data) / (1024 * 1024)
@@ -381,13 +1212,14 @@ def transcribe_audio_with_ai(audio_path):
             print(f"   Estimated cost: ${estimated_cost:.6f}")
         
         # Use Gemini model for transcription
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = get_genai().GenerativeModel('gemini-2.5-flash-lite')
         
         # Prepare the audio for Gemini
-        audio_part = {
-            "mime_type": "audio/webm",  # Most common format from web browsers
-            "data": base64.b64encode(audio_data).decode('utf-8')
-        }
+        with tracer.start_as_current_span('audio.encode'):
+            audio_part = {
+                "mime_type": "audio/webm",  # Most common format from web browsers
+                "data": base64.b64encode(audio_data).decode('utf-8')
+            }
         
         # Create transcription prompt
         prompt = """
@@ -404,7 +1236,8 @@ def transcribe_audio_with_ai(audio_path):
         Provide only the transcription, no additional commentary.
         """
         
-        response = model.generate_content([prompt, audio_part])
+        with tracer.start_as_current_span('gemini.generate', {'gen_ai.request.model': 'gemini-2.5-flash-lite'}):
+            response = model.generate_content([prompt, audio_part])
         transcription = response.text.strip()
         
         if log_costs:
@@ -445,11 +1278,196 @@ LANGUAGE_NAMES = {
     'tr': 'Turkish'
 }
 
+# Offline reverse geocoding: nearest place from a bundled cities dataset via a k-d tree
+GEOCODER_DATASET = os.getenv('GEOCODER_DATASET', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cities.tsv'))
+GEOCODER_MAX_DISTANCE_KM = float(os.getenv('GEOCODER_MAX_DISTANCE_KM', 50))
+GEOCODER_LEAF_SIZE = 16
+
+def unit_vectors(latitudes, longitudes):
+    """Convert coordinates to 3-D unit vectors, so straight-line distance grows with great-circle distance"""
+    import numpy as np
+    lat, lng = np.radians(latitudes), np.radians(longitudes)
+    return np.column_stack([np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)])
+
+def read_places(path):
+    """Read (labels, latitudes, longitudes) from a places dataset
+    
+    Accepts the bundled TSV (name, admin1, country, latitude, longitude with a
+    header row) as well as a GeoNames citiesNNNN.txt / allCountries.txt dump.
+    """
+    import numpy as np
+    labels, latitudes, longitudes = [], [], []
+    with open(path, encoding='utf-8') as dataset:
+        for line in dataset:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) >= 19:  # GeoNames: name, ..., latitude, longitude, ..., country code
+                parts, latitude, longitude = (fields[1], fields[8]), fields[4], fields[5]
+            elif len(fields) == 5 and fields[0] != 'name':
+                parts, latitude, longitude = fields[:3], fields[3], fields[4]
+            else:
+                continue
+            # "Berlin, Berlin, Germany" -> "Berlin, Germany"
+            labels.append(', '.join(dict.fromkeys(part for part in parts if part)))
+            latitudes.append(float(latitude))
+            longitudes.append(float(longitude))
+    return labels, np.array(latitudes), np.array(longitudes)
+
+def build_kdtree(points, leaf_size=GEOCODER_LEAF_SIZE):
+    """Build a static k-d tree, returning the point order and per-node arrays
+    
+    Points are reordered so every leaf is a contiguous slice. For each node the
+    split dimension (-1 for leaves), split value, (left, right) children and
+    the (start, end) slice of its points are returned.
+    """
+    import numpy as np
+    order = np.arange(len(points))
+    dims, values, children, ranges = [], [], [], []
+    
+    def build(start, end):
+        node = len(dims)
+        dims.append(-1)
+        values.append(0.0)
+        children.append((-1, -1))
+        ranges.append((start, end))
+        if end - start > leaf_size:
+            block = points[order[start:end]]
+            dim = int(np.argmax(block.max(axis=0) - block.min(axis=0)))
+            middle = (start + end) // 2
+            order[start:end] = order[start:end][np.argpartition(block[:, dim], middle - start)]
+            dims[node] = dim
+            values[node] = float(points[order[middle], dim])
+            children[node] = (build(start, middle), build(middle, end))
+        return node
+    
+    build(0, len(points))
+    return order, np.array(dims), np.array(values), np.array(children), np.array(ranges)
+
+class ReverseGeocoder:
+    """Nearest-place lookups against a local dataset, without any network access
+    
+    The dataset is parsed and indexed on first use. The built index is saved
+    as .npy files under cache_dir and memory-mapped by later processes, so
+    only the parts a lookup touches are ever read from disk.
+    """
+    
+    ARRAYS = ('points', 'labels', 'dims', 'values', 'children', 'ranges')
+    
+    def __init__(self, dataset, cache_dir, max_distance_km=GEOCODER_MAX_DISTANCE_KM):
+        self.dataset = dataset
+        self.cache_dir = cache_dir
+        self.max_distance_km = max_distance_km
+        self._index = None
+        self._lock = threading.Lock()
+    
+    def _index_dir(self):
+        stat = os.stat(self.dataset)
+        signature = f"{os.path.abspath(self.dataset)}:{stat.st_size}:{stat.st_mtime_ns}:{GEOCODER_LEAF_SIZE}"
+        return os.path.join(self.cache_dir, hashlib.sha1(signature.encode()).hexdigest()[:16])
+    
+    def _build(self, index_dir):
+        import numpy as np
+        labels, latitudes, longitudes = read_places(self.dataset)
+        points = unit_vectors(latitudes, longitudes)
+        order, dims, values, children, ranges = build_kdtree(points)
+        arrays = {
+            'points': points[order],
+            'labels': np.array(labels, dtype=str)[order],
+            'dims': dims,
+            'values': values,
+            'children': children,
+            'ranges': ranges
+        }
+        
+        # Write to a private directory first so concurrent workers never see a partial index
+        temp_dir = f"{index_dir}.{os.getpid()}.tmp"
+        os.makedirs(temp_dir, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(temp_dir, f'{name}.npy'), array)
+        try:
+            os.rename(temp_dir, index_dir)
+        except OSError:
+            shutil.rmtree(temp_dir, ignore_errors=True)  # Another process finished first
+        print(f"🗺️  Built reverse geocoding index for {len(labels)} places")
+    
+    def _load(self):
+        import numpy as np
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            try:
+                index_dir = self._index_dir()
+                if not os.path.isdir(index_dir):
+                    self._build(index_dir)
+                arrays = {name: np.load(os.path.join(index_dir, f'{name}.npy'), mmap_mode='r') for name in self.ARRAYS}
+                # The small node arrays are walked per lookup, so keep them as Python lists
+                self._index = {
+                    'points': arrays['points'],
+                    'labels': arrays['labels'],
+                    'dims': arrays['dims'].tolist(),
+                    'values': arrays['values'].tolist(),
+                    'children': arrays['children'].tolist(),
+                    'ranges': arrays['ranges'].tolist()
+                }
+            except Exception as e:
+                print(f"⚠️  Reverse geocoding unavailable ({self.dataset}): {e}")
+                self._index = {}
+            return self._index
+    
+    def nearest(self, latitude, longitude):
+        """Return (label, distance in km) of the closest place, or (None, None) without a dataset"""
+        import numpy as np
+        index = self._load()
+        if not index:
+            return None, None
+        
+        points, dims, values, children, ranges = (index[name] for name in ('points', 'dims', 'values', 'children', 'ranges'))
+        target = unit_vectors(float(latitude), float(longitude))[0]
+        best, best_distance = -1, np.inf
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound >= best_distance:
+                continue
+            dim = dims[node]
+            if dim < 0:
+                start, end = ranges[node]
+                distances = ((points[start:end] - target) ** 2).sum(axis=1)
+                closest = int(np.argmin(distances))
+                if distances[closest] < best_distance:
+                    best, best_distance = start + closest, float(distances[closest])
+                continue
+            
+            offset = target[dim] - values[node]
+            left, right = children[node]
+            near, far = (left, right) if offset < 0 else (right, left)
+            stack.append((far, offset * offset))
+            stack.append((near, bound))
+        
+        # Squared chord length on the unit sphere -> great-circle distance
+        distance_km = 2 * EARTH_RADIUS_KM * np.arcsin(min(np.sqrt(best_distance) / 2, 1.0))
+        return str(index['labels'][best]), float(distance_km)
+    
+    def lookup(self, latitude, longitude):
+        """Name of the nearest place within max_distance_km, or None"""
+        label, distance_km = self.nearest(latitude, longitude)
+        if label is None or distance_km > self.max_distance_km:
+            return None
+        return label
+
+geocoder = ReverseGeocoder(GEOCODER_DATASET, os.getenv('GEOCODER_CACHE_DIR', os.path.join(INSTANCE_PATH, 'geocoder')))
+
+def reverse_geocode(latitude, longitude):
+    if latitude is None or longitude is None:
+        return None
+    return geocoder.lookup(latitude, longitude)
+
 # AI Integration
+@traced('create_content_piece')
 def create_content_piece(trip, new_entry):
     """Create a new TripContent record for the given entry"""
+    get_current_span().set_attributes({'trip.id': trip.id, 'entry.id': new_entry.id, 'entry.content_type': new_entry.content_type})
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash-lite')
+        model = get_genai().GenerativeModel('gemini-2.5-flash-lite')
         
         # Get language name for the prompt
         language_name = LANGUAGE_NAMES.get(trip.blog_language, 'English')
@@ -459,7 +1477,7 @@ def create_content_piece(trip, new_entry):
         photo_analysis_enabled = os.getenv('ENABLE_PHOTO_ANALYSIS', 'false').lower() == 'true'
         
         if photo_analysis_enabled and new_entry.content_type == 'photo' and new_entry.filename:
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], new_entry.filename)
+            image_path = os.path.join(current_app.config['UPLOAD_FOLDER'], new_entry.filename)
             if os.path.exists(image_path) and is_image_file(new_entry.filename):
                 # Check daily limit before proceeding
                 if check_daily_limit():
@@ -478,7 +1496,7 @@ def create_content_piece(trip, new_entry):
         # Handle audio transcription (if enabled)
         audio_transcription = ""
         if new_entry.content_type == 'audio' and new_entry.filename:
-            audio_path = os.path.join(app.config['UPLOAD_FOLDER'], new_entry.filename)
+            audio_path = os.path.join(current_app.config['UPLOAD_FOLDER'], new_entry.filename)
             if os.path.exists(audio_path) and is_audio_file(new_entry.filename):
                 print(f"🎤 Transcribing audio: {new_entry.filename}")
                 audio_transcription = transcribe_audio_with_ai(audio_path)
@@ -503,6 +1521,13 @@ def create_content_piece(trip, new_entry):
         IMPORTANT: Include the photo placement marker [PHOTO:{new_entry.id}] at the appropriate place in your text where the photo should appear. This marker will be replaced with the actual photo.
         """
         
+        if new_entry.place_name:
+            location_line = f"- Location: near {new_entry.place_name}"
+        elif new_entry.latitude and new_entry.longitude:
+            location_line = "- GPS location data is available"
+        else:
+            location_line = "- No GPS location data"
+        
         prompt = f"""
         You are creating a travel blog entry for a trip called "{trip.name}".
         
@@ -513,12 +1538,12 @@ def create_content_piece(trip, new_entry):
         - Content: {content_description}
         - Traveler: {new_entry.traveler.name}
         - Time: {format_timestamp_local(new_entry.timestamp)}
-        {"- GPS location data is available" if new_entry.latitude and new_entry.longitude else "- No GPS location data"}
+        {location_line}
         
         Please create an engaging paragraph (2-3 sentences) about this entry for the travel blog IN {language_name.upper()}. 
         {"If this is a photo, use the photo analysis to create vivid, descriptive content about what's shown in the image. " if photo_analysis else ""}
         {"If this is an audio message, use the transcription to capture the traveler's voice and emotions in your blog text. " if audio_transcription else ""}
-        If GPS location is available, try to reference the general area or setting contextually, but do NOT include specific coordinates in your response.
+        If a location is given, you may mention the place or region by name. If only GPS data is available, try to reference the general area or setting contextually. Do NOT include specific coordinates in your response.
         Focus on creating engaging narrative content rather than technical details.
         Write in a friendly, travel blog style in {language_name}. 
         
@@ -526,8 +1551,9 @@ def create_content_piece(trip, new_entry):
         {photo_instruction}
         """
         
-        response = model.generate_content(prompt)
-        generated_content = response.text.strip()
+        with tracer.start_as_current_span('gemini.generate', {'gen_ai.request.model': 'gemini-2.5-flash-lite'}):
+            response = model.generate_content(prompt)
+            generated_content = response.text.strip()
         
         # Create TripContent record
         trip_content = TripContent(
@@ -537,12 +1563,13 @@ def create_content_piece(trip, new_entry):
             latitude=new_entry.latitude,
             longitude=new_entry.longitude,
             original_text=original_text,
-            entry_ids=json.dumps([new_entry.id]),
-            content_date=new_entry.timestamp.date()
+            entry_links=[ContentEntry(entry_id=new_entry.id)],
+            content_date=local_date(new_entry.timestamp)
         )
         
-        db.session.add(trip_content)
-        db.session.commit()
+        with tracer.start_as_current_span('content.commit'):
+            db.session.add(trip_content)
+            db.session.commit()
         
         print(f"✅ Created TripContent record {trip_content.id} for entry {new_entry.id}")
         return trip_content
@@ -559,862 +1586,2397 @@ def create_content_piece(trip, new_entry):
             latitude=new_entry.latitude,
             longitude=new_entry.longitude,
             original_text=new_entry.content,
-            entry_ids=json.dumps([new_entry.id]),
-            content_date=new_entry.timestamp.date()
+            entry_links=[ContentEntry(entry_id=new_entry.id)],
+            content_date=local_date(new_entry.timestamp)
         )
         
-        db.session.add(trip_content)
-        db.session.commit()
+        with tracer.start_as_current_span('content.commit', {'content.fallback': True}):
+            db.session.add(trip_content)
+            db.session.commit()
         return trip_content
 
-# Routes
-@app.route('/api/admin/login', methods=['POST'])
-def admin_login():
-    data = request.get_json()
-    username = data.get('username')
-    password = data.get('password')
+def query_date_range(trip_id, start_date, end_date):
+    """Fetch entries and content pieces of a trip between two days (inclusive) via the date indexes"""
+    entries = Entry.query.options(joinedload(Entry.traveler)).filter(
+        Entry.trip_id == trip_id,
+        Entry.entry_date >= start_date,
+        Entry.entry_date <= end_date
+    ).order_by(Entry.timestamp.asc()).all()
     
-    if username == ADMIN_USERNAME and password == ADMIN_PASSWORD:
-        token = create_access_token(identity='admin')
-        return jsonify({'token': token})
+    content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter(
+        TripContent.trip_id == trip_id,
+        TripContent.content_date >= start_date,
+        TripContent.content_date <= end_date
+    ).order_by(TripContent.timestamp.asc()).all()
     
-    return jsonify({'error': 'Invalid credentials'}), 401
+    return entries, content_pieces
 
-@app.route('/api/admin/trips', methods=['POST'])
-@jwt_required()
-def create_trip():
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    data = request.get_json()
-    name = data.get('name')
-    description = data.get('description', '')
-    blog_language = data.get('blog_language', 'en')
-    
-    if not name:
-        return jsonify({'error': 'Trip name is required'}), 400
-    
-    admin_token = generate_token()
-    trip = Trip(name=name, description=description, admin_token=admin_token, blog_language=blog_language)
-    db.session.add(trip)
-    db.session.commit()
-    
-    return jsonify({
-        'id': trip.id,
-        'name': trip.name,
-        'description': trip.description,
-        'blog_language': trip.blog_language,
-        'admin_token': trip.admin_token,
-        'created_at': timestamp_to_iso(trip.created_at)
-    })
+def serialize_date_range(entries, content_pieces):
+    """Build the entries/content_pieces payload shared by the date and range endpoints"""
+    return {
+        'entries': [date_range_entry_to_dict(entry) for entry in entries],
+        'content_pieces': [content_to_dict(content) for content in content_pieces]
+    }
 
-@app.route('/api/admin/trips', methods=['GET'])
-@jwt_required()
-def get_trips():
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    trips = Trip.query.all()
-    return jsonify([{
-        'id': trip.id,
-        'name': trip.name,
-        'description': trip.description,
-        'blog_language': trip.blog_language,
-        'public_enabled': trip.public_enabled,
-        'public_token': trip.public_token,
-        'reactions_enabled': trip.reactions_enabled,
-        'created_at': timestamp_to_iso(trip.created_at),
-        'traveler_count': len(trip.travelers),
-        'entry_count': len(trip.entries)
-    } for trip in trips])
-
-@app.route('/api/admin/trips/<int:trip_id>/travelers', methods=['POST'])
-@jwt_required()
-def add_traveler(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    trip = Trip.query.get_or_404(trip_id)
-    data = request.get_json()
-    name = data.get('name')
-    
-    if not name:
-        return jsonify({'error': 'Traveler name is required'}), 400
-    
-    token = generate_token()
-    traveler = Traveler(name=name, token=token, trip_id=trip.id)
-    db.session.add(traveler)
-    db.session.commit()
+def build_calendar_data(trip_id):
+    """Count entries per day and content type with a single grouped query"""
+    rows = db.session.query(
+        Entry.entry_date, Entry.content_type, db.func.count(Entry.id)
+    ).filter(
+        Entry.trip_id == trip_id
+    ).group_by(Entry.entry_date, Entry.content_type).order_by(Entry.entry_date).all()
     
-    return jsonify({
-        'id': traveler.id,
-        'name': traveler.name,
-        'token': traveler.token,
-        'link': f'/traveler/{traveler.token}'
-    })
+    return calendar_from_counts(rows)
 
-@app.route('/api/trips/<int:trip_id>/travelers', methods=['GET'])
-def get_travelers(trip_id):
-    trip = Trip.query.get_or_404(trip_id)
-    return jsonify([{
-        'id': traveler.id,
-        'name': traveler.name,
-        'token': traveler.token,
-        'created_at': timestamp_to_iso(traveler.created_at)
-    } for traveler in trip.travelers])
-
-@app.route('/api/traveler/verify/<token>', methods=['GET'])
-def verify_traveler_token(token):
-    traveler = Traveler.query.filter_by(token=token).first()
-    if not traveler:
-        return jsonify({'error': 'Invalid token'}), 404
-    
-    return jsonify({
-        'traveler': {
-            'id': traveler.id,
-            'name': traveler.name,
-            'trip_name': traveler.trip.name,
-            'trip': {
-                'id': traveler.trip.id,
-                'name': traveler.trip.name,
-                'blog_language': traveler.trip.blog_language
+def calendar_from_counts(rows):
+    """Build the calendar payload from (entry_date, content_type, count) rows"""
+    calendar_data = {}
+    for entry_date, content_type, count in sorted(rows, key=lambda row: row[0] or date.min):
+        if entry_date is None:
+            continue
+        day = entry_date.isoformat()
+        if day not in calendar_data:
+            calendar_data[day] = {
+                'date': day,
+                'text_count': 0,
+                'photo_count': 0,
+                'audio_count': 0,
+                'total_count': 0
             }
+        
+        if content_type in ('text', 'photo', 'audio'):
+            calendar_data[day][f'{content_type}_count'] += count
+        calendar_data[day]['total_count'] += count
+    
+    return {
+        'calendar_data': list(calendar_data.values()),
+        'date_range': {
+            'start': min(calendar_data.keys()) if calendar_data else None,
+            'end': max(calendar_data.keys()) if calendar_data else None
         }
-    })
+    }
 
-@app.route('/api/traveler/<token>/entries', methods=['POST'])
-def create_entry(token):
-    traveler = Traveler.query.filter_by(token=token).first()
-    if not traveler:
-        return jsonify({'error': 'Invalid token'}), 404
-    
-    content_type = request.form.get('content_type')
-    content = request.form.get('content', '')
-    latitude = request.form.get('latitude', type=float)
-    longitude = request.form.get('longitude', type=float)
-    
-    filename = None
-    if 'file' in request.files:
-        file = request.files['file']
-        if file and file.filename and allowed_file(file.filename):
-            filename = secure_filename(f"{uuid.uuid4()}_{file.filename}")
-            file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-    
-    entry = Entry(
-        trip_id=traveler.trip_id,
-        traveler_id=traveler.id,
-        content_type=content_type,
-        content=content,
-        latitude=latitude,
-        longitude=longitude,
-        filename=filename
-    )
-    
-    db.session.add(entry)
-    db.session.commit()
+def parse_date_range_args():
+    """Read start/end query parameters, returning (start, end, error_response)"""
+    start_date = parse_date_param(request.args.get('start'))
+    end_date = parse_date_param(request.args.get('end'))
+    if not start_date or not end_date:
+        return None, None, (jsonify({'error': 'start and end are required. Use YYYY-MM-DD'}), 400)
+    if end_date < start_date:
+        return None, None, (jsonify({'error': 'end must not be before start'}), 400)
+    return start_date, end_date, None
+
+def get_content_pieces_for_entry(entry_id):
+    """Find the content pieces generated from an entry via the entry_id index"""
+    return TripContent.query.join(ContentEntry).filter(ContentEntry.entry_id == entry_id).all()
+
+# Reactions
+REACTION_TYPES = ['like', 'applause', 'support', 'love', 'insightful', 'funny']
+
+def build_reaction_upsert(trip_id, content_id, reaction_type, delta):
+    """Build a single INSERT ... ON CONFLICT statement that adds delta to a reaction counter
     
-    # Create AI-generated content piece
-    try:
-        create_content_piece(traveler.trip, entry)
-    except Exception as e:
-        print(f"Content piece creation failed: {e}")
+    The database applies the change atomically, so concurrent clicks never
+    overwrite each other. Counters are clamped at zero.
+    """
+    now = datetime.utcnow()
+    reactions = PostReaction.__table__
+    new_count = reactions.c.count + delta
     
-    return jsonify({
-        'id': entry.id,
-        'message': 'Entry created successfully'
-    })
-
-@app.route('/api/trips/<int:trip_id>/blog', methods=['GET'])
-@jwt_required()
-def get_blog(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-        
-    trip = Trip.query.get_or_404(trip_id)
-    return jsonify({
-        'trip_name': trip.name,
-        'description': trip.description,
-        'blog_content': trip.blog_content,
-        'blog_language': trip.blog_language,
-        'created_at': timestamp_to_iso(trip.created_at)
-    })
+    stmt = sqlite_insert(reactions).values(
+        trip_id=trip_id,
+        content_piece_id=content_id,
+        reaction_type=reaction_type,
+        count=max(delta, 0),
+        created_at=now,
+        updated_at=now
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=['content_piece_id', 'reaction_type'],
+        set_={'count': case((new_count < 0, 0), else_=new_count), 'updated_at': now}
+    )
 
-@app.route('/api/trips/<int:trip_id>/entries', methods=['GET'])
-@jwt_required()
-def get_entries(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-        
-    trip = Trip.query.get_or_404(trip_id)
-    entries = Entry.query.filter_by(trip_id=trip_id).order_by(Entry.timestamp.desc()).all()
-    
-    return jsonify([{
-        'id': entry.id,
-        'content_type': entry.content_type,
-        'content': entry.content,
-        'latitude': entry.latitude,
-        'longitude': entry.longitude,
-        'timestamp': timestamp_to_iso(entry.timestamp),
-        'traveler_name': entry.traveler.name,
-        'filename': entry.filename,
-        'disabled': entry.disabled
-    } for entry in entries])
-
-@app.route('/api/admin/trips/<int:trip_id>/regenerate-blog', methods=['POST'])
-@jwt_required()
-def regenerate_blog(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    trip = Trip.query.get_or_404(trip_id)
-    all_entries = Entry.query.filter_by(trip_id=trip_id).order_by(Entry.timestamp.asc()).all()
-    
-    # Filter out disabled entries
-    enabled_entries = [entry for entry in all_entries if not entry.disabled]
-    disabled_count = len(all_entries) - len(enabled_entries)
-    
-    # Clear existing content pieces
-    TripContent.query.filter_by(trip_id=trip_id).delete()
-    
-    # Reset blog content (keep for backwards compatibility during transition)
-    trip.blog_content = f"# {trip.name}\n\n{trip.description}\n"
-    
-    # Process each enabled entry to create new content pieces
-    created_count = 0
-    for entry in enabled_entries:
-        try:
-            create_content_piece(trip, entry)
-            created_count += 1
-        except Exception as e:
-            print(f"Content piece creation failed for entry {entry.id}: {e}")
+def get_reaction_counts(content_id):
+    """Return the counts of all reaction types for a content piece, including unflushed deltas"""
+    reaction_counts = dict.fromkeys(REACTION_TYPES, 0)
     
-    db.session.commit()
+    rows = db.session.query(PostReaction.reaction_type, PostReaction.count).filter_by(content_piece_id=content_id)
+    for reaction_type, count in rows:
+        if reaction_type in reaction_counts:
+            reaction_counts[reaction_type] = count
     
-    # Build informative response message
-    message = f'Blog regenerated successfully. Created {created_count} content pieces from {len(enabled_entries)} enabled entries.'
-    if disabled_count > 0:
-        message += f' Skipped {disabled_count} disabled entries.'
+    reaction_aggregator = get_reaction_aggregator()
+    if reaction_aggregator:
+        for reaction_type, delta in reaction_aggregator.pending_for(content_id).items():
+            if reaction_type in reaction_counts:
+                reaction_counts[reaction_type] = max(reaction_counts[reaction_type] + delta, 0)
     
-    return jsonify({'message': message})
+    return reaction_counts
 
-@app.route('/api/admin/trips/<int:trip_id>/migrate-content', methods=['POST'])
-@jwt_required()
-def migrate_existing_content(trip_id):
-    """Migrate existing blog_content to TripContent records"""
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+def get_trip_reaction_counts(trip_id, content_ids=None):
+    """Return {content_id: counts} for a trip's content pieces with one grouped join
     
-    trip = Trip.query.get_or_404(trip_id)
-    entries = Entry.query.filter_by(trip_id=trip_id).order_by(Entry.timestamp.asc()).all()
+    Every content piece of the trip (or of content_ids, if given) is included,
+    with zero counts when it has no reactions yet. Ids of other trips are ignored.
+    """
+    query = db.session.query(
+        TripContent.id, PostReaction.reaction_type, PostReaction.count
+    ).outerjoin(
+        PostReaction, PostReaction.content_piece_id == TripContent.id
+    ).filter(TripContent.trip_id == trip_id)
+    if content_ids is not None:
+        query = query.filter(TripContent.id.in_(content_ids))
     
-    # Check if migration is needed
-    if not trip.blog_content or trip.blog_content.strip() == f"# {trip.name}\n\n{trip.description}":
-        return jsonify({'message': 'No content to migrate or content already empty.'})
+    all_counts = {}
+    for content_id, reaction_type, count in query:
+        reaction_counts = all_counts.setdefault(content_id, dict.fromkeys(REACTION_TYPES, 0))
+        if reaction_type in reaction_counts:
+            reaction_counts[reaction_type] = count
     
-    # Check if TripContent records already exist
-    existing_content_count = TripContent.query.filter_by(trip_id=trip_id).count()
-    if existing_content_count > 0:
-        return jsonify({
-            'error': f'Trip already has {existing_content_count} content pieces. Use regenerate-blog to recreate them.'
-        }), 400
+    reaction_aggregator = get_reaction_aggregator()
+    if reaction_aggregator:
+        for content_id, pending in reaction_aggregator.pending_for_trip(trip_id).items():
+            if content_id not in all_counts:
+                continue
+            for reaction_type, delta in pending.items():
+                if reaction_type in all_counts[content_id]:
+                    all_counts[content_id][reaction_type] = max(all_counts[content_id][reaction_type] + delta, 0)
     
-    try:
-        # Simple migration: create one content piece per entry based on timestamp
-        # This is a best-effort approach since we can't perfectly parse the monolithic content
-        migrated_count = 0
-        
-        for entry in entries:
-            # Create a simple content piece for each entry
-            content_text = f"**{format_timestamp_local(entry.timestamp)}** - {entry.traveler.name} shared a {entry.content_type}"
-            if entry.content:
-                content_text += f": {entry.content}"
-            
-            # Add photo marker if it's a photo
-            if entry.content_type == 'photo' and entry.filename:
-                content_text += f"\n\n[PHOTO:{entry.id}]"
-            
-            # Create TripContent record
-            trip_content = TripContent(
-                trip_id=trip.id,
-                timestamp=entry.timestamp,
-                generated_content=content_text,
-                latitude=entry.latitude,
-                longitude=entry.longitude,
-                original_text=entry.content,
-                entry_ids=json.dumps([entry.id]),
-                content_date=entry.timestamp.date()
-            )
-            
-            db.session.add(trip_content)
-            migrated_count += 1
-        
-        # Backup the original blog_content
-        trip.blog_content = f"# {trip.name}\n\n{trip.description}\n\n<!-- Original content migrated to individual pieces -->"
-        
-        db.session.commit()
-        
-        return jsonify({
-            'message': f'Migration completed successfully. Created {migrated_count} content pieces from {len(entries)} entries.',
-            'migrated_entries': migrated_count,
-            'total_entries': len(entries)
-        })
-        
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({
-            'error': f'Migration failed: {str(e)}'
-        }), 500
+    return all_counts
+
+def conditional_json(payload):
+    """jsonify payload with a strong content-hash ETag, answering 304 on a matching If-None-Match"""
+    response = jsonify(payload)
+    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
-@app.route('/api/admin/trips/<int:trip_id>/language', methods=['PUT'])
-@jwt_required()
-def update_trip_language(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+class ResponseCache:
+    """Thread-safe LRU of serialized response bodies, bounded by their total size
     
-    trip = Trip.query.get_or_404(trip_id)
-    data = request.get_json()
-    new_language = data.get('language')
+    Keys include the trip's content_version, so entries never need to be
+    invalidated: a write bumps the version and old bodies simply age out.
+    """
     
-    if not new_language:
-        return jsonify({'error': 'Language is required'}), 400
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
     
-    trip.blog_language = new_language
-    db.session.commit()
+    def get(self, key):
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+            return cached
     
-    return jsonify({
-        'message': 'Language updated successfully',
-        'language': trip.blog_language
-    })
+    def set(self, key, body, mimetype):
+        """Store a body with its strong ETag, returning the cached (body, mimetype, etag) tuple"""
+        cached = (body, mimetype, hashlib.sha1(body).hexdigest())
+        if len(body) > self.max_bytes // 8:
+            return cached  # Too large to be worth evicting everything else for
+        
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+            self._entries[key] = cached
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+        return cached
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+response_cache = ResponseCache(int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
 
-@app.route('/api/admin/trips/<int:trip_id>', methods=['DELETE'])
-@jwt_required()
-def delete_trip(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+def cached_trip_response(trip, build):
+    """Serve a public read endpoint from the response cache, answering 304 on a matching If-None-Match
     
-    trip = Trip.query.get_or_404(trip_id)
+    Responses are keyed by path, query string and the trip's content_version.
+    build() is only called on a cache miss. Errors and streamed responses pass
+    through uncached.
+    """
+    key = (request.path, tuple(sorted(request.args.items(multi=True))), trip.id, trip_content_version(trip.id))
+    cached = response_cache.get(key)
+    if cached is None:
+        response = build()
+        if isinstance(response, tuple) or response.status_code != 200 or response.is_streamed:
+            return response
+        cached = response_cache.set(key, response.get_data(), response.mimetype)
     
-    # Delete associated files
-    for entry in trip.entries:
-        if entry.filename:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], entry.filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
+    body, mimetype, etag = cached
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+class ReactionAggregator:
+    """Write-behind buffer for reaction clicks
     
-    db.session.delete(trip)
-    db.session.commit()
+    Deltas are summed in memory per (content piece, reaction type) and written
+    by flush() in one transaction, either from the background thread started
+    with start() or explicitly (e.g. on shutdown). Forked worker processes get
+    an empty buffer and their own flush thread.
+    """
     
-    return jsonify({'message': 'Trip deleted successfully'})
-
-@app.route('/api/admin/trips/<int:trip_id>/public', methods=['PUT'])
-@jwt_required()
-def toggle_public_access(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+    def __init__(self, flask_app, flush_interval=2.0):
+        self.app = flask_app
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
     
-    trip = Trip.query.get_or_404(trip_id)
-    data = request.get_json()
-    enabled = data.get('enabled', False)
+    def add(self, trip_id, content_id, reaction_type, delta):
+        key = (trip_id, content_id, reaction_type)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + delta
     
-    trip.public_enabled = enabled
-    if enabled and not trip.public_token:
-        trip.public_token = generate_token()
-    elif not enabled:
-        trip.public_token = None
+    def pending_for(self, content_id):
+        with self._lock:
+            return {
+                reaction_type: delta
+                for (_, pending_content_id, reaction_type), delta in self._pending.items()
+                if pending_content_id == content_id
+            }
     
-    db.session.commit()
+    def pending_for_trip(self, trip_id):
+        pending = {}
+        with self._lock:
+            for (pending_trip_id, content_id, reaction_type), delta in self._pending.items():
+                if pending_trip_id == trip_id:
+                    pending.setdefault(content_id, {})[reaction_type] = delta
+        return pending
     
-    return jsonify({
-        'message': 'Public access updated successfully',
-        'public_enabled': trip.public_enabled,
-        'public_token': trip.public_token
-    })
+    def flush(self):
+        """Write all buffered deltas in a single transaction, returning the number of counters touched"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            changes = [(key, delta) for key, delta in pending.items() if delta]
+            if not changes:
+                return 0
+            
+            try:
+                with self.app.app_context():
+                    changed_content = {}
+                    for (trip_id, content_id, reaction_type), delta in changes:
+                        db.session.execute(build_reaction_upsert(trip_id, content_id, reaction_type, delta))
+                        changed_content.setdefault(trip_id, set()).add(content_id)
+                    for trip_id, content_ids in changed_content.items():
+                        record_reaction_events(db.session, trip_id, content_ids)
+                    db.session.commit()
+            except Exception as e:
+                print(f"❌ Reaction flush failed, re-queueing {len(changes)} counter(s): {e}")
+                with self._lock:
+                    for key, delta in changes:
+                        self._pending[key] = self._pending.get(key, 0) + delta
+                return 0
+            
+            return len(changes)
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='reaction-flush', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+            os.register_at_fork(after_in_child=self._restart_after_fork)
+    
+    def _restart_after_fork(self):
+        # Threads do not survive fork() and locks may have been held by them;
+        # buffered deltas stay with the parent, which flushes them itself
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='reaction-flush', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        self.flush()
+    
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+def get_reaction_aggregator():
+    """The application's ReactionAggregator, or None unless REACTION_WRITE_BEHIND=true"""
+    return current_app.extensions.get('reaction_aggregator')
+
+# Live feed: Server-Sent Events of trip events, fanned out per process
+LiveEvent = namedtuple('LiveEvent', ['id', 'trip_id', 'event_type', 'data'])
+LIVE_FEED_RETRY_MS = 3000  # EventSource reconnect delay
 
-@app.route('/api/admin/trips/<int:trip_id>/reactions', methods=['PUT'])
-@jwt_required()
-def toggle_reactions(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+def format_sse(event):
+    return f"id: {event.id}\nevent: {event.event_type}\ndata: {event.data}\n\n"
+
+def load_trip_events(trip_id, after_id):
+    """Logged events of a trip newer than after_id, plus whether older ones were already trimmed"""
+    rows = db.session.query(TripEvent.id, TripEvent.trip_id, TripEvent.event_type, TripEvent.data).filter(
+        TripEvent.trip_id == trip_id, TripEvent.id > after_id
+    ).order_by(TripEvent.id).all()
     
-    trip = Trip.query.get_or_404(trip_id)
-    data = request.get_json()
-    enabled = data.get('enabled', True)
+    oldest_id, logged = db.session.query(db.func.min(TripEvent.id), db.func.count(TripEvent.id)).filter(
+        TripEvent.trip_id == trip_id
+    ).one()
+    trimmed = logged >= TRIP_EVENT_LOG_SIZE and after_id < oldest_id - 1
+    return [LiveEvent(*row) for row in rows], trimmed
+
+class LiveFeedSubscription:
+    def __init__(self, trip_id, max_pending):
+        self.trip_id = trip_id
+        self.events = queue.Queue(max_pending)
+        self.overflowed = False
+
+class LiveFeed:
+    """Per-process fan-out of trip events to live feed subscribers
     
-    trip.reactions_enabled = enabled
-    db.session.commit()
+    A single background thread, started with the first subscriber, reads new
+    rows of the trip event log and hands each to the queues of its trip's
+    subscribers, so the database is polled once per interval however many
+    readers are connected. Commits in this process wake the thread at once;
+    events written by other worker processes arrive within poll_interval.
     
-    return jsonify({
-        'message': 'Reactions setting updated successfully',
-        'reactions_enabled': trip.reactions_enabled
-    })
+    The same thread logs the reaction counts of content pieces passed to
+    reactions_changed(), one event per piece for all clicks since its last
+    round, so reaction requests only write their counter.
+    """
+    
+    def __init__(self, app, poll_interval=1.0, max_subscribers=100, max_pending=1000):
+        self.app = app
+        self.poll_interval = poll_interval
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._subscriptions = {}
+        self._count = 0
+        self._last_id = None
+        self._changed_reactions = {}
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._record_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+    
+    def _ensure_thread(self):
+        """Start the background thread (lock held)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='live-feed', daemon=True)
+            self._thread.start()
+    
+    def subscribe(self, trip_id):
+        """Register a subscriber of a trip, returning None when the process is at max_subscribers"""
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            if not self._subscriptions:
+                # Only events committed from now on are dispatched; older ones are replayed from the log
+                self._last_id = db.session.query(db.func.max(TripEvent.id)).scalar() or 0
+            subscription = LiveFeedSubscription(trip_id, self.max_pending)
+            self._subscriptions.setdefault(trip_id, set()).add(subscription)
+            self._count += 1
+            self._ensure_thread()
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.trip_id)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.discard(subscription)
+                self._count -= 1
+                if not subscriptions:
+                    del self._subscriptions[subscription.trip_id]
+    
+    def notify(self):
+        self._wake.set()
+    
+    def reactions_changed(self, trip_id, content_id):
+        """Have the reaction counts of a content piece logged by the next round of the thread"""
+        with self._lock:
+            self._changed_reactions.setdefault(trip_id, set()).add(content_id)
+            self._ensure_thread()
+        self._wake.set()
+    
+    def record_reactions(self):
+        """Log the counts of content pieces whose reactions changed, returning how many were logged"""
+        with self._record_lock:
+            with self._lock:
+                changed, self._changed_reactions = self._changed_reactions, {}
+            if not changed:
+                return 0
+            
+            try:
+                with self.app.app_context():
+                    for trip_id, content_ids in changed.items():
+                        record_reaction_events(db.session, trip_id, content_ids)
+                    db.session.commit()
+            except Exception as e:
+                print(f"❌ Logging reaction events failed, retrying: {e}")
+                with self._lock:
+                    for trip_id, content_ids in changed.items():
+                        self._changed_reactions.setdefault(trip_id, set()).update(content_ids)
+                return 0
+            return sum(len(content_ids) for content_ids in changed.values())
+    
+    def poll(self):
+        """Dispatch events logged since the last poll, returning how many were read"""
+        with self._poll_lock:
+            with self._lock:
+                if not self._subscriptions:
+                    return 0
+                last_id = self._last_id
+            
+            with self.app.app_context():
+                rows = db.session.query(TripEvent.id, TripEvent.trip_id, TripEvent.event_type, TripEvent.data).filter(
+                    TripEvent.id > last_id
+                ).order_by(TripEvent.id).limit(self.max_pending).all()
+            if not rows:
+                return 0
+            
+            with self._lock:
+                start_id, self._last_id = self._last_id, max(self._last_id, rows[-1][0])
+                for row in rows:
+                    event = LiveEvent(*row)
+                    if event.id <= start_id:
+                        continue  # Skipped by a subscribe() while this poll was running
+                    for subscription in self._subscriptions.get(event.trip_id, ()):
+                        if subscription.overflowed:
+                            continue
+                        try:
+                            subscription.events.put_nowait(event)
+                        except queue.Full:
+                            # A reader this far behind reconnects and replays from the log
+                            subscription.overflowed = True
+                            subscription.events.queue.clear()
+                            subscription.events.put_nowait(None)
+            return len(rows)
+    
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.record_reactions()
+                while self.poll() >= self.max_pending:
+                    pass
+            except Exception as e:
+                print(f"❌ Live feed poll failed: {e}")
 
-@app.route('/api/public/<token>')
-def get_public_blog(token):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
-        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+# Map viewport queries
+MAX_VIEWPORT_RESULTS = 5000
+
+def parse_bbox(value):
+    """Parse a Leaflet-style "west,south,east,north" bounding box, returning None if invalid"""
+    try:
+        west, south, east, north = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        return None
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        return None
+    return west, south, east, north
+
+def query_viewport(model, rtree, trip_id, bbox, limit):
+    """Return rows of a trip whose coordinates lie inside bbox, newest first, via the R*Tree index
     
-    return jsonify({
-        'trip_name': trip.name,
-        'description': trip.description,
-        'blog_content': trip.blog_content,
-        'blog_language': trip.blog_language,
-        'reactions_enabled': trip.reactions_enabled,
-        'created_at': timestamp_to_iso(trip.created_at)
-    })
+    A box whose west edge is east of its east edge crosses the antimeridian and
+    is searched as two boxes. R*Tree boxes are stored as 32-bit floats, so the
+    real coordinates are re-checked to keep the edges exact.
+    """
+    west, south, east, north = bbox
+    lng_ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+    
+    boxes = [and_(
+        rtree.c.max_lat >= south, rtree.c.min_lat <= north,
+        rtree.c.max_lng >= min_lng, rtree.c.min_lng <= max_lng,
+        model.longitude.between(min_lng, max_lng)
+    ) for min_lng, max_lng in lng_ranges]
+    
+    query = model.query.join(rtree, rtree.c.id == model.id).filter(
+        rtree.c.trip_id == trip_id,
+        model.latitude.between(south, north),
+        or_(*boxes)
+    ).order_by(model.timestamp.desc(), model.id.desc())
+    if model is Entry:
+        query = query.options(joinedload(Entry.traveler))
+    
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
 
-@app.route('/api/public/<token>/entries')
-def get_public_entries(token):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
-        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+def viewport_response(trip_id, entry_serializer):
+    bbox = parse_bbox(request.args.get('bbox'))
+    if not bbox:
+        return jsonify({'error': 'bbox is required as west,south,east,north in degrees'}), 400
     
-    # Return all entries for blog content rendering, but include location info for mapping
-    entries = Entry.query.filter_by(trip_id=trip.id).order_by(Entry.timestamp.desc()).all()
-    
-    return jsonify([{
-        'id': entry.id,
-        'content_type': entry.content_type,
-        'latitude': entry.latitude,
-        'longitude': entry.longitude,
-        'timestamp': timestamp_to_iso(entry.timestamp),
-        'traveler_name': entry.traveler.name,
-        'filename': entry.filename
-    } for entry in entries])
-
-@app.route('/api/public/<token>/content')
-def get_public_trip_content(token):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
-        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    limit = min(max(request.args.get('limit', 1000, type=int), 1), MAX_VIEWPORT_RESULTS)
+    layer = request.args.get('layer', 'entries')
+    if layer == 'entries':
+        rows, truncated = query_viewport(Entry, entry_rtree, trip_id, bbox, limit)
+        items = [entry_serializer(entry) for entry in rows]
+    elif layer == 'content':
+        rows, truncated = query_viewport(TripContent, trip_content_rtree, trip_id, bbox, limit)
+        items = [content_to_dict(content) for content in rows]
+    else:
+        return jsonify({'error': 'layer must be "entries" or "content"'}), 400
     
-    content_pieces = TripContent.query.filter_by(trip_id=trip.id).order_by(TripContent.timestamp.desc()).all()
-    
-    return jsonify([{
-        'id': content.id,
-        'timestamp': timestamp_to_iso(content.timestamp),
-        'generated_content': content.generated_content,
-        'latitude': content.latitude,
-        'longitude': content.longitude,
-        'original_text': content.original_text,
-        'entry_ids': json.loads(content.entry_ids) if content.entry_ids else [],
-        'content_date': content.content_date.isoformat()
-    } for content in content_pieces])
-
-@app.route('/api/public/<token>/content/calendar')
-def get_public_calendar_data(token):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
-        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    return jsonify({'bbox': list(bbox), 'layer': layer, 'items': items, 'truncated': truncated})
+
+# Map marker clustering and route tracks
+MAX_MAP_ZOOM = 18
+CLUSTER_CELL_PIXELS = 64  # Grid cell edge in 256px Web Mercator tile pixels
+ROUTE_TOLERANCE_PIXELS = 1.0  # Maximum deviation of the simplified route in screen pixels
+MERCATOR_MAX_LATITUDE = 85.05112878
+
+def load_trip_points(trip_id):
+    """Return (ids, latitudes, longitudes) arrays of a trip's geotagged entries in time order"""
+    import numpy as np
+    rows = db.session.query(Entry.id, Entry.latitude, Entry.longitude).filter(
+        Entry.trip_id == trip_id,
+        Entry.latitude.isnot(None),
+        Entry.longitude.isnot(None)
+    ).order_by(Entry.timestamp, Entry.id).all()
     
-    # Get all entries grouped by date
-    entries = Entry.query.filter_by(trip_id=trip.id).all()
-    calendar_data = {}
+    # NumPy converts plain tuples far faster than Row objects
+    points = np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 3)
+    return points[:, 0].astype(np.int64), points[:, 1], points[:, 2]
+
+def mercator_project(latitudes, longitudes):
+    """Project coordinates to Web Mercator x/y, both normalized to 0..1 for the whole world"""
+    import numpy as np
+    x = (longitudes + 180.0) / 360.0
+    sin_lat = np.sin(np.radians(np.clip(latitudes, -MERCATOR_MAX_LATITUDE, MERCATOR_MAX_LATITUDE)))
+    y = 0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)
+    return x, y
+
+def build_cluster_pyramid(ids, latitudes, longitudes):
+    """Group points into Web Mercator grid cells for every zoom level from 0 to MAX_MAP_ZOOM
     
-    for entry in entries:
-        entry_date = entry.timestamp.date().isoformat()
-        if entry_date not in calendar_data:
-            calendar_data[entry_date] = {
-                'date': entry_date,
-                'text_count': 0,
-                'photo_count': 0,
-                'audio_count': 0,
-                'total_count': 0
-            }
+    Each level is a dict of parallel arrays: centroid latitude/longitude,
+    count, bounds (west, south, east, north) and the id of the newest entry
+    in the cluster as its representative. Clusters are sorted largest first.
+    """
+    import numpy as np
+    x, y = mercator_project(latitudes, longitudes)
+    positions = np.arange(len(ids))
+    
+    pyramid = []
+    for zoom in range(MAX_MAP_ZOOM + 1):
+        cells = (256 // CLUSTER_CELL_PIXELS) << zoom
+        cell_x = np.clip((x * cells).astype(np.int64), 0, cells - 1)
+        cell_y = np.clip((y * cells).astype(np.int64), 0, cells - 1)
+        keys, inverse, counts = np.unique(cell_x * cells + cell_y, return_inverse=True, return_counts=True)
+        size = len(keys)
         
-        if entry.content_type == 'text':
-            calendar_data[entry_date]['text_count'] += 1
-        elif entry.content_type == 'photo':
-            calendar_data[entry_date]['photo_count'] += 1
-        elif entry.content_type == 'audio':
-            calendar_data[entry_date]['audio_count'] += 1
+        # Points are in time order, so the highest position in a cell is its newest entry
+        newest = np.zeros(size, dtype=np.int64)
+        np.maximum.at(newest, inverse, positions)
+        bounds = np.empty((size, 4))
+        bounds[:, 0:2] = np.inf
+        bounds[:, 2:4] = -np.inf
+        np.minimum.at(bounds[:, 0], inverse, longitudes)
+        np.minimum.at(bounds[:, 1], inverse, latitudes)
+        np.maximum.at(bounds[:, 2], inverse, longitudes)
+        np.maximum.at(bounds[:, 3], inverse, latitudes)
         
-        calendar_data[entry_date]['total_count'] += 1
+        order = np.argsort(-counts, kind='stable')
+        pyramid.append({
+            'latitude': (np.bincount(inverse, weights=latitudes, minlength=size) / counts)[order],
+            'longitude': (np.bincount(inverse, weights=longitudes, minlength=size) / counts)[order],
+            'count': counts[order],
+            'bounds': bounds[order],
+            'entry_id': ids[newest][order]
+        })
+    return pyramid
+
+def get_cluster_pyramid(trip_id):
+    return trip_cache.get_or_compute(
+        trip_id, 'clusters', lambda: build_cluster_pyramid(*load_trip_points(trip_id)),
+        version=trip_content_version(trip_id)
+    )
+
+def simplify_track(x, y, tolerance):
+    """Douglas-Peucker simplification, returning the indices of the points to keep
     
-    return jsonify({
-        'calendar_data': list(calendar_data.values()),
-        'date_range': {
-            'start': min(calendar_data.keys()) if calendar_data else None,
-            'end': max(calendar_data.keys()) if calendar_data else None
-        }
-    })
+    Each pass measures the distance of every point between two kept points to
+    the segment joining them in one vectorized step.
+    """
+    import numpy as np
+    count = len(x)
+    if count < 3:
+        return np.arange(count)
+    
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        length_sq = dx * dx + dy * dy
+        t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0) if length_sq else 0.0
+        distances = np.hypot(px - t * dx, py - t * dy)
+        
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    
+    return np.flatnonzero(keep)
 
-@app.route('/api/public/<token>/content/date/<date>')
-def get_public_content_by_date(token, date):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
-        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+def encode_polyline(latitudes, longitudes, precision=5):
+    """Encode coordinates with the Google encoded polyline algorithm"""
+    import numpy as np
+    coordinates = np.floor(np.column_stack([latitudes, longitudes]) * 10 ** precision + 0.5).astype(np.int64)
+    deltas = np.diff(coordinates, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = (deltas << 1) ^ (deltas >> 63)  # Zigzag: negative deltas become odd numbers
+    
+    encoded = bytearray()
+    for value in values.tolist():
+        while value >= 0x20:
+            encoded.append((0x20 | (value & 0x1f)) + 63)
+            value >>= 5
+        encoded.append(value + 63)
+    return encoded.decode('ascii')
+
+def build_route(trip_id, zoom):
+    _, latitudes, longitudes = load_trip_points(trip_id)
+    x, y = mercator_project(latitudes, longitudes)
+    keep = simplify_track(x, y, ROUTE_TOLERANCE_PIXELS / (256 << zoom))
+    return {
+        'zoom': zoom,
+        'points': len(keep),
+        'total_points': len(latitudes),
+        'polyline': encode_polyline(latitudes[keep], longitudes[keep])
+    }
+
+def route_response(trip_id):
+    zoom = request.args.get('zoom', MAX_MAP_ZOOM, type=int)
+    if not 0 <= zoom <= MAX_MAP_ZOOM:
+        return jsonify({'error': f'zoom must be an integer between 0 and {MAX_MAP_ZOOM}'}), 400
+    
+    return conditional_json(trip_cache.get_or_compute(
+        trip_id, ('route', zoom), lambda: build_route(trip_id, zoom), version=trip_content_version(trip_id)
+    ))
+
+def clusters_response(trip_id, entry_serializer):
+    import numpy as np
+    zoom = request.args.get('zoom', type=int)
+    if zoom is None or not 0 <= zoom <= MAX_MAP_ZOOM:
+        return jsonify({'error': f'zoom must be an integer between 0 and {MAX_MAP_ZOOM}'}), 400
+    
+    bbox = None
+    if 'bbox' in request.args:
+        bbox = parse_bbox(request.args['bbox'])
+        if not bbox:
+            return jsonify({'error': 'bbox must be west,south,east,north in degrees'}), 400
+    limit = min(max(request.args.get('limit', 1000, type=int), 1), MAX_VIEWPORT_RESULTS)
+    
+    level = get_cluster_pyramid(trip_id)[zoom]
+    bounds = level['bounds']
+    visible = np.ones(len(bounds), dtype=bool)
+    if bbox:
+        west, south, east, north = bbox
+        lng_ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+        in_lng = np.zeros(len(bounds), dtype=bool)
+        for min_lng, max_lng in lng_ranges:
+            in_lng |= (bounds[:, 2] >= min_lng) & (bounds[:, 0] <= max_lng)
+        visible = in_lng & (bounds[:, 3] >= south) & (bounds[:, 1] <= north)
+    
+    indices = np.flatnonzero(visible)
+    truncated = len(indices) > limit
+    indices = indices[:limit]
+    
+    entry_ids = level['entry_id'][indices].tolist()
+    entries = Entry.query.options(joinedload(Entry.traveler)).filter(Entry.id.in_(entry_ids)).all()
+    entries_by_id = {entry.id: entry for entry in entries}
+    
+    clusters = []
+    for index, entry_id in zip(indices.tolist(), entry_ids):
+        entry = entries_by_id.get(entry_id)
+        clusters.append({
+            'latitude': float(level['latitude'][index]),
+            'longitude': float(level['longitude'][index]),
+            'count': int(level['count'][index]),
+            'bounds': bounds[index].tolist(),
+            'entry': entry_serializer(entry) if entry else None
+        })
+    
+    return jsonify({'zoom': zoom, 'bbox': list(bbox) if bbox else None, 'clusters': clusters, 'truncated': truncated})
+
+# Trip statistics
+def load_trip_track(trip_id):
+    """Return latitude, longitude, timestamp, local day (both as Julian days) and traveler id arrays
+    of a trip's geotagged entries in time order
+    
+    Dates are fetched as SQLite julianday() numbers so the whole track loads
+    straight into one float array without building datetime objects.
+    """
+    import numpy as np
+    rows = db.session.query(
+        Entry.latitude, Entry.longitude,
+        db.func.julianday(Entry.timestamp), db.func.julianday(Entry.entry_date),
+        Entry.traveler_id
+    ).filter(
+        Entry.trip_id == trip_id,
+        Entry.latitude.isnot(None),
+        Entry.longitude.isnot(None)
+    ).order_by(Entry.timestamp, Entry.id).all()
+    
+    return np.array([tuple(row) for row in rows], dtype=np.float64).reshape(-1, 5).T
+
+def compute_trip_stats(trip_id):
+    """Statistics of a trip's geotagged entries, see trip_stats.summarize_track()"""
+    track = load_trip_track(trip_id)
+    names = dict(db.session.query(Traveler.id, Traveler.name).filter(Traveler.trip_id == trip_id).all())
+    return summarize_track(*track, names)
+
+def stats_response(trip_id):
+    return conditional_json(trip_cache.get_or_compute(
+        trip_id, 'stats', lambda: compute_trip_stats(trip_id), version=trip_content_version(trip_id)
+    ))
+
+# Full-text search queries
+MAX_SEARCH_RESULTS = 100
+SEARCH_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+SNIPPET_START, SNIPPET_END = '\ue000', '\ue001'  # Private-use characters marking matches in FTS5 snippets
+
+def highlight_snippet(snippet):
+    """HTML-escape a snippet of user or AI text, then wrap its matches in <mark>"""
+    return html.escape(snippet or '').replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+def build_search_match(trip_id, text_column, query_text):
+    """Turn free text into an FTS5 MATCH expression scoped to one trip
+    
+    Each word becomes a quoted prefix term, so user input can never inject
+    FTS5 syntax. Returns None when the query has no searchable words.
+    """
+    terms = SEARCH_TERM_PATTERN.findall(query_text or '')
+    if not terms:
+        return None
+    phrase = ' '.join(f'"{term}"*' for term in terms[:20])
+    return f'trip_id : "{int(trip_id)}" AND {text_column} : ({phrase})'
+
+def search_trip(trip_id, query_text, limit=20, include_entries=False):
+    """Search a trip's content pieces (and optionally raw entries), best BM25 matches first"""
+    limit = min(max(limit, 1), MAX_SEARCH_RESULTS)
+    results = []
+    
+    content_match = build_search_match(trip_id, 'generated_content', query_text)
+    if not content_match:
+        return results
+    
+    rows = db.session.execute(text("""
+        SELECT trip_content.id, trip_content.timestamp, trip_content.content_date,
+               snippet(trip_content_fts, 0, :start, :end, '…', 16) AS snippet,
+               bm25(trip_content_fts, 1.0, 0.0) AS rank
+        FROM trip_content_fts JOIN trip_content ON trip_content.id = trip_content_fts.rowid
+        WHERE trip_content_fts MATCH :match
+        ORDER BY rank LIMIT :limit
+    """), {'match': content_match, 'limit': limit, 'start': SNIPPET_START, 'end': SNIPPET_END})
+    for content_id, timestamp, content_date, snippet, rank in rows:
+        results.append({
+            'type': 'content',
+            'id': content_id,
+            'timestamp': timestamp,
+            'date': content_date,
+            'snippet': highlight_snippet(snippet),
+            'rank': rank
+        })
+    
+    if include_entries:
+        rows = db.session.execute(text("""
+            SELECT entry.id, entry.timestamp, entry.entry_date, entry.content_type,
+                   snippet(entry_fts, 0, :start, :end, '…', 16) AS snippet,
+                   bm25(entry_fts, 1.0, 0.0) AS rank
+            FROM entry_fts JOIN entry ON entry.id = entry_fts.rowid
+            WHERE entry_fts MATCH :match
+            ORDER BY rank LIMIT :limit
+        """), {'match': build_search_match(trip_id, 'content', query_text), 'limit': limit,
+                'start': SNIPPET_START, 'end': SNIPPET_END})
+        for entry_id, timestamp, entry_date, content_type, snippet, rank in rows:
+            results.append({
+                'type': 'entry',
+                'id': entry_id,
+                'content_type': content_type,
+                'timestamp': timestamp,
+                'date': entry_date,
+                'snippet': highlight_snippet(snippet),
+                'rank': rank
+            })
+        results.sort(key=lambda result: result['rank'])
+        results = results[:limit]
+    
+    for result in results:
+        # Raw SQL returns SQLite's stored text for dates and times
+        if result['timestamp']:
+            result['timestamp'] = timestamp_to_iso(datetime.fromisoformat(result['timestamp']))
+    
+    return results
+
+def search_response(trip_id, include_entries):
+    query_text = request.args.get('q', '').strip()
+    if not query_text:
+        return jsonify({'error': 'Search query (q) is required'}), 400
     
     try:
-        # Parse the date string
-        from datetime import datetime
-        target_date = datetime.strptime(date, '%Y-%m-%d').date()
+        results = search_trip(trip_id, query_text, request.args.get('limit', 20, type=int), include_entries)
+    except Exception as e:
+        print(f"❌ Search error: {e}")
+        return jsonify({'error': 'Search is not available'}), 503
+    
+    return jsonify({'query': query_text, 'results': results})
+
+# Listing pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+
+def encode_cursor(timestamp, row_id):
+    """Encode a (timestamp, id) keyset position as an opaque cursor string"""
+    raw = f"{timestamp.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode a cursor created by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+def paginated_response(query, model, serialize):
+    """Return a newest-first listing as a full array, a keyset page or an NDJSON stream
+    
+    Without query parameters the whole listing is returned as a JSON array.
+    `limit` and/or `cursor` switch to keyset pagination on (timestamp, id) and
+    return {'items': [...], 'next': cursor-or-null}. `format=ndjson` streams
+    one JSON object per line, fetching rows from the database in batches; it
+    honours `cursor` and `limit` too and sends the next cursor, if any, in the
+    X-Next-Cursor header.
+    """
+    query = query.order_by(model.timestamp.desc(), model.id.desc())
+    
+    try:
+        limit = int(request.args['limit']) if 'limit' in request.args else None
     except ValueError:
-        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+        return jsonify({'error': 'Invalid limit'}), 400
     
-    # Get entries for the specific date
-    entries = Entry.query.filter(
-        Entry.trip_id == trip.id,
-        db.func.date(Entry.timestamp) == target_date
-    ).order_by(Entry.timestamp.asc()).all()
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_timestamp, cursor_id = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            model.timestamp < cursor_timestamp,
+            and_(model.timestamp == cursor_timestamp, model.id < cursor_id)
+        ))
     
-    # Get content pieces for the specific date
-    content_pieces = TripContent.query.filter_by(
-        trip_id=trip.id, 
-        content_date=target_date
-    ).order_by(TripContent.timestamp.asc()).all()
+    if request.args.get('format') == 'ndjson':
+        headers = {}
+        if limit is not None:
+            # Streams are not capped at MAX_PAGE_SIZE; the next cursor is known before the first row is sent
+            limit = max(limit, 1)
+            boundary = query.with_entities(model.timestamp, model.id).offset(limit - 1).limit(2).all()
+            if len(boundary) == 2:
+                headers['X-Next-Cursor'] = encode_cursor(*boundary[0])
+            query = query.limit(limit)
+        
+        def generate():
+            for row in query.yield_per(STREAM_BATCH_SIZE):
+                yield current_app.json.dumps(serialize(row)) + '\n'
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers=headers)
+    
+    if limit is None and not cursor:
+        return jsonify([serialize(row) for row in query.all()])
+    
+    return jsonify(fetch_page(query, serialize, limit))
+
+def fetch_page(query, serialize, limit=None):
+    """One keyset page of an ordered listing query as {'items': [...], 'next': cursor-or-null}"""
+    limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    
+    return {
+        'items': [serialize(row) for row in rows],
+        'next': encode_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None
+    }
+
+# Delta sync
+def changes_response(trip_id, entry_serializer):
+    """Entries and content pieces changed or deleted after the ?since= cursor, plus the next cursor
+    
+    Cursors are the trip's content_version. The cursor is read before the rows,
+    so a change committed meanwhile is sent again next time rather than missed.
+    Without since, the whole trip is returned. So is it, with reset set, when
+    since predates the trip's sync_horizon (tombstones it needs were pruned).
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    cursor, horizon = db.session.query(Trip.content_version, Trip.sync_horizon).filter(Trip.id == trip_id).one()
+    reset = 0 < since < horizon
+    if reset:
+        since = 0
+    
+    entries = Entry.query.options(joinedload(Entry.traveler)).filter(
+        Entry.trip_id == trip_id, Entry.sync_version > since
+    ).order_by(Entry.timestamp.asc(), Entry.id.asc()).all()
+    content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter(
+        TripContent.trip_id == trip_id, TripContent.sync_version > since
+    ).order_by(TripContent.timestamp.asc(), TripContent.id.asc()).all()
+    tombstones = db.session.query(SyncTombstone.row_type, SyncTombstone.row_id).filter(
+        SyncTombstone.trip_id == trip_id, SyncTombstone.sync_version > since
+    )
+    
+    # Ids can be reused by SQLite after a delete; a row that exists again is not deleted
+    existing = {'entry': {entry.id for entry in entries}, 'content': {content.id for content in content_pieces}}
+    deleted = {'entry': set(), 'content': set()}
+    for row_type, row_id in tombstones:
+        if row_id not in existing[row_type]:
+            deleted[row_type].add(row_id)
     
     return jsonify({
-        'date': date,
-        'entries': [{
-            'id': entry.id,
-            'content_type': entry.content_type,
-            'content': entry.content,
-            'latitude': entry.latitude,
-            'longitude': entry.longitude,
-            'timestamp': timestamp_to_iso(entry.timestamp),
-            'traveler_name': entry.traveler.name,
-            'filename': entry.filename
-        } for entry in entries],
-        'content_pieces': [{
-            'id': content.id,
-            'timestamp': timestamp_to_iso(content.timestamp),
-            'generated_content': content.generated_content,
-            'latitude': content.latitude,
-            'longitude': content.longitude,
-            'original_text': content.original_text,
-            'entry_ids': json.loads(content.entry_ids) if content.entry_ids else []
-        } for content in content_pieces]
+        'since': str(since),
+        'cursor': str(cursor),
+        'reset': reset,
+        'entries': [entry_serializer(entry) for entry in entries],
+        'content_pieces': [content_to_dict(content) for content in content_pieces],
+        'deleted': {'entries': sorted(deleted['entry']), 'content_pieces': sorted(deleted['content'])}
     })
 
-@app.route('/api/public/<token>/reactions/<int:content_id>')
-def get_reactions(token, content_id):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
+# Public blog bundle: everything the public blog view needs on first load in one response
+BUNDLE_FIELDS = ('trip', 'content', 'entries', 'calendar', 'reactions')
+
+def build_trip_bundle(trip, fields, limit):
+    """Trip metadata, first content page, entries and calendar counts (reactions are added per request)"""
+    bundle = {}
+    if 'trip' in fields:
+        bundle['trip'] = {**blog_to_dict(trip), 'reactions_enabled': trip.reactions_enabled}
+    if 'content' in fields:
+        content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter(
+            TripContent.trip_id == trip.id
+        ).order_by(TripContent.timestamp.desc(), TripContent.id.desc())
+        bundle['content'] = fetch_page(content_pieces, content_to_dict, limit)
+    if 'entries' in fields:
+        entries = Entry.query.options(joinedload(Entry.traveler)).filter(
+            Entry.trip_id == trip.id
+        ).order_by(Entry.timestamp.desc(), Entry.id.desc()).all()
+        bundle['entries'] = [public_entry_to_dict(entry) for entry in entries]
+    if 'calendar' in fields:
+        if 'entries' in fields:
+            # Count the entries already loaded instead of querying them again
+            bundle['calendar'] = calendar_from_counts(
+                (day, content_type, count)
+                for (day, content_type), count in Counter((entry.entry_date, entry.content_type) for entry in entries).items()
+            )
+        else:
+            bundle['calendar'] = build_calendar_data(trip.id)
+    return bundle
+
+def trip_bundle_response(trip):
+    """Serve the bundle for ?fields= (default: all), with a strong ETag over the whole response
+    
+    Reaction counts change without bumping the trip's content_version, so
+    bundles with reactions cache the rest per version and add fresh counts
+    for the content page; bundles without them are cached whole.
+    """
+    requested = request.args.get('fields')
+    fields = tuple(field.strip() for field in requested.split(',') if field.strip()) if requested else BUNDLE_FIELDS
+    unknown = set(fields) - set(BUNDLE_FIELDS)
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}", 'fields': list(BUNDLE_FIELDS)}), 400
+    limit = request.args.get('limit', type=int)
+    trip_row = db.session.get(Trip, trip.id)
+    if trip_row is None or trip_row.deleted_at or not trip_row.public_enabled:  # changed since the lookup was cached
         return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
     
-    # Check if content piece exists and belongs to this trip
-    content_piece = TripContent.query.filter_by(id=content_id, trip_id=trip.id).first()
-    if not content_piece:
-        return jsonify({'error': 'Content not found'}), 404
-    
-    # Get all reactions for this content piece
-    reactions = PostReaction.query.filter_by(content_piece_id=content_id).all()
-    
-    # Return reaction counts
-    reaction_counts = {
-        'like': 0,
-        'applause': 0,
-        'support': 0,
-        'love': 0,
-        'insightful': 0,
-        'funny': 0
-    }
+    if 'reactions' not in fields:
+        return cached_trip_response(trip, lambda: jsonify(build_trip_bundle(trip_row, fields, limit)))
     
-    for reaction in reactions:
-        if reaction.reaction_type in reaction_counts:
-            reaction_counts[reaction.reaction_type] = reaction.count
+    static_fields = tuple(sorted(set(fields) | {'content'}))
+    bundle = trip_cache.get_or_compute(
+        trip.id, ('bundle', static_fields, limit), lambda: build_trip_bundle(trip_row, static_fields, limit),
+        version=trip_row.content_version
+    )
+    
+    reactions = {}
+    if trip_row.reactions_enabled and bundle['content']['items']:
+        content_ids = [item['id'] for item in bundle['content']['items']]
+        reactions = {
+            str(content_id): counts
+            for content_id, counts in sorted(get_trip_reaction_counts(trip.id, content_ids).items())
+        }
     
-    return jsonify(reaction_counts)
+    payload = {field: bundle[field] for field in fields if field != 'reactions'}
+    payload['reactions'] = reactions
+    return conditional_json(payload)
 
-@app.route('/api/public/<token>/reactions/<int:content_id>', methods=['POST'])
-def add_reaction(token, content_id):
-    trip = Trip.query.filter_by(public_token=token, public_enabled=True).first()
-    if not trip:
-        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+# Static site export: a public trip rendered to plain files that nginx or a CDN can serve
+STATIC_EXPORT_PHOTO_SIZE = int(os.getenv('STATIC_EXPORT_PHOTO_SIZE', 1600))
+STATIC_EXPORT_POOL_MIN = 8  # Fewer media files than this are processed without a process pool
+STATIC_EXPORT_MANIFEST = 'manifest.json'
+STATIC_EXPORT_CSS = """
+body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; margin: 0; color: #222; background: #fafafa; }
+main { max-width: 760px; margin: 0 auto; padding: 24px 16px 48px; }
+header h1 { margin-bottom: 4px; }
+nav { display: flex; justify-content: space-between; margin: 24px 0; }
+a { color: #1a6fb5; }
+article { background: #fff; border-radius: 8px; padding: 16px 20px; margin: 16px 0; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.08); }
+article time { color: #777; font-size: 0.9em; }
+figure { margin: 16px 0; }
+figure img { max-width: 100%; height: auto; border-radius: 6px; }
+audio { width: 100%; }
+ul.days li { margin: 6px 0; }
+"""
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+def hashed_name(name, digest):
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{digest}{extension}"
+
+def render_inline_markdown(text):
+    """Escape text and convert **bold**, *italic*, `code` and http(s) [links](...)"""
+    text = html.escape(text, quote=False)
+    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    text = re.sub(r'(?<![\w*])[*_](?![\s*_])(.+?)(?<![\s*_])[*_](?![\w*])', r'<em>\1</em>', text)
+    return re.sub(
+        r'\[([^\]]+)\]\((https?://[^\s)"]+)\)',
+        lambda match: f'<a href="{match.group(2)}">{match.group(1)}</a>',
+        text
+    )
+
+def render_markdown(text, render_photo):
+    """Render the markdown subset of generated blog text to HTML
+    
+    Handles headings, paragraphs, bullet and numbered lists and inline
+    formatting. [PHOTO:<entry id>] markers are replaced by render_photo(id).
+    """
+    blocks = []
+    for block in re.split(r'\n\s*\n', text.strip()):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        if not lines:
+            continue
+        
+        photo = re.fullmatch(r'\[PHOTO:(\d+)\]', lines[0])
+        heading = re.match(r'(#{1,6})\s+(.*)', lines[0])
+        if len(lines) == 1 and photo:
+            blocks.append(render_photo(int(photo.group(1))))
+        elif len(lines) == 1 and heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{render_inline_markdown(heading.group(2))}</h{level}>")
+        elif all(re.match(r'[-*+]\s+', line) for line in lines):
+            items = ''.join(f"<li>{render_inline_markdown(line[2:].strip())}</li>" for line in lines)
+            blocks.append(f"<ul>{items}</ul>")
+        elif all(re.match(r'\d+[.)]\s+', line) for line in lines):
+            items = ''.join(f"<li>{render_inline_markdown(line.split(maxsplit=1)[1])}</li>" for line in lines)
+            blocks.append(f"<ol>{items}</ol>")
+        else:
+            paragraph = render_inline_markdown(' '.join(lines))
+            paragraph = re.sub(r'\[PHOTO:(\d+)\]', lambda match: render_photo(int(match.group(1))), paragraph)
+            blocks.append(f"<p>{paragraph}</p>")
+    return '\n'.join(blocks)
+
+def export_media_file(source_path, media_dir, max_size):
+    """Write one upload to media_dir under a content-hashed name and return that name
     
-    # Check if content piece exists and belongs to this trip
-    content_piece = TripContent.query.filter_by(id=content_id, trip_id=trip.id).first()
-    if not content_piece:
-        return jsonify({'error': 'Content not found'}), 404
+    Photos are re-encoded as JPEG no larger than max_size pixels; other files
+    are copied as they are. Runs in export worker processes.
+    """
+    name = os.path.basename(source_path)
+    if is_image_file(name):
+        from PIL import Image, ImageOps
+        with Image.open(source_path) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=82, optimize=True)
+        data = buffer.getvalue()
+        output_name = hashed_name(os.path.splitext(name)[0] + '.jpg', content_hash(data))
+        output_path = os.path.join(media_dir, output_name)
+        if not os.path.exists(output_path):
+            write_file_atomic(output_path, data)
+        return output_name
     
-    data = request.get_json()
-    reaction_type = data.get('reaction_type')
-    action = data.get('action')  # 'add' or 'remove'
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as source:
+        for chunk in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(chunk)
+    output_name = hashed_name(name, digest.hexdigest()[:12])
+    output_path = os.path.join(media_dir, output_name)
+    if not os.path.exists(output_path):
+        shutil.copyfile(source_path, output_path + '.tmp')
+        os.replace(output_path + '.tmp', output_path)
+    return output_name
+
+def write_file_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as output:
+        output.write(data)
+    os.replace(path + '.tmp', path)
+
+def render_static_page(trip, title, body, css_path, root):
+    return f"""<!DOCTYPE html>
+<html lang="{html.escape(trip.blog_language or 'en')}">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<link rel="stylesheet" href="{root}{css_path}">
+</head>
+<body>
+<main>
+{body}
+</main>
+</body>
+</html>
+"""
+
+def render_day_page(trip, day, content_pieces, entries_by_id, media, previous_day, next_day, css_path):
+    def media_url(entry):
+        return f"../media/{media[entry.filename]}" if entry and entry.filename in media else None
     
-    # Validate reaction type
-    valid_reactions = ['like', 'applause', 'support', 'love', 'insightful', 'funny']
-    if reaction_type not in valid_reactions:
-        return jsonify({'error': 'Invalid reaction type'}), 400
+    def render_photo(entry_id):
+        entry = entries_by_id.get(entry_id)
+        url = media_url(entry) if entry and entry.content_type == 'photo' else None
+        return f'<figure><img src="{url}" alt="" loading="lazy"></figure>' if url else ''
     
-    # Validate action
-    if action not in ['add', 'remove']:
-        return jsonify({'error': 'Action must be "add" or "remove"'}), 400
+    articles = []
+    for content in content_pieces:
+        text = content.generated_content
+        extras = []
+        for entry_id in content.entry_id_list:
+            entry = entries_by_id.get(entry_id)
+            if not entry or not media_url(entry):
+                continue
+            if entry.content_type == 'photo' and f'[PHOTO:{entry_id}]' not in text:
+                extras.append(render_photo(entry_id))
+            elif entry.content_type == 'audio':
+                extras.append(f'<audio controls preload="none" src="{media_url(entry)}"></audio>')
+        articles.append(
+            f'<article id="post-{content.id}">\n'
+            f'<time datetime="{timestamp_to_iso(content.timestamp)}">{html.escape(format_timestamp_local(content.timestamp))}</time>\n'
+            f'{render_markdown(text, render_photo)}\n{"".join(extras)}\n</article>'
+        )
     
-    # Get or create the reaction record
-    reaction = PostReaction.query.filter_by(
-        content_piece_id=content_id, 
-        reaction_type=reaction_type
-    ).first()
+    links = [
+        f'<a href="{previous_day}.html">← {previous_day}</a>' if previous_day else '<span></span>',
+        '<a href="../index.html">↑</a>',
+        f'<a href="{next_day}.html">{next_day} →</a>' if next_day else '<span></span>',
+    ]
+    body = (
+        f'<header><h1>{html.escape(trip.name)}</h1><p>{day}</p></header>\n'
+        + '\n'.join(articles)
+        + f'\n<nav>{"".join(links)}</nav>'
+    )
+    return render_static_page(trip, f'{trip.name} – {day}', body, css_path, '../')
+
+def render_index_page(trip, days, css_path):
+    items = ''.join(
+        f'<li><a href="days/{day}.html">{day}</a> ({count} {"post" if count == 1 else "posts"})</li>'
+        for day, count in days
+    )
+    body = (
+        f'<header><h1>{html.escape(trip.name)}</h1>'
+        f'<p>{html.escape(trip.description or "")}</p></header>\n'
+        f'<ul class="days">{items}</ul>'
+    )
+    return render_static_page(trip, trip.name, body, css_path, '')
+
+def export_static_site(trip, output_dir, workers=None, on_progress=None):
+    """Render a trip into output_dir as a self-contained static site, incrementally
     
-    if not reaction:
-        reaction = PostReaction(
-            trip_id=trip.id,
-            content_piece_id=content_id,
-            reaction_type=reaction_type,
-            count=0
+    Writes index.html, one page per day under days/, JSON snapshots under data/,
+    resized photos and audio under media/ and the stylesheet under assets/,
+    the last three with content-hashed names. manifest.json remembers what was
+    written: pages whose bytes did not change and uploads whose size and
+    modification time did not change are left alone, and files of days or
+    uploads that no longer exist are removed. New uploads are processed in a
+    pool of `workers` processes (default: one per CPU); on_progress(done, total)
+    is called after each of them.
+    """
+    manifest_path = os.path.join(output_dir, STATIC_EXPORT_MANIFEST)
+    try:
+        with open(manifest_path) as manifest_file:
+            previous = json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        previous = {}
+    previous_pages = previous.get('pages', {})
+    previous_media = previous.get('media', {})
+    stats = dict.fromkeys(('pages_written', 'pages_unchanged', 'media_written', 'media_unchanged', 'files_removed'), 0)
+    
+    entries = Entry.query.options(joinedload(Entry.traveler)).filter_by(trip_id=trip.id).order_by(
+        Entry.timestamp.asc(), Entry.id.asc()
+    ).all()
+    content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter_by(trip_id=trip.id).order_by(
+        TripContent.timestamp.asc(), TripContent.id.asc()
+    ).all()
+    
+    # Media: only uploads that are new or changed since the last export are processed
+    media_dir = os.path.join(output_dir, 'media')
+    os.makedirs(media_dir, exist_ok=True)
+    media_manifest, pending = {}, []
+    for entry in entries:
+        if not entry.filename or entry.content_type not in ('photo', 'audio') or entry.filename in media_manifest:
+            continue
+        source_path = os.path.join(current_app.config['UPLOAD_FOLDER'], entry.filename)
+        try:
+            source = os.stat(source_path)
+        except FileNotFoundError:
+            continue
+        signature = [source.st_size, source.st_mtime_ns, STATIC_EXPORT_PHOTO_SIZE]
+        cached = previous_media.get(entry.filename)
+        if cached and cached['signature'] == signature and os.path.exists(os.path.join(media_dir, cached['name'])):
+            media_manifest[entry.filename] = cached
+            stats['media_unchanged'] += 1
+        else:
+            media_manifest[entry.filename] = {'signature': signature}
+            pending.append((entry.filename, source_path))
+    
+    if pending:
+        sources = [source_path for _, source_path in pending]
+        
+        def record(names):
+            for done, ((filename, _), name) in enumerate(zip(pending, names), 1):
+                media_manifest[filename]['name'] = name
+                if on_progress:
+                    on_progress(done, len(pending))
+        
+        if len(pending) >= STATIC_EXPORT_POOL_MIN and workers != 1:
+            # spawn: forking a threaded server process could copy held locks into the children
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+                record(pool.map(export_media_file, sources, repeat(media_dir), repeat(STATIC_EXPORT_PHOTO_SIZE),
+                                chunksize=max(len(pending) // (4 * (workers or os.cpu_count() or 1)), 1)))
+        else:
+            record(export_media_file(source_path, media_dir, STATIC_EXPORT_PHOTO_SIZE) for source_path in sources)
+        stats['media_written'] = len(pending)
+    media = {filename: cached['name'] for filename, cached in media_manifest.items()}
+    
+    # Pages, snapshots and assets: written only when their bytes changed
+    pages = {}
+    
+    def write_if_changed(relative_path, data):
+        digest = content_hash(data)
+        pages[relative_path] = digest
+        if previous_pages.get(relative_path) == digest and os.path.exists(os.path.join(output_dir, relative_path)):
+            stats['pages_unchanged'] += 1
+        else:
+            write_file_atomic(os.path.join(output_dir, relative_path), data)
+            stats['pages_written'] += 1
+    
+    css = STATIC_EXPORT_CSS.encode('utf-8')
+    css_path = f"assets/{hashed_name('style.css', content_hash(css))}"
+    write_if_changed(css_path, css)
+    
+    entries_by_id = {entry.id: entry for entry in entries}
+    days = {}
+    for content in content_pieces:
+        days.setdefault(content.content_date.isoformat(), []).append(content)
+    day_names = list(days)
+    for index, day in enumerate(day_names):
+        page = render_day_page(
+            trip, day, days[day], entries_by_id, media,
+            day_names[index - 1] if index > 0 else None,
+            day_names[index + 1] if index + 1 < len(day_names) else None,
+            css_path
         )
-        db.session.add(reaction)
+        write_if_changed(f'days/{day}.html', page.encode('utf-8'))
+    write_if_changed('index.html', render_index_page(
+        trip, [(day, len(days[day])) for day in day_names], css_path
+    ).encode('utf-8'))
+    
+    snapshots = {
+        'trip': {**blog_to_dict(trip), 'reactions_enabled': trip.reactions_enabled},
+        'content': [content_to_dict(content) for content in content_pieces],
+        'entries': [
+            {**public_entry_to_dict(entry), 'media': f"media/{media[entry.filename]}" if entry.filename in media else None}
+            for entry in entries
+        ],
+        'calendar': build_calendar_data(trip.id),
+    }
+    for name, snapshot in snapshots.items():
+        write_if_changed(f'data/{name}.json', json.dumps(snapshot, ensure_ascii=False, sort_keys=True).encode('utf-8'))
     
-    # Update count based on action
-    if action == 'add':
-        reaction.count += 1
-    elif action == 'remove' and reaction.count > 0:
-        reaction.count -= 1
+    # Remove what earlier exports wrote for days and uploads that are gone
+    current_media = set(media.values())
+    stale = [path for path in previous_pages if path not in pages]
+    stale += [f"media/{cached['name']}" for cached in previous_media.values()
+              if cached.get('name') and cached['name'] not in current_media]
+    for relative_path in stale:
+        try:
+            os.remove(os.path.join(output_dir, relative_path))
+            stats['files_removed'] += 1
+        except FileNotFoundError:
+            pass
     
-    reaction.updated_at = datetime.utcnow()
+    write_file_atomic(manifest_path, json.dumps({
+        'trip_id': trip.id,
+        'content_version': trip.content_version,
+        'exported_at': timestamp_to_iso(datetime.utcnow()),
+        'pages': pages,
+        'media': media_manifest,
+    }, indent=2, sort_keys=True).encode('utf-8'))
     
+    return stats
+
+def static_export_dir(trip_id):
+    return os.path.join(current_app.config['STATIC_EXPORT_FOLDER'], f'trip-{trip_id}')
+
+def static_export_status_path(trip_id):
+    return os.path.join(current_app.config['STATIC_EXPORT_FOLDER'], f'trip-{trip_id}.status.json')
+
+def lock_static_export(trip_id):
+    """Open and lock the trip's export lock file, returning it (None while another export holds it)"""
+    folder = current_app.config['STATIC_EXPORT_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    lock_file = open(os.path.join(folder, f'trip-{trip_id}.lock'), 'w')
     try:
-        db.session.commit()
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def read_static_export_status(trip_id):
+    """Status of the trip's last export as written by StaticExporter ('idle' if there was none)"""
+    try:
+        with open(static_export_status_path(trip_id)) as status_file:
+            status = json.load(status_file)
+    except (FileNotFoundError, ValueError):
+        return {'status': 'idle'}
+    if status.get('status') == 'running':
+        # A running export holds the lock; a free lock means its process died
+        lock_file = lock_static_export(trip_id)
+        if lock_file is not None:
+            lock_file.close()
+            status.update(status='failed', error='The export was interrupted')
+    return status
+
+class StaticExporter:
+    """Static site exports started from the admin API, each run in a thread of its own
+    
+    start() takes the trip's lock file from lock_static_export(), so only one
+    export per trip runs across all processes; the thread releases it when
+    done. Progress and the result go to a status file next to the export
+    directory, readable from any worker with read_static_export_status().
+    With background=False (tests) the export runs before start() returns.
+    """
+    
+    def __init__(self, flask_app, background=True, workers=None, progress_interval=1.0):
+        self.app = flask_app
+        self.background = background
+        self.workers = workers
+        self.progress_interval = progress_interval
+    
+    def start(self, trip_id, lock_file):
+        status = {'status': 'running', 'started_at': timestamp_to_iso(datetime.utcnow()),
+                  'media_done': 0, 'media_total': None}
+        write_file_atomic(static_export_status_path(trip_id), json.dumps(status).encode('utf-8'))
+        if self.background:
+            threading.Thread(target=self.run, args=(trip_id, lock_file, status),
+                             name=f'static-export-{trip_id}', daemon=True).start()
+        else:
+            self.run(trip_id, lock_file, status)
+    
+    def run(self, trip_id, lock_file, status):
+        with lock_file, self.app.app_context():
+            status_path = static_export_status_path(trip_id)
+            last_written = time.monotonic()
+            
+            def report(done, total):
+                nonlocal last_written
+                status.update(media_done=done, media_total=total)
+                if time.monotonic() - last_written >= self.progress_interval:
+                    write_file_atomic(status_path, json.dumps(status).encode('utf-8'))
+                    last_written = time.monotonic()
+            
+            try:
+                trip = db.session.get(Trip, trip_id)
+                if trip is None or trip.deleted_at or not trip.public_enabled:
+                    raise ValueError('Trip not found or not public')
+                stats = export_static_site(trip, static_export_dir(trip_id), self.workers, on_progress=report)
+                status.update(status='done', **stats)
+            except Exception as e:
+                print(f"❌ Static export of trip {trip_id} failed: {e}")
+                status.update(status='failed', error=str(e))
+            finally:
+                db.session.remove()
+            status['finished_at'] = timestamp_to_iso(datetime.utcnow())
+            write_file_atomic(status_path, json.dumps(status).encode('utf-8'))
+
+@click.command('export-static')
+@click.argument('trip_id', type=int)
+@click.option('--output', help='Output directory (default: STATIC_EXPORT_FOLDER/trip-<id>)')
+@click.option('--workers', type=int, help='Processes for resizing photos (default: one per CPU)')
+@click.option('--force', is_flag=True, help='Export even if public access is disabled')
+@with_appcontext
+def export_static_command(trip_id, output, workers, force):
+    """Export a trip as a static site that any web server can serve"""
+    trip = db.session.get(Trip, trip_id)
+    if trip is None or trip.deleted_at:
+        raise click.ClickException(f'Trip {trip_id} not found')
+    if not trip.public_enabled and not force:
+        raise click.ClickException(f'Trip {trip_id} is not public; enable public access or pass --force')
+    lock_file = lock_static_export(trip.id)
+    if lock_file is None:
+        raise click.ClickException(f'An export of trip {trip_id} is already running')
+    output = output or static_export_dir(trip.id)
+    with lock_file:
+        stats = export_static_site(trip, output, workers)
+    print(f"✅ Exported trip {trip.id} to {output}: {stats['pages_written']} page(s) and "
+          f"{stats['media_written']} media file(s) written, {stats['pages_unchanged']} page(s) and "
+          f"{stats['media_unchanged']} media file(s) unchanged, {stats['files_removed']} removed")
+
+# Trip archives: a whole trip as one ZIP (JSON rows, the blog as Markdown and the uploads),
+# streamed without temp files and byte-for-byte reproducible so downloads can be resumed
+ARCHIVE_FORMAT = 'roadweave-trip-archive'
+ARCHIVE_VERSION = 1
+ARCHIVE_CHUNK_SIZE = 64 * 1024
+ARCHIVE_ZIP64_LIMIT = zipfile.ZIP64_LIMIT  # Sizes and offsets from here on need ZIP64 records
+ARCHIVE_COLUMNS = {
+    'trip': ('name', 'description', 'admin_token', 'created_at', 'blog_content', 'blog_language',
+             'public_enabled', 'public_token', 'reactions_enabled'),
+    'travelers': ('id', 'name', 'token', 'created_at'),
+    'entries': ('id', 'traveler_id', 'content_type', 'content', 'latitude', 'longitude', 'timestamp',
+                'filename', 'disabled', 'place_name'),
+    'content': ('id', 'timestamp', 'generated_content', 'latitude', 'longitude', 'original_text', 'content_date'),
+    'reactions': ('content_piece_id', 'reaction_type', 'count', 'created_at', 'updated_at'),
+}
+
+ArchiveMember = namedtuple('ArchiveMember', ['name', 'size', 'modified', 'data', 'path'])
+
+def archive_row(row, columns):
+    record = {}
+    for name in columns:
+        value = getattr(row, name)
+        record[name] = value.isoformat() if isinstance(value, (date, datetime)) else value
+    return record
+
+def restore_row(model, record, columns):
+    """Column values of an archived row, dates and timestamps parsed back"""
+    values = {}
+    for name in columns:
+        value = record.get(name)
+        column_type = model.__table__.c[name].type
+        if value is not None and isinstance(column_type, db.DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column_type, db.Date):
+            value = date.fromisoformat(value)
+        values[name] = value
+    return values
+
+def render_blog_markdown(trip, content_pieces):
+    parts = [f'# {trip.name}']
+    if trip.description:
+        parts.append(trip.description)
+    current_day = None
+    for content in content_pieces:
+        if content.content_date != current_day:
+            current_day = content.content_date
+            parts.append(f'## {current_day.isoformat()}')
+        parts.append(content.generated_content.strip())
+    return '\n\n'.join(parts) + '\n'
+
+def build_trip_archive(trip):
+    """Archive members of a trip: JSON documents in memory, uploads as (path, size) to stream later"""
+    travelers = Traveler.query.filter_by(trip_id=trip.id).order_by(Traveler.id).all()
+    entries = Entry.query.filter_by(trip_id=trip.id).order_by(Entry.id).all()
+    content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter_by(
+        trip_id=trip.id
+    ).order_by(TripContent.content_date, TripContent.timestamp, TripContent.id).all()
+    reactions = PostReaction.query.filter_by(trip_id=trip.id).order_by(PostReaction.id).all()
+    
+    documents = {
+        'trip.json': archive_row(trip, ARCHIVE_COLUMNS['trip']),
+        'travelers.json': [archive_row(traveler, ARCHIVE_COLUMNS['travelers']) for traveler in travelers],
+        'entries.json': [archive_row(entry, ARCHIVE_COLUMNS['entries']) for entry in entries],
+        'content.json': [
+            {**archive_row(content, ARCHIVE_COLUMNS['content']),
+             'entry_ids': sorted(link.entry_id for link in content.entry_links)}
+            for content in content_pieces
+        ],
+        'reactions.json': [archive_row(reaction, ARCHIVE_COLUMNS['reactions']) for reaction in reactions],
+    }
+    documents['manifest.json'] = {
+        'format': ARCHIVE_FORMAT,
+        'version': ARCHIVE_VERSION,
+        'trip_id': trip.id,
+        'counts': {name[:-5]: len(rows) for name, rows in documents.items() if isinstance(rows, list)},
+    }
+    
+    # Generated members carry the trip creation time so identical data gives identical bytes
+    members = []
+    for name in ('manifest.json', 'trip.json', 'travelers.json', 'entries.json', 'content.json', 'reactions.json'):
+        data = json.dumps(documents[name], ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+        members.append(ArchiveMember(name, len(data), trip.created_at, data, None))
+    blog = render_blog_markdown(trip, content_pieces).encode('utf-8')
+    members.append(ArchiveMember('blog.md', len(blog), trip.created_at, blog, None))
+    
+    for filename in sorted({entry.filename for entry in entries if entry.filename}):
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        try:
+            source = os.stat(path)
+        except FileNotFoundError:
+            continue
+        members.append(ArchiveMember(f'media/{filename}', source.st_size,
+                                     datetime.fromtimestamp(source.st_mtime), None, path))
+    return members
+
+def dos_timestamp(moment):
+    moment = max(moment, datetime(1980, 1, 1))
+    return ((moment.hour << 11) | (moment.minute << 5) | (moment.second // 2),
+            ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day)
+
+class ZipStream:
+    """Layout of a stored (uncompressed) ZIP archive whose bytes can be generated from any offset
+    
+    Every header size is known before any data is read, so the total length and
+    the position of every member are computed up front. CRCs are only known
+    once the data has been read, so they follow each member in a data
+    descriptor and are repeated in the central directory. Members that need
+    it, and the archive end, use ZIP64 records.
+    """
+    FLAGS = 0x08 | 0x800  # CRC and sizes in a data descriptor, UTF-8 names
+    
+    def __init__(self, members):
+        self.members = members
+        self.layout = []
+        offset = 0
+        for member in members:
+            name = member.name.encode('utf-8')
+            zip64 = member.size >= ARCHIVE_ZIP64_LIMIT
+            time_field, date_field = dos_timestamp(member.modified)
+            extra = struct.pack('<HHQQ', 1, 16, 0, 0) if zip64 else b''
+            header = struct.pack(
+                '<4s2B4HL2L2H', b'PK\x03\x04', 45 if zip64 else 20, 0, self.FLAGS, zipfile.ZIP_STORED,
+                time_field, date_field, 0, 0xFFFFFFFF if zip64 else 0, 0xFFFFFFFF if zip64 else 0,
+                len(name), len(extra)
+            ) + name + extra
+            self.layout.append((member, name, header, offset, zip64, time_field, date_field))
+            offset += len(header) + member.size + (24 if zip64 else 16)
+        self.directory_offset = offset
+        self.directory_size = sum(46 + len(name) + len(self._central_extra(member, offset))
+                                  for member, name, _, offset, *_ in self.layout)
+        end = self.directory_offset + self.directory_size
+        self.zip64_end = (len(members) >= 0xFFFF or self.directory_offset >= ARCHIVE_ZIP64_LIMIT
+                          or self.directory_size >= ARCHIVE_ZIP64_LIMIT)
+        self.size = end + (56 + 20 if self.zip64_end else 0) + 22
+    
+    @staticmethod
+    def _central_extra(member, offset):
+        fields = [member.size, member.size] if member.size >= ARCHIVE_ZIP64_LIMIT else []
+        if offset >= ARCHIVE_ZIP64_LIMIT:
+            fields.append(offset)
+        return struct.pack(f'<HH{len(fields)}Q', 1, 8 * len(fields), *fields) if fields else b''
+    
+    def _central_directory(self, crcs):
+        records = []
+        for (member, name, _, offset, zip64, time_field, date_field), crc in zip(self.layout, crcs):
+            extra = self._central_extra(member, offset)
+            size = 0xFFFFFFFF if member.size >= ARCHIVE_ZIP64_LIMIT else member.size
+            records.append(struct.pack(
+                '<4s4B4HL2L5H2L', b'PK\x01\x02', 45 if extra else 20, 3, 45 if extra else 20, 0, self.FLAGS,
+                zipfile.ZIP_STORED, time_field, date_field, crc, size, size, len(name), len(extra), 0, 0, 0,
+                0o100644 << 16, 0xFFFFFFFF if offset >= ARCHIVE_ZIP64_LIMIT else offset
+            ) + name + extra)
         
-        # Return updated reaction counts for this content
-        reactions = PostReaction.query.filter_by(content_piece_id=content_id).all()
-        reaction_counts = {
-            'like': 0,
-            'applause': 0,
-            'support': 0,
-            'love': 0,
-            'insightful': 0,
-            'funny': 0
-        }
+        count, directory_size, directory_offset = len(self.layout), self.directory_size, self.directory_offset
+        if self.zip64_end:
+            records.append(struct.pack('<4sQ2H2L4Q', b'PK\x06\x06', 44, 45, 45, 0, 0, count, count,
+                                       directory_size, directory_offset))
+            records.append(struct.pack('<4sLQL', b'PK\x06\x07', 0, directory_offset + directory_size, 1))
+            count, directory_size, directory_offset = 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFF
+        records.append(struct.pack('<4s4H2LH', b'PK\x05\x06', 0, 0, count, count,
+                                   directory_size, directory_offset, 0))
+        return b''.join(records)
+    
+    def iter_bytes(self, start=0, stop=None):
+        """Yield the archive bytes in [start, stop), reading uploads in ARCHIVE_CHUNK_SIZE pieces
         
-        for r in reactions:
-            if r.reaction_type in reaction_counts:
-                reaction_counts[r.reaction_type] = r.count
+        Uploads that end before `start` are not sent but still read for their
+        CRC (cached by path, size and modification time).
+        """
+        stop = self.size if stop is None else stop
+        position = 0
         
-        return jsonify({
-            'message': f'Reaction {action}ed successfully',
-            'reactions': reaction_counts
-        })
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': 'Failed to update reaction'}), 500
-
-@app.route('/api/admin/entries/<int:entry_id>/coordinates', methods=['PUT'])
-@jwt_required()
-def update_entry_coordinates(entry_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    entry = Entry.query.get_or_404(entry_id)
-    data = request.get_json()
-    
-    latitude = data.get('latitude')
-    longitude = data.get('longitude')
-    
-    if latitude is not None and longitude is not None:
-        # Validate coordinate ranges
-        if not (-90 <= latitude <= 90):
-            return jsonify({'error': 'Latitude must be between -90 and 90'}), 400
-        if not (-180 <= longitude <= 180):
-            return jsonify({'error': 'Longitude must be between -180 and 180'}), 400
-        
-        entry.latitude = latitude
-        entry.longitude = longitude
-    else:
-        # Clear coordinates if null values are provided
-        entry.latitude = None
-        entry.longitude = None
+        def clip(data):
+            nonlocal position
+            begin, position = position, position + len(data)
+            return data[max(start - begin, 0):max(stop - begin, 0)]
+        
+        crcs = []
+        for member, _, header, offset, zip64, _, _ in self.layout:
+            chunk = clip(header)
+            if chunk:
+                yield chunk
+            if position >= stop:
+                return
+            if member.data is not None:
+                crc = zlib.crc32(member.data)
+                chunk = clip(member.data)
+                if chunk:
+                    yield chunk
+            elif position + member.size <= start:
+                crc = file_crc32(member.path, member.size, os.stat(member.path).st_mtime_ns)
+                position += member.size
+            else:
+                crc, remaining = 0, member.size
+                with open(member.path, 'rb') as source:
+                    while remaining:
+                        data = source.read(min(ARCHIVE_CHUNK_SIZE, remaining))
+                        if not data:
+                            raise OSError(f'{member.path} shrank while it was being archived')
+                        remaining -= len(data)
+                        crc = zlib.crc32(data, crc)
+                        chunk = clip(data)
+                        if chunk:
+                            yield chunk
+                        if position >= stop:
+                            return
+            crcs.append(crc)
+            descriptor = struct.pack('<4sLQQ' if zip64 else '<4sLLL', b'PK\x07\x08', crc, member.size, member.size)
+            chunk = clip(descriptor)
+            if chunk:
+                yield chunk
+            if position >= stop:
+                return
+        chunk = clip(self._central_directory(crcs))
+        if chunk:
+            yield chunk
     
-    db.session.commit()
+    def etag(self):
+        """Strong validator: generated members by content, uploads by size and modification time"""
+        digest = hashlib.sha256()
+        for member in self.members:
+            digest.update(member.name.encode('utf-8'))
+            digest.update(member.data if member.data is not None else
+                          f'{member.size}:{member.modified.isoformat()}'.encode('utf-8'))
+        return digest.hexdigest()[:32]
+
+@lru_cache(maxsize=4096)
+def file_crc32(path, size, mtime_ns):
+    crc = 0
+    with open(path, 'rb') as source:
+        for data in iter(lambda: source.read(ARCHIVE_CHUNK_SIZE), b''):
+            crc = zlib.crc32(data, crc)
+    return crc
+
+def available_token(model, column, token):
+    """Keep an archived token unless another row already uses it"""
+    if token and not db.session.query(model.id).filter(column == token).first():
+        return token
+    return generate_token()
+
+def import_trip_archive(archive):
+    """Restore a trip from a trip archive (path or binary file object) as a new trip
     
-    return jsonify({
-        'message': 'Coordinates updated successfully',
-        'id': entry.id,
-        'latitude': entry.latitude,
-        'longitude': entry.longitude
-    })
+    Everything is inserted in one transaction; ids are newly assigned and
+    tokens kept unless they are already in use. Uploads are copied into
+    UPLOAD_FOLDER under their original names, or fresh ones if taken, and
+    removed again if the import fails. Raises ValueError for invalid archives.
+    """
+    try:
+        bundle = zipfile.ZipFile(archive)
+    except zipfile.BadZipFile:
+        raise ValueError('Not a ZIP archive')
+    
+    with bundle:
+        def load(name):
+            try:
+                return json.loads(bundle.read(name))
+            except (KeyError, ValueError):
+                raise ValueError(f'Archive is missing a valid {name}')
+        
+        manifest = load('manifest.json')
+        if manifest.get('format') != ARCHIVE_FORMAT or manifest.get('version') != ARCHIVE_VERSION:
+            raise ValueError('Not a supported trip archive')
+        trip_record, traveler_records, entry_records, content_records, reaction_records = (
+            load(name) for name in ('trip.json', 'travelers.json', 'entries.json', 'content.json', 'reactions.json')
+        )
+        archived_media = set(bundle.namelist())
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        written = []
+        
+        try:
+            trip = Trip(**restore_row(Trip, trip_record, ARCHIVE_COLUMNS['trip']))
+            trip.admin_token = available_token(Trip, Trip.admin_token, trip.admin_token)
+            if trip.public_token:
+                trip.public_token = available_token(Trip, Trip.public_token, trip.public_token)
+            
+            travelers = {}
+            for record in traveler_records:
+                values = restore_row(Traveler, record, ARCHIVE_COLUMNS['travelers'][1:])
+                values['token'] = available_token(Traveler, Traveler.token, values['token'])
+                travelers[record['id']] = Traveler(trip=trip, **values)
+            
+            filenames = {}
+            for record in entry_records:
+                filename = record.get('filename')
+                if not filename or filename in filenames:
+                    continue
+                if secure_filename(filename) != filename or f'media/{filename}' not in archived_media:
+                    filenames[filename] = None
+                    continue
+                target = filename
+                if os.path.exists(os.path.join(upload_folder, target)):
+                    target = secure_filename(f"{uuid.uuid4()}_{filename}")
+                with bundle.open(f'media/{filename}') as source, open(os.path.join(upload_folder, target), 'xb') as copy:
+                    written.append(copy.name)
+                    shutil.copyfileobj(source, copy, ARCHIVE_CHUNK_SIZE)
+                filenames[filename] = target
+            
+            entries = {}
+            for record in entry_records:
+                values = restore_row(Entry, record, ARCHIVE_COLUMNS['entries'][2:])
+                values['filename'] = filenames.get(values['filename'])
+                entries[record['id']] = Entry(trip=trip, traveler=travelers[record['traveler_id']], **values)
+            
+            content_pieces = {}
+            for record in content_records:
+                content = TripContent(trip=trip, **restore_row(TripContent, record, ARCHIVE_COLUMNS['content'][1:]))
+                content.entry_links = [ContentEntry(entry=entries[entry_id])
+                                       for entry_id in record.get('entry_ids', []) if entry_id in entries]
+                content_pieces[record['id']] = content
+            
+            for record in reaction_records:
+                if record['content_piece_id'] in content_pieces:
+                    PostReaction(trip=trip, content_piece=content_pieces[record['content_piece_id']],
+                                 **restore_row(PostReaction, record, ARCHIVE_COLUMNS['reactions'][1:]))
+            
+            db.session.add(trip)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            for path in written:
+                if os.path.exists(path):
+                    os.remove(path)
+            if isinstance(e, (KeyError, TypeError)):
+                raise ValueError(f'Archive rows are inconsistent: {e!r}')
+            raise
+    return trip
+
+@click.command('export-trip')
+@click.argument('trip_id', type=int)
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@with_appcontext
+def export_trip_command(trip_id, output):
+    """Write a trip archive (ZIP) to OUTPUT"""
+    trip = db.session.get(Trip, trip_id)
+    if trip is None or trip.deleted_at:
+        raise click.ClickException(f'Trip {trip_id} not found')
+    archive = ZipStream(build_trip_archive(trip))
+    with open(output, 'wb') as target:
+        for chunk in archive.iter_bytes():
+            target.write(chunk)
+    print(f"✅ Wrote {len(archive.members)} file(s) of trip {trip.id} to {output} ({archive.size} bytes)")
+
+@click.command('import-trip')
+@click.argument('archive', type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def import_trip_command(archive):
+    """Restore a trip archive as a new trip"""
+    try:
+        trip = import_trip_archive(archive)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    print(f"✅ Imported trip {trip.id} ({trip.name}) with {len(trip.entries)} entries")
+
+# Trip deletion: a deleted trip is only marked, then removed chunk by chunk in the background
+TRIP_PURGE_CHUNK_SIZE = int(os.getenv('TRIP_PURGE_CHUNK_SIZE', 500))
+
+def count_trip_rows(trip_id):
+    """Rows and uploaded files still left of a trip"""
+    counts = {
+        name: db.session.query(db.func.count(model.id)).filter(model.trip_id == trip_id).scalar()
+        for name, model in (('entries', Entry), ('content', TripContent), ('travelers', Traveler), ('reactions', PostReaction))
+    }
+    counts['files'] = db.session.query(db.func.count(Entry.id)).filter(
+        Entry.trip_id == trip_id, Entry.filename.isnot(None)
+    ).scalar()
+    return counts
+
+def purge_trip_chunk(trip_id, chunk_size=None):
+    """Remove the next chunk of a deleted trip in one short transaction, returning False once it is gone
+    
+    Set-based DELETE statements that bypass the ORM: content pieces with their
+    entry links and reactions first, then entries (their files are unlinked
+    before the rows go, so an interrupted purge never leaves unreferenced
+    files behind), the remaining rows and finally the trip itself.
+    """
+    chunk_size = chunk_size or TRIP_PURGE_CHUNK_SIZE
+    links, reactions = ContentEntry.__table__, PostReaction.__table__
+    
+    content = TripContent.__table__
+    content_ids = db.session.execute(
+        db.select(content.c.id).where(content.c.trip_id == trip_id).limit(chunk_size)
+    ).scalars().all()
+    if content_ids:
+        db.session.execute(links.delete().where(links.c.content_piece_id.in_(content_ids)))
+        db.session.execute(reactions.delete().where(reactions.c.content_piece_id.in_(content_ids)))
+        db.session.execute(content.delete().where(content.c.id.in_(content_ids)))
+        db.session.commit()
+        return True
+    
+    entries = Entry.__table__
+    rows = db.session.execute(
+        db.select(entries.c.id, entries.c.filename).where(entries.c.trip_id == trip_id).limit(chunk_size)
+    ).all()
+    if rows:
+        upload_folder = current_app.config['UPLOAD_FOLDER']
+        for _, filename in rows:
+            if filename:
+                try:
+                    os.remove(os.path.join(upload_folder, filename))
+                except FileNotFoundError:
+                    pass
+        entry_ids = [entry_id for entry_id, _ in rows]
+        db.session.execute(links.delete().where(links.c.entry_id.in_(entry_ids)))
+        db.session.execute(entries.delete().where(entries.c.id.in_(entry_ids)))
+        db.session.commit()
+        return True
+    
+    for model in (PostReaction, TripEvent, SyncTombstone, Traveler):
+        table = model.__table__
+        result = db.session.execute(table.delete().where(table.c.id.in_(
+            db.select(table.c.id).where(table.c.trip_id == trip_id).limit(chunk_size)
+        )))
+        if result.rowcount:
+            db.session.commit()
+            return True
+    
+    db.session.execute(Trip.__table__.delete().where(Trip.__table__.c.id == trip_id))
+    db.session.commit()
+    token_cache.invalidate_trip(trip_id)
+    trip_cache.invalidate(trip_id)
+    return False
 
-@app.route('/api/admin/entries/<int:entry_id>/toggle-disabled', methods=['PUT'])
-@jwt_required()
-def toggle_entry_disabled(entry_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+class TripPurger:
+    """Background removal of trips marked as deleted
+    
+    A thread per process, started on first use (forked workers start their
+    own), purges every marked trip chunk by chunk when woken by wake() and
+    every `interval` seconds. A lock file in the instance folder lets only one
+    process purge at a time. All progress is in the database, so a purge cut
+    short by a crash or restart continues where it stopped on the next pass.
+    """
+    
+    def __init__(self, flask_app, interval=60.0):
+        self.app = flask_app
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopping = False
+        self._pid = None
     
-    entry = Entry.query.get_or_404(entry_id)
+    def ensure_started(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._wake = threading.Event()
+            threading.Thread(target=self._run, name='trip-purge', daemon=True).start()
     
-    # Toggle the disabled state
-    entry.disabled = not entry.disabled
+    def wake(self):
+        self.ensure_started()
+        self._wake.set()
+    
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+    
+    def run_pending(self):
+        """Purge all marked trips, returning how many were removed (0 while another process purges)"""
+        os.makedirs(self.app.instance_path, exist_ok=True)
+        with open(os.path.join(self.app.instance_path, 'trip-purge.lock'), 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+            
+            purged = 0
+            with self.app.app_context():
+                while not self._stopping:
+                    trip_id = db.session.query(Trip.id).filter(Trip.deleted_at.isnot(None)).order_by(
+                        Trip.deleted_at, Trip.id
+                    ).limit(1).scalar()
+                    if trip_id is None:
+                        break
+                    while not self._stopping and purge_trip_chunk(trip_id):
+                        pass
+                    if not self._stopping:
+                        purged += 1
+            return purged
+    
+    def _run(self):
+        while not self._stopping:
+            try:
+                self.run_pending()
+            except Exception as e:
+                print(f"❌ Trip purge failed, retrying in {self.interval:.0f}s: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+# Upload garbage collection: files in UPLOAD_FOLDER that no entry references (failed uploads,
+# AI errors, manual database edits) are removed once they are older than a grace period
+UPLOAD_GC_GRACE_PERIOD = float(os.getenv('UPLOAD_GC_GRACE_PERIOD', 24 * 3600))  # seconds
+
+def recompute_storage_totals():
+    """Set every trip's storage_bytes from the file sizes of its entries"""
+    entries = Entry.__table__
+    trips = Trip.__table__
+    db.session.execute(trips.update().values(storage_bytes=db.select(
+        db.func.coalesce(db.func.sum(entries.c.file_size), 0)
+    ).where(entries.c.trip_id == trips.c.id).scalar_subquery()))
     db.session.commit()
+
+def collect_orphaned_uploads(grace_period=None, dry_run=False, on_orphan=None):
+    """Delete files in UPLOAD_FOLDER that no entry references and that are older than grace_period seconds
     
-    return jsonify({
-        'message': f'Entry {"disabled" if entry.disabled else "enabled"} successfully',
-        'id': entry.id,
-        'disabled': entry.disabled
-    })
+    The referenced filenames are streamed from the database into a set, then
+    the folder is walked with os.scandir, one directory entry at a time, so
+    memory grows with the number of entries but not with the listing. Younger
+    orphans may belong to an upload whose entry is still being created and
+    are left alone. on_orphan(name, size, age_seconds, deleted) is called for
+    every orphan found. Returns the folder and orphan totals.
+    """
+    grace_period = UPLOAD_GC_GRACE_PERIOD if grace_period is None else grace_period
+    referenced = set(db.session.execute(
+        db.select(Entry.filename).where(Entry.filename.isnot(None)).execution_options(yield_per=5000)
+    ).scalars())
+    stats = dict.fromkeys(('files', 'bytes', 'orphans', 'orphan_bytes', 'deleted', 'deleted_bytes'), 0)
+    now = time.time()
+    
+    with os.scandir(current_app.config['UPLOAD_FOLDER']) as directory:
+        for item in directory:
+            if item.name.startswith('.') or not item.is_file(follow_symlinks=False):
+                continue
+            info = item.stat(follow_symlinks=False)
+            stats['files'] += 1
+            stats['bytes'] += info.st_size
+            if item.name in referenced:
+                continue
+            
+            stats['orphans'] += 1
+            stats['orphan_bytes'] += info.st_size
+            age = now - info.st_mtime
+            deleted = False
+            if age >= grace_period and not dry_run:
+                try:
+                    os.remove(item.path)
+                    deleted = True
+                    stats['deleted'] += 1
+                    stats['deleted_bytes'] += info.st_size
+                except FileNotFoundError:
+                    pass
+            if on_orphan:
+                on_orphan(item.name, info.st_size, age, deleted)
+    return stats
 
-@app.route('/api/trips/<int:trip_id>/content', methods=['GET'])
-@jwt_required()
-def get_trip_content(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    trip = Trip.query.get_or_404(trip_id)
-    content_pieces = TripContent.query.filter_by(trip_id=trip_id).order_by(TripContent.timestamp.desc()).all()
-    
-    return jsonify([{
-        'id': content.id,
-        'timestamp': timestamp_to_iso(content.timestamp),
-        'generated_content': content.generated_content,
-        'latitude': content.latitude,
-        'longitude': content.longitude,
-        'original_text': content.original_text,
-        'entry_ids': json.loads(content.entry_ids) if content.entry_ids else [],
-        'content_date': content.content_date.isoformat()
-    } for content in content_pieces])
-
-@app.route('/api/trips/<int:trip_id>/content/calendar', methods=['GET'])
-@jwt_required()
-def get_calendar_data(trip_id):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
-    
-    trip = Trip.query.get_or_404(trip_id)
-    
-    # Get all entries grouped by date
-    entries = Entry.query.filter_by(trip_id=trip_id).all()
-    calendar_data = {}
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+
+@click.command('collect-uploads')
+@click.option('--dry-run', is_flag=True, help='Only report orphaned files')
+@click.option('--grace-period', type=float, help='Seconds an orphaned file is kept (default: UPLOAD_GC_GRACE_PERIOD)')
+@click.option('--verbose', is_flag=True, help='List every orphaned file')
+@with_appcontext
+def collect_uploads_command(dry_run, grace_period, verbose):
+    """Remove uploaded files no entry references and recompute trip storage totals"""
+    def report(name, size, age, deleted):
+        if verbose or dry_run:
+            action = 'deleted' if deleted else 'kept'
+            print(f"  {name} ({format_bytes(size)}, {age / 3600:.1f}h old) {action}")
     
-    for entry in entries:
-        entry_date = entry.timestamp.date().isoformat()
-        if entry_date not in calendar_data:
-            calendar_data[entry_date] = {
-                'date': entry_date,
-                'text_count': 0,
-                'photo_count': 0,
-                'audio_count': 0,
-                'total_count': 0
+    stats = collect_orphaned_uploads(grace_period, dry_run, report)
+    backfill_file_sizes()
+    recompute_storage_totals()
+    print(f"✅ {stats['files']} upload(s), {format_bytes(stats['bytes'])}; {stats['orphans']} orphaned "
+          f"({format_bytes(stats['orphan_bytes'])}), {stats['deleted']} deleted ({format_bytes(stats['deleted_bytes'])})")
+
+# Request metrics: per-route latency, status codes and SQL work per request, recorded by a WSGI
+# middleware in each worker process and summed over all of them in Prometheus text format at /metrics
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+METRICS_STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+METRICS_FLUSH_INTERVAL = 1.0  # Seconds a worker's snapshot file may lag behind its counters
+METRICS = {
+    # name: (type, help, label names)
+    'roadweave_http_requests_total': ('counter', 'HTTP requests by route, method and status', ('route', 'method', 'status')),
+    'roadweave_http_request_duration_seconds': ('histogram', 'Time from receiving a request to the end of its response body',
+                                                ('route', 'method')),
+    'roadweave_http_request_db_statements': ('histogram', 'SQL statements executed per request', ('route',)),
+    'roadweave_http_request_db_seconds_total': ('counter', 'Time spent executing SQL statements', ('route',)),
+    'roadweave_http_requests_in_flight': ('gauge', 'Requests being served', ()),
+}
+METRIC_BUCKETS = {
+    'roadweave_http_request_duration_seconds': METRICS_LATENCY_BUCKETS,
+    'roadweave_http_request_db_statements': METRICS_STATEMENT_BUCKETS,
+}
+
+request_sql = threading.local()  # [statement count, seconds] of the request served by this thread
+
+@db.event.listens_for(Engine, 'before_cursor_execute')
+def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    if getattr(request_sql, 'stats', None) is not None:
+        context.metrics_started = time.perf_counter()
+
+@db.event.listens_for(Engine, 'after_cursor_execute')
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = getattr(request_sql, 'stats', None)
+    if stats is not None and hasattr(context, 'metrics_started'):
+        stats[0] += 1
+        stats[1] += time.perf_counter() - context.metrics_started
+
+def merge_metrics(totals, snapshot, include_gauges=True):
+    for name, series in snapshot.items():
+        if name not in METRICS or (METRICS[name][0] == 'gauge' and not include_gauges):
+            continue
+        target = totals.setdefault(name, {})
+        for labels, value in series:
+            labels = tuple(labels)
+            if isinstance(value, list):
+                current = target.get(labels)
+                target[labels] = [a + b for a, b in zip(current, value)] if current else list(value)
+            else:
+                target[labels] = target.get(labels, 0) + value
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def format_metric_labels(names, values):
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+def format_prometheus(totals):
+    lines = []
+    for name, (metric_type, help_text, label_names) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in sorted(totals.get(name, {}).items()):
+            label_text = format_metric_labels(label_names, labels)
+            if metric_type != 'histogram':
+                lines.append(f'{name}{label_text} {value}')
+                continue
+            cumulative = 0
+            bounds = [f'{bound:g}' for bound in METRIC_BUCKETS[name]] + ['+Inf']
+            for bound, count in zip(bounds, value[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_metric_labels(label_names + ('le',), labels + (bound,))} {cumulative}")
+            lines.append(f'{name}_sum{label_text} {value[-1]}')
+            lines.append(f'{name}_count{label_text} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+class RequestMetrics:
+    """Request metrics of this process, shared with the other worker processes through files
+    
+    Recording a request only updates a few dict entries under a lock. At most
+    METRICS_FLUSH_INTERVAL seconds after a change, a timer writes the
+    process's totals to <directory>/<pid>.json. collect() sums the files of
+    all processes; totals of workers that exited (e.g. recycled by gunicorn's
+    max_requests) are folded into retired.json so counters never go back.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+    
+    def _reset(self):
+        # Forked workers start from zero with their own lock and snapshot file
+        self._lock = threading.Lock()
+        self._series = {name: {} for name in METRICS}
+        self._series['roadweave_http_requests_in_flight'][()] = 0
+        self._flush_pending = False
+    
+    def _observe(self, name, labels, value):
+        buckets = METRIC_BUCKETS[name]
+        series = self._series[name].get(labels)
+        if series is None:
+            series = self._series[name][labels] = [0] * (len(buckets) + 2)  # buckets, +Inf, sum
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+    
+    def request_started(self):
+        with self._lock:
+            self._series['roadweave_http_requests_in_flight'][()] += 1
+        self._schedule_flush()
+    
+    def request_finished(self, route, method, status, seconds, statements, db_seconds):
+        with self._lock:
+            self._series['roadweave_http_requests_in_flight'][()] -= 1
+            requests = self._series['roadweave_http_requests_total']
+            key = (route, method, status)
+            requests[key] = requests.get(key, 0) + 1
+            self._observe('roadweave_http_request_duration_seconds', (route, method), seconds)
+            self._observe('roadweave_http_request_db_statements', (route,), statements)
+            db_time = self._series['roadweave_http_request_db_seconds_total']
+            db_time[(route,)] = db_time.get((route,), 0) + db_seconds
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if not self._flush_pending:
+            self._flush_pending = True
+            timer = threading.Timer(METRICS_FLUSH_INTERVAL, self.flush)
+            timer.daemon = True
+            timer.start()
+    
+    def snapshot(self):
+        with self._lock:
+            self._flush_pending = False
+            return {
+                name: [[list(labels), list(value) if isinstance(value, list) else value] for labels, value in series.items()]
+                for name, series in self._series.items()
             }
+    
+    def flush(self):
+        os.makedirs(self.directory, exist_ok=True)
+        write_file_atomic(os.path.join(self.directory, f'{os.getpid()}.json'), json.dumps(self.snapshot()).encode('utf-8'))
+    
+    def collect(self):
+        """Totals over all processes, returned as {name: {labels: value}} with the number of live processes"""
+        self.flush()
+        totals, live = {}, 0
+        with open(os.path.join(self.directory, 'metrics.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            retired_path = os.path.join(self.directory, 'retired.json')
+            try:
+                with open(retired_path) as retired_file:
+                    merge_metrics(totals, json.load(retired_file))
+            except (FileNotFoundError, ValueError):
+                pass
+            retired = {name: dict(series) for name, series in totals.items()}
+            retiring = []
+            
+            for item in os.scandir(self.directory):
+                name, extension = os.path.splitext(item.name)
+                if extension != '.json' or not name.isdigit():
+                    continue
+                try:
+                    with open(item.path) as snapshot_file:
+                        snapshot = json.load(snapshot_file)
+                except (FileNotFoundError, ValueError):
+                    continue
+                if int(name) == os.getpid() or process_alive(int(name)):
+                    merge_metrics(totals, snapshot)
+                    live += 1
+                else:
+                    merge_metrics(totals, snapshot, include_gauges=False)
+                    merge_metrics(retired, snapshot, include_gauges=False)
+                    retiring.append(item.path)
+            
+            if retiring:
+                write_file_atomic(retired_path, json.dumps({
+                    name: [[list(labels), value] for labels, value in series.items()] for name, series in retired.items()
+                }).encode('utf-8'))
+                for path in retiring:
+                    os.remove(path)
+        return totals, live
+
+class MetricsMiddleware:
+    """WSGI middleware recording every request, timed up to the end of its response body"""
+    
+    def __init__(self, wsgi_app, metrics):
+        self.wsgi_app = wsgi_app
+        self.metrics = metrics
+    
+    def __call__(self, environ, start_response):
+        started = time.perf_counter()
+        status = ['500']
+        sql = request_sql.stats = [0, 0.0]
+        self.metrics.request_started()
         
-        if entry.content_type == 'text':
-            calendar_data[entry_date]['text_count'] += 1
-        elif entry.content_type == 'photo':
-            calendar_data[entry_date]['photo_count'] += 1
-        elif entry.content_type == 'audio':
-            calendar_data[entry_date]['audio_count'] += 1
+        def capture_status(status_line, headers, exc_info=None):
+            status[0] = status_line[:3]
+            return start_response(status_line, headers, exc_info)
         
-        calendar_data[entry_date]['total_count'] += 1
-    
-    return jsonify({
-        'calendar_data': list(calendar_data.values()),
-        'date_range': {
-            'start': min(calendar_data.keys()) if calendar_data else None,
-            'end': max(calendar_data.keys()) if calendar_data else None
-        }
-    })
+        def finish():
+            request_sql.stats = None
+            self.metrics.request_finished(environ.get('roadweave.route', 'unmatched'), environ['REQUEST_METHOD'],
+                                          status[0], time.perf_counter() - started, sql[0], sql[1])
+        
+        try:
+            return ClosingIterator(self.wsgi_app(environ, capture_status), finish)
+        except BaseException:
+            finish()
+            raise
+
+def label_metrics_route():
+    """Label the request with its route pattern (not the URL, whose tokens would explode the series)"""
+    if request.url_rule is not None:
+        request.environ['roadweave.route'] = request.url_rule.rule
+
+# Token resolution cache: public and traveler tokens mapped to ids and flags, misses included
+TOKEN_CACHE_TTL = float(os.getenv('TOKEN_CACHE_TTL', 60))
+TOKEN_CACHE_NEGATIVE_TTL = float(os.getenv('TOKEN_CACHE_NEGATIVE_TTL', 10))
 
-@app.route('/api/trips/<int:trip_id>/content/date/<date>', methods=['GET'])
-@jwt_required()
-def get_content_by_date(trip_id, date):
-    if get_jwt_identity() != 'admin':
-        return jsonify({'error': 'Admin access required'}), 403
+PublicTrip = namedtuple('PublicTrip', ['id', 'reactions_enabled'])
+TravelerIdentity = namedtuple('TravelerIdentity', ['id', 'trip_id'])
+
+class TokenCache:
+    """Thread-safe TTL + LRU cache of token lookups
     
-    try:
-        # Parse the date string
-        from datetime import datetime
-        target_date = datetime.strptime(date, '%Y-%m-%d').date()
-    except ValueError:
-        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    Unknown tokens are cached as None for a shorter TTL, so scans with random
+    tokens do not reach the database. Entries are tagged with their trip so
+    admin changes can drop them at once with invalidate_trip().
     
-    trip = Trip.query.get_or_404(trip_id)
+    After attach(), invalidations also count up a generation number in a small
+    memory-mapped file shared by all worker processes; a process that sees the
+    number change drops its whole cache before the next lookup, so a trip made
+    private or deleted stops resolving everywhere at once.
+    """
     
-    # Get entries for the specific date
-    entries = Entry.query.filter(
-        Entry.trip_id == trip_id,
-        db.func.date(Entry.timestamp) == target_date
-    ).order_by(Entry.timestamp.asc()).all()
+    def __init__(self, ttl=TOKEN_CACHE_TTL, negative_ttl=TOKEN_CACHE_NEGATIVE_TTL, max_entries=10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value, trip_id)
+        self._lock = threading.Lock()
+        self._shared = None
+        self._shared_file = None
+        self._generation = 0
     
-    # Get content pieces for the specific date
-    content_pieces = TripContent.query.filter_by(
-        trip_id=trip_id, 
-        content_date=target_date
-    ).order_by(TripContent.timestamp.asc()).all()
+    def attach(self, path):
+        """Share invalidations through the generation counter in `path` (created if missing)"""
+        shared_file = open(path, 'a+b')
+        if os.fstat(shared_file.fileno()).st_size < 8:
+            shared_file.truncate(8)
+        with self._lock:
+            if self._shared is not None:
+                self._shared.close()
+                self._shared_file.close()
+            self._shared_file = shared_file
+            self._shared = mmap.mmap(shared_file.fileno(), 8)
+            self._generation = struct.unpack_from('<Q', self._shared)[0]
+            self._entries.clear()
     
-    return jsonify({
-        'date': date,
-        'entries': [{
-            'id': entry.id,
-            'content_type': entry.content_type,
-            'content': entry.content,
-            'latitude': entry.latitude,
-            'longitude': entry.longitude,
-            'timestamp': timestamp_to_iso(entry.timestamp),
-            'traveler_name': entry.traveler.name,
-            'filename': entry.filename
-        } for entry in entries],
-        'content_pieces': [{
-            'id': content.id,
-            'timestamp': timestamp_to_iso(content.timestamp),
-            'generated_content': content.generated_content,
-            'latitude': content.latitude,
-            'longitude': content.longitude,
-            'original_text': content.original_text,
-            'entry_ids': json.loads(content.entry_ids) if content.entry_ids else []
-        } for content in content_pieces]
-    })
+    def _sync(self):
+        """Drop the entries if another process invalidated since the last lookup (lock held)"""
+        if self._shared is not None:
+            generation = struct.unpack_from('<Q', self._shared)[0]
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+        return self._generation
+    
+    def _bump(self):
+        """Tell the other processes to drop their entries (lock held)"""
+        if self._shared is not None:
+            # lockf (unlike flock) also excludes forked workers sharing the file descriptor
+            fcntl.lockf(self._shared_file, fcntl.LOCK_EX)
+            try:
+                generation = struct.unpack_from('<Q', self._shared)[0] + 1
+                struct.pack_into('<Q', self._shared, 0, generation)
+            finally:
+                fcntl.lockf(self._shared_file, fcntl.LOCK_UN)
+            self._generation = generation
+    
+    def generation(self):
+        """Current generation, for set(): a lookup started before an invalidation is not stored"""
+        with self._lock:
+            return self._sync()
+    
+    def get(self, key):
+        """Return (hit, value); value is None for a cached miss"""
+        with self._lock:
+            self._sync()
+            cached = self._entries.get(key)
+            if cached is None:
+                return False, None
+            if cached[0] <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, cached[1]
+    
+    def set(self, key, value, trip_id=None, generation=None):
+        ttl = self.ttl if value is not None else self.negative_ttl
+        with self._lock:
+            if generation is not None and self._sync() != generation:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value, trip_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._bump()
+            self._entries.pop(key, None)
+    
+    def invalidate_trip(self, trip_id):
+        with self._lock:
+            self._bump()
+            for key in [key for key, cached in self._entries.items() if cached[2] == trip_id]:
+                del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
-@app.route('/uploads/<filename>')
-def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+token_cache = TokenCache()
 
-@app.route('/api/health')
-def health():
-    return jsonify({'status': 'healthy'})
+def resolve_public_trip(token):
+    """Return the PublicTrip for a public token of a publicly enabled trip, or None"""
+    key = ('public', token)
+    generation = token_cache.generation()
+    hit, public_trip = token_cache.get(key)
+    if not hit:
+        row = db.session.query(Trip.id, Trip.reactions_enabled).filter_by(
+            public_token=token, public_enabled=True, deleted_at=None
+        ).first()
+        public_trip = PublicTrip(*row) if row else None
+        token_cache.set(key, public_trip, row and row.id, generation)
+    return public_trip
 
+def resolve_traveler(token):
+    """Return the TravelerIdentity for a traveler token, or None"""
+    key = ('traveler', token)
+    generation = token_cache.generation()
+    hit, identity = token_cache.get(key)
+    if not hit:
+        row = db.session.query(Traveler.id, Traveler.trip_id).join(Trip).filter(
+            Traveler.token == token, Trip.deleted_at.is_(None)
+        ).first()
+        identity = TravelerIdentity(*row) if row else None
+        token_cache.set(key, identity, row and row.trip_id, generation)
+    return identity
 
-# Serve static files explicitly (before catch-all route)
-@app.route('/static/<path:filename>')
-def serve_static(filename):
-    """Serve static files from React build directory"""
-    if os.getenv('FLASK_ENV') == 'production' or os.getenv('FLASK_DEBUG', 'True').lower() == 'false':
-        react_build_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'build')
-        static_dir = os.path.join(react_build_dir, 'static')
-        
-        if os.path.exists(static_dir):
-            response = send_from_directory(static_dir, filename)
-            
-            # Set correct MIME types
-            if filename.endswith('.css'):
-                response.headers['Content-Type'] = 'text/css'
-            elif filename.endswith('.js'):
-                response.headers['Content-Type'] = 'application/javascript'
-            elif filename.endswith('.map'):
-                response.headers['Content-Type'] = 'application/json'
-                
-            return response
-    return jsonify({'error': 'Static file not found'}), 404
-
-# Serve React App (production mode)
-@app.route('/', defaults={'path': ''})
-@app.route('/<path:path>')
-def serve_react_app(path):
-    """Serve React app for all non-API routes in production"""
-    # Check if we're in production mode
-    if os.getenv('FLASK_ENV') == 'production' or os.getenv('FLASK_DEBUG', 'True').lower() == 'false':
-        # Path to the React build directory
-        react_build_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend', 'build')
-        
-        # If build directory doesn't exist, return error
-        if not os.path.exists(react_build_dir):
-            return jsonify({
-                'error': 'Frontend not built',
-                'message': 'Run "cd frontend && npm run build" first'
-            }), 500
-        
-        # Serve static files
-        if path and os.path.exists(os.path.join(react_build_dir, path)):
-            return send_from_directory(react_build_dir, path)
-        
-        # For all other routes, serve index.html (React Router will handle routing)
-        return send_from_directory(react_build_dir, 'index.html')
-    
-    # In development mode, return API info
-    return jsonify({
-        'message': 'RoadWeave API',
-        'status': 'Development mode',
-        'frontend': 'Run separately with npm start',
-        'version': '1.0.0'
-    })
+def get_trip_or_404(trip_id):
+    """The trip with this id unless it does not exist or is being deleted"""
+    return Trip.query.filter(Trip.id == trip_id, Trip.deleted_at.is_(None)).first_or_404()
+
+def get_entry_or_404(entry_id):
+    return Entry.query.join(Trip).filter(Entry.id == entry_id, Trip.deleted_at.is_(None)).first_or_404()
 
 def migrate_database():
     """Apply database migrations for new columns and tables"""
@@ -1437,12 +3999,47 @@ def migrate_database():
                 migrations_needed.append('ALTER TABLE trip ADD COLUMN public_token VARCHAR(100)')
             if 'reactions_enabled' not in trip_columns:
                 migrations_needed.append('ALTER TABLE trip ADD COLUMN reactions_enabled BOOLEAN DEFAULT 1')
+            if 'content_version' not in trip_columns:
+                migrations_needed.append('ALTER TABLE trip ADD COLUMN content_version INTEGER DEFAULT 0 NOT NULL')
+            if 'deleted_at' not in trip_columns:
+                migrations_needed.append('ALTER TABLE trip ADD COLUMN deleted_at DATETIME')
+            if 'storage_bytes' not in trip_columns:
+                migrations_needed.append('ALTER TABLE trip ADD COLUMN storage_bytes INTEGER DEFAULT 0 NOT NULL')
+            if 'sync_horizon' not in trip_columns:
+                migrations_needed.append('ALTER TABLE trip ADD COLUMN sync_horizon INTEGER DEFAULT 0 NOT NULL')
         
         # Check if entry table needs disabled column
         if 'entry' in existing_tables:
             entry_columns = [col['name'] for col in inspector.get_columns('entry')]
             if 'disabled' not in entry_columns:
                 migrations_needed.append('ALTER TABLE entry ADD COLUMN disabled BOOLEAN DEFAULT 0 NOT NULL')
+            if 'entry_date' not in entry_columns:
+                migrations_needed.append('ALTER TABLE entry ADD COLUMN entry_date DATE')
+            if 'place_name' not in entry_columns:
+                migrations_needed.append('ALTER TABLE entry ADD COLUMN place_name VARCHAR(200)')
+            if 'sync_version' not in entry_columns:
+                migrations_needed.append('ALTER TABLE entry ADD COLUMN sync_version INTEGER DEFAULT 0 NOT NULL')
+            if 'file_size' not in entry_columns:
+                migrations_needed.append('ALTER TABLE entry ADD COLUMN file_size INTEGER')
+            entry_indexes = [index['name'] for index in inspector.get_indexes('entry')]
+            if 'ix_entry_trip_date' not in entry_indexes:
+                migrations_needed.append('CREATE INDEX ix_entry_trip_date ON entry (trip_id, entry_date)')
+            if 'ix_entry_trip_timestamp' not in entry_indexes:
+                migrations_needed.append('CREATE INDEX ix_entry_trip_timestamp ON entry (trip_id, timestamp)')
+            if 'ix_entry_trip_sync_version' not in entry_indexes:
+                migrations_needed.append('CREATE INDEX ix_entry_trip_sync_version ON entry (trip_id, sync_version)')
+        
+        if 'trip_content' in existing_tables:
+            content_columns = [col['name'] for col in inspector.get_columns('trip_content')]
+            if 'sync_version' not in content_columns:
+                migrations_needed.append('ALTER TABLE trip_content ADD COLUMN sync_version INTEGER DEFAULT 0 NOT NULL')
+            content_indexes = [index['name'] for index in inspector.get_indexes('trip_content')]
+            if 'ix_trip_content_trip_date' not in content_indexes:
+                migrations_needed.append('CREATE INDEX ix_trip_content_trip_date ON trip_content (trip_id, content_date)')
+            if 'ix_trip_content_trip_timestamp' not in content_indexes:
+                migrations_needed.append('CREATE INDEX ix_trip_content_trip_timestamp ON trip_content (trip_id, timestamp)')
+            if 'ix_trip_content_trip_sync_version' not in content_indexes:
+                migrations_needed.append('CREATE INDEX ix_trip_content_trip_sync_version ON trip_content (trip_id, sync_version)')
         
         # Check if trip_content table exists, create if not
         if 'trip_content' not in existing_tables:
@@ -1461,6 +4058,13 @@ def migrate_database():
                     FOREIGN KEY (trip_id) REFERENCES trip (id) ON DELETE CASCADE
                 )
             ''')
+            migrations_needed.append('CREATE INDEX ix_trip_content_trip_date ON trip_content (trip_id, content_date)')
+            migrations_needed.append('CREATE INDEX ix_trip_content_trip_timestamp ON trip_content (trip_id, timestamp)')
+        
+        if 'post_reaction' in existing_tables:
+            reaction_indexes = [index['name'] for index in inspector.get_indexes('post_reaction')]
+            if 'ix_post_reaction_trip' not in reaction_indexes:
+                migrations_needed.append('CREATE INDEX ix_post_reaction_trip ON post_reaction (trip_id)')
         
         # Check if post_reaction table exists, create if not
         if 'post_reaction' not in existing_tables:
@@ -1479,6 +4083,7 @@ def migrate_database():
                     UNIQUE(content_piece_id, reaction_type)
                 )
             ''')
+            migrations_needed.append('CREATE INDEX ix_post_reaction_trip ON post_reaction (trip_id)')
         
         if migrations_needed:
             print(f"🔄 Migrating database: Applying {len(migrations_needed)} migration(s)...")
@@ -1489,15 +4094,344 @@ def migrate_database():
             print("✅ Database migration completed!")
         else:
             print("✅ Database is up to date!")
+        
+        backfill_entry_dates()
+        backfill_content_dates()
+        backfill_content_entries()
+        backfill_place_names()
+        backfill_file_sizes()
+        
+        with db.engine.connect() as conn:
+            missing_indexes = [name for name in list(SEARCH_INDEXES) + list(SPATIAL_INDEXES)
+                               if not conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"),
+                                                   {'name': name}).first()]
+        if missing_indexes:
+            print(f"🔄 Building search/spatial indexes ({', '.join(missing_indexes)})...")
+            with db.engine.begin() as conn:
+                for name in missing_indexes:
+                    if name in SEARCH_INDEXES:
+                        create_search_index(conn, name, rebuild=True)
+                    else:
+                        create_spatial_index(conn, name, rebuild=True)
             
     except Exception as e:
         print(f"⚠️  Database migration error: {e}")
         print("   This might be a new database - continuing...")
 
+def backfill_entry_dates(batch_size=1000):
+    """Compute entry_date for entries created before the column existed"""
+    backfilled = 0
+    while True:
+        rows = db.session.query(Entry.id, Entry.timestamp).filter(
+            Entry.entry_date.is_(None)
+        ).limit(batch_size).all()
+        if not rows:
+            break
+        
+        db.session.bulk_update_mappings(Entry, [
+            {'id': entry_id, 'entry_date': local_date(timestamp or datetime.utcnow())}
+            for entry_id, timestamp in rows
+        ])
+        db.session.commit()
+        backfilled += len(rows)
+    
+    if backfilled:
+        print(f"✅ Backfilled entry_date for {backfilled} entries")
+    return backfilled
+
+def get_migration_state(name):
+    return db.session.query(DataMigration.state).filter(DataMigration.name == name).scalar()
+
+def set_migration_state(name, state):
+    """Record backfill progress (committed with the caller's next commit)"""
+    db.session.merge(DataMigration(name=name, state=str(state)))
+
+def backfill_content_dates(batch_size=1000):
+    """Move content_date of content pieces created while it was the UTC day to the local day
+    
+    New pieces get the local day of their timestamp (like entry_date); older ones
+    would otherwise be grouped differently around midnight by the calendar and
+    the date range queries. Runs once.
+    """
+    if get_migration_state('content_date_local') == 'done':
+        return 0
+    
+    backfilled = 0
+    last_id = 0
+    changed_trips = set()
+    while True:
+        rows = db.session.query(TripContent.id, TripContent.trip_id, TripContent.timestamp, TripContent.content_date).filter(
+            TripContent.id > last_id
+        ).order_by(TripContent.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        
+        mappings = []
+        for content_id, trip_id, timestamp, content_date in rows:
+            day = local_date(timestamp) if timestamp else content_date
+            if day != content_date:
+                mappings.append({'id': content_id, 'content_date': day})
+                changed_trips.add(trip_id)
+        if mappings:
+            db.session.bulk_update_mappings(TripContent, mappings)
+        db.session.commit()
+        backfilled += len(mappings)
+    
+    if changed_trips:
+        bump_trip_versions(changed_trips)
+    set_migration_state('content_date_local', 'done')
+    db.session.commit()
+    if backfilled:
+        print(f"✅ Moved content_date of {backfilled} content pieces to the local day")
+    return backfilled
+
+def backfill_content_entries(batch_size=1000):
+    """Create ContentEntry links from the legacy JSON entry_ids column"""
+    linked_content_ids = db.session.query(ContentEntry.content_piece_id)
+    existing_entry_ids = set()
+    backfilled = 0
+    last_id = 0
+    
+    while True:
+        rows = db.session.query(TripContent.id, TripContent.entry_ids).filter(
+            TripContent.id > last_id,
+            TripContent.entry_ids.isnot(None),
+            TripContent.id.notin_(linked_content_ids)
+        ).order_by(TripContent.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        
+        links = {}
+        for content_id, entry_ids in rows:
+            try:
+                links[content_id] = [int(entry_id) for entry_id in json.loads(entry_ids)]
+            except (TypeError, ValueError):
+                print(f"⚠️  Skipping invalid entry_ids on content piece {content_id}: {entry_ids!r}")
+        
+        # Only link entries that still exist
+        wanted = {entry_id for entry_ids in links.values() for entry_id in entry_ids} - existing_entry_ids
+        if wanted:
+            existing_entry_ids.update(
+                entry_id for (entry_id,) in db.session.query(Entry.id).filter(Entry.id.in_(wanted))
+            )
+        
+        mappings = [
+            {'content_piece_id': content_id, 'entry_id': entry_id}
+            for content_id, entry_ids in links.items()
+            for entry_id in set(entry_ids) if entry_id in existing_entry_ids
+        ]
+        if mappings:
+            db.session.bulk_insert_mappings(ContentEntry, mappings)
+        db.session.commit()
+        backfilled += len(mappings)
+    
+    if backfilled:
+        print(f"✅ Backfilled {backfilled} content-entry links")
+    return backfilled
+
+def backfill_place_names(batch_size=1000):
+    """Look up place names for geotagged entries created before the column existed
+    
+    The last entry id checked is stored, so entries the bundled dataset has no
+    place for are not looked up again on every startup; newer entries get
+    their place name when they are created.
+    """
+    backfilled = 0
+    last_id = int(get_migration_state('place_names') or 0)
+    max_id = db.session.query(db.func.max(Entry.id)).scalar() or 0
+    changed_trips = set()
+    while last_id < max_id:
+        rows = db.session.query(Entry.id, Entry.trip_id, Entry.latitude, Entry.longitude).filter(
+            Entry.id > last_id,
+            Entry.id <= max_id,
+            Entry.place_name.is_(None),
+            Entry.latitude.isnot(None),
+            Entry.longitude.isnot(None)
+        ).order_by(Entry.id).limit(batch_size).all()
+        last_id = rows[-1][0] if len(rows) == batch_size else max_id
+        
+        mappings = []
+        for entry_id, trip_id, latitude, longitude in rows:
+            place_name = reverse_geocode(latitude, longitude)
+            if place_name:
+                mappings.append({'id': entry_id, 'place_name': place_name})
+                changed_trips.add(trip_id)
+        if mappings:
+            db.session.bulk_update_mappings(Entry, mappings)
+        set_migration_state('place_names', last_id)
+        db.session.commit()
+        backfilled += len(mappings)
+    
+    if changed_trips:
+        bump_trip_versions(changed_trips)
+        db.session.commit()
+    if backfilled:
+        print(f"✅ Backfilled place names for {backfilled} entries")
+    return backfilled
+
+def backfill_file_sizes(batch_size=1000):
+    """Record file sizes of uploads from before the column existed, then recompute the trip storage totals"""
+    upload_folder = current_app.config['UPLOAD_FOLDER']
+    backfilled = 0
+    last_id = 0
+    while True:
+        rows = db.session.query(Entry.id, Entry.filename).filter(
+            Entry.id > last_id,
+            Entry.file_size.is_(None),
+            Entry.filename.isnot(None)
+        ).order_by(Entry.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        
+        mappings = []
+        for entry_id, filename in rows:
+            try:
+                file_size = os.path.getsize(os.path.join(upload_folder, filename))
+            except OSError:
+                file_size = 0
+            mappings.append({'id': entry_id, 'file_size': file_size})
+        db.session.bulk_update_mappings(Entry, mappings)
+        db.session.commit()
+        backfilled += len(mappings)
+    
+    if backfilled:
+        recompute_storage_totals()
+        print(f"✅ Backfilled file sizes for {backfilled} entries")
+    return backfilled
+
+def create_app(config=None):
+    """Application factory: configuration, extensions, blueprints and startup services
+    
+    config overrides the settings read from the environment (e.g. a test database).
+    """
+    app = Flask(__name__, static_folder=None, instance_path=INSTANCE_PATH)
+    CORS(app, 
+         origins=['*'],
+         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+         allow_headers=['Content-Type', 'Authorization', 'X-Auth-Token'],
+         expose_headers=['X-Next-Cursor'],
+         supports_credentials=True)
+    
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI', 'sqlite:///roadweave.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-string')
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=30)
+    app.config['JWT_TOKEN_LOCATION'] = ['headers', 'query_string']
+    app.config['JWT_HEADER_NAME'] = 'X-Auth-Token'
+    app.config['JWT_HEADER_TYPE'] = 'Bearer'
+    app.config['UPLOAD_FOLDER'] = os.getenv('UPLOAD_FOLDER', 'uploads')
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))  # 32MB max file size
+    app.config['STATIC_EXPORT_FOLDER'] = os.getenv('STATIC_EXPORT_FOLDER', 'exports')
+    app.config['LIVE_FEED_HEARTBEAT'] = float(os.getenv('LIVE_FEED_HEARTBEAT', 15))
+    app.config['LIVE_FEED_MAX_DURATION'] = float(os.getenv('LIVE_FEED_MAX_DURATION', 300))
+    app.config['TRIP_PURGE_BACKGROUND'] = os.getenv('TRIP_PURGE_BACKGROUND', 'true').lower() == 'true'
+    app.config['STATIC_EXPORT_BACKGROUND'] = os.getenv('STATIC_EXPORT_BACKGROUND', 'true').lower() == 'true'
+    app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    app.config['METRICS_DIR'] = os.getenv('METRICS_DIR', os.path.join(app.instance_path, 'metrics'))
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    app.config['TRACE_EXPORT_FILE'] = os.getenv('TRACE_EXPORT_FILE')
+    app.config['OTLP_TRACES_ENDPOINT'] = os.getenv('OTEL_EXPORTER_OTLP_TRACES_ENDPOINT') or (
+        os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT').rstrip('/') + '/v1/traces' if os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT') else None)
+    if config:
+        app.config.update(config)
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        # Wait for writers in other worker processes instead of failing with "database is locked"
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+            'connect_args': {'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', 30))}
+        })
+    
+    # Create uploads directory
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    
+    # Token cache invalidations reach every worker process through this file
+    os.makedirs(app.instance_path, exist_ok=True)
+    token_cache.attach(os.path.join(app.instance_path, 'token-cache.generation'))
+    
+    if orjson and os.getenv('FAST_JSON', 'true').lower() == 'true':
+        app.json = OrjsonProvider(app)
+    
+    db.init_app(app)
+    jwt.init_app(app)
+    
+    app.register_error_handler(413, request_entity_too_large)
+    app.register_error_handler(400, bad_request)
+    if app.config['METRICS_ENABLED']:
+        request_metrics = RequestMetrics(app.config['METRICS_DIR'])
+        app.extensions['request_metrics'] = request_metrics
+        app.wsgi_app = MetricsMiddleware(app.wsgi_app, request_metrics)
+        app.before_request(label_metrics_route)
+    app.before_request(handle_preflight)
+    configure_tracing(app)
+    app.extensions['tracer'] = tracer
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(export_static_command)
+    app.cli.add_command(export_trip_command)
+    app.cli.add_command(import_trip_command)
+    app.cli.add_command(collect_uploads_command)
+    # Imported here: the route modules import their models and helpers from this one
+    from routes.admin import admin_api
+    from routes.trips import trips_api
+    from routes.traveler import traveler_api
+    from routes.public import public_api
+    from routes.frontend import frontend
+    for blueprint in (admin_api, trips_api, traveler_api, public_api, frontend):
+        app.register_blueprint(blueprint)
+    
+    app.config['ADMIN_USERNAME'], app.config['ADMIN_PASSWORD'] = setup_admin_credentials(app.instance_path)
+    
+    # Optional write-behind reaction counting (REACTION_WRITE_BEHIND=true)
+    if os.getenv('REACTION_WRITE_BEHIND', 'false').lower() == 'true':
+        reaction_aggregator = ReactionAggregator(app, float(os.getenv('REACTION_FLUSH_INTERVAL', 2.0)))
+        reaction_aggregator.start()
+        app.extensions['reaction_aggregator'] = reaction_aggregator
+    
+    # Removal of deleted trips; the thread also resumes purges interrupted by a restart
+    trip_purger = TripPurger(app, float(os.getenv('TRIP_PURGE_INTERVAL', 60)))
+    app.extensions['trip_purger'] = trip_purger
+    if app.config['TRIP_PURGE_BACKGROUND']:
+        app.before_request(trip_purger.ensure_started)
+    
+    # Static site exports from the admin API run outside the request
+    app.extensions['static_exporter'] = StaticExporter(app, background=app.config['STATIC_EXPORT_BACKGROUND'])
+    
+    app.extensions['live_feed'] = LiveFeed(
+        app,
+        poll_interval=float(os.getenv('LIVE_FEED_POLL_INTERVAL', 1.0)),
+        max_subscribers=int(os.getenv('LIVE_FEED_MAX_SUBSCRIBERS', 100))
+    )
+    
+    return app
+
+def init_database(app):
+    """Create tables and run migrations, once even when several processes start together
+    
+    SQLite databases are switched to WAL journaling so readers in other worker
+    processes are not blocked by a writer. The pooled connections are closed
+    afterwards: with preload_app this runs in the gunicorn master, and an SQLite
+    connection must not be shared with the workers it forks.
+    """
+    os.makedirs(app.instance_path, exist_ok=True)
+    with open(os.path.join(app.instance_path, 'migrate.lock'), 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            with app.app_context():
+                if db.engine.dialect.name == 'sqlite':
+                    with db.engine.connect() as connection:
+                        connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+                db.create_all()
+                migrate_database()
+                db.session.remove()
+                db.engine.dispose()
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-        migrate_database()
+    app = create_app()
+    init_database(app)
     
     # Get configuration from environment
     host = os.getenv('FLASK_HOST', '0.0.0.0')
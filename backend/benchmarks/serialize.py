@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+RoadWeave Serialization Benchmark
+
+Serializes in-memory entries and content pieces the way the listing endpoints
+do: hand-built dicts with pytz timestamps (the previous per-route code) against
+the attrgetter serializers, then encodes the result with the stdlib JSON provider
+and, if installed, the orjson provider.
+
+Usage:
+    python benchmarks/serialize.py               # 10k rows, best of 5
+    python benchmarks/serialize.py --rows 50000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault('ADMIN_PASSWORD', 'benchmark')
+os.environ.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp())
+os.environ.setdefault('GEOCODER_CACHE_DIR', tempfile.mkdtemp())
+
+from flask.json.provider import DefaultJSONProvider
+from app import (
+    create_app, entry_to_dict, content_to_dict, orjson, OrjsonProvider,
+    Entry, Traveler, TripContent, ContentEntry
+)
+
+def legacy_timestamp_to_iso(utc_timestamp):
+    if utc_timestamp.tzinfo is None:
+        utc_timestamp = pytz.utc.localize(utc_timestamp)
+    return utc_timestamp.isoformat()
+
+def legacy_entry_to_dict(entry):
+    return {
+        'id': entry.id,
+        'content_type': entry.content_type,
+        'content': entry.content,
+        'latitude': entry.latitude,
+        'longitude': entry.longitude,
+        'place_name': entry.place_name,
+        'timestamp': legacy_timestamp_to_iso(entry.timestamp),
+        'traveler_name': entry.traveler.name,
+        'filename': entry.filename,
+        'disabled': entry.disabled
+    }
+
+def legacy_content_to_dict(content):
+    return {
+        'id': content.id,
+        'timestamp': legacy_timestamp_to_iso(content.timestamp),
+        'generated_content': content.generated_content,
+        'latitude': content.latitude,
+        'longitude': content.longitude,
+        'original_text': content.original_text,
+        'entry_ids': content.entry_id_list,
+        'content_date': content.content_date.isoformat()
+    }
+
+def build_rows(count):
+    """Transient (never persisted) entries and content pieces"""
+    traveler = Traveler(id=1, name='Benchmark Traveler', token='token', trip_id=1)
+    start = datetime(2024, 6, 1, 8, 0, 0)
+    entries, content_pieces = [], []
+    for i in range(count):
+        timestamp = start + timedelta(minutes=7 * i)
+        entries.append(Entry(
+            id=i + 1, trip_id=1, traveler=traveler, content_type='text',
+            content=f'Stopped for coffee number {i} on the way north.',
+            latitude=48.1 + i * 1e-4, longitude=11.5 + i * 1e-4, place_name='Munich',
+            timestamp=timestamp, filename=None, disabled=False
+        ))
+        content_pieces.append(TripContent(
+            id=i + 1, trip_id=1, timestamp=timestamp,
+            generated_content=f'## Day {i // 50 + 1}\n\nAnother great stop, number {i}, with coffee and a view.',
+            latitude=48.1, longitude=11.5, original_text=f'coffee {i}', content_date=timestamp.date(),
+            entry_links=[ContentEntry(entry_id=i + 1)]
+        ))
+    return entries, content_pieces
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000, result
+
+def main():
+    parser = argparse.ArgumentParser(description='RoadWeave Serialization Benchmark')
+    parser.add_argument('--rows', type=int, default=10000, help='Entries and content pieces each (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement, best is reported (default: 5)')
+    args = parser.parse_args()
+    
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    entries, content_pieces = build_rows(args.rows)
+    providers = [('stdlib', DefaultJSONProvider(app))]
+    if orjson:
+        providers.append(('orjson', OrjsonProvider(app)))
+    
+    print(f"🚀 Serialization ({args.rows} rows, best of {args.repeat})")
+    for label, rows, legacy, serializer in (
+        ('entries', entries, legacy_entry_to_dict, entry_to_dict),
+        ('content', content_pieces, legacy_content_to_dict, content_to_dict),
+    ):
+        legacy_ms, legacy_payload = best_of(args.repeat, lambda: [legacy(row) for row in rows])
+        compiled_ms, payload = best_of(args.repeat, lambda: [serializer(row) for row in rows])
+        assert payload == legacy_payload, f'{label}: serializer output differs'
+        
+        print(f"   {label}")
+        print(f"      to dict, hand-built: {legacy_ms:8.1f} ms")
+        print(f"      to dict, serializer: {compiled_ms:8.1f} ms ({legacy_ms / compiled_ms:.1f}x)")
+        with app.app_context():
+            for name, provider in providers:
+                encode_ms, body = best_of(args.repeat, lambda: provider.response(payload).get_data())
+                print(f"      encode, {name:<12} {encode_ms:8.1f} ms ({len(body) / 1024:.0f} KiB)")
+    
+    if not orjson:
+        print("   (install orjson to compare the orjson provider)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
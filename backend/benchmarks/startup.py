@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+RoadWeave Startup Benchmark
+
+Imports the backend and builds the application in fresh interpreters with
+`python -X importtime`, then reports the slowest top-level imports.
+
+Usage:
+    python benchmarks/startup.py                 # 5 runs, top 15 imports
+    python benchmarks/startup.py --runs 10 --top 25
+    python benchmarks/startup.py --max-ms 600    # exit 1 if slower (CI guard)
+
+Heavy AI, image and numeric libraries must not be imported at startup; the
+benchmark fails if any of LAZY_MODULES shows up.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first AI, image, map/statistics or timezone use only
+LAZY_MODULES = ('google.generativeai', 'PIL.Image', 'numpy', 'pytz', 'dotenv')
+
+STARTUP_CODE = '''
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+print(f"{(imported - start) * 1000:.1f} {(time.perf_counter() - imported) * 1000:.1f}")
+'''
+
+def run_once(env):
+    """One cold start: returns (import ms, create_app ms, {module: (self us, cumulative us, depth)})"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    import_ms, create_ms = (float(value) for value in result.stdout.split()[-2:])
+    return import_ms, create_ms, modules
+
+def main():
+    parser = argparse.ArgumentParser(description='RoadWeave Startup Benchmark')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts to measure (default: 5)')
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list (default: 15)')
+    parser.add_argument('--max-ms', type=float, help='Fail if the median import + create_app time exceeds this')
+    args = parser.parse_args()
+    
+    env = dict(os.environ)
+    env.setdefault('ADMIN_PASSWORD', 'benchmark')
+    env.setdefault('UPLOAD_FOLDER', tempfile.mkdtemp())
+    env.setdefault('GEOCODER_CACHE_DIR', tempfile.mkdtemp())
+    
+    # First run warms the OS file cache and bytecode caches
+    run_once(env)
+    runs = [run_once(env) for _ in range(args.runs)]
+    
+    import_ms = statistics.median(run[0] for run in runs)
+    create_ms = statistics.median(run[1] for run in runs)
+    total_ms = import_ms + create_ms
+    
+    # Median cumulative time of direct imports of app and of other top-level imports
+    cumulative = {}
+    for _, _, modules in runs:
+        for name, (_, cumulative_us, depth) in modules.items():
+            if depth <= 1 and name != 'app':
+                cumulative.setdefault(name, []).append(cumulative_us)
+    slowest = sorted(
+        ((statistics.median(times) / 1000, name) for name, times in cumulative.items()),
+        reverse=True
+    )[:args.top]
+    
+    print(f"🚀 Startup ({args.runs} runs, median)")
+    print(f"   import app:   {import_ms:8.1f} ms")
+    print(f"   create_app(): {create_ms:8.1f} ms")
+    print(f"   total:        {total_ms:8.1f} ms")
+    print()
+    print(f"   {'cumulative ms':>13} | module")
+    for ms, name in slowest:
+        print(f"   {ms:13.1f} | {name}")
+    
+    failed = False
+    loaded = sorted({name for _, _, modules in runs for name in modules if name in LAZY_MODULES})
+    if loaded:
+        print(f"❌ Imported at startup but should load lazily: {', '.join(loaded)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"❌ Startup took {total_ms:.1f} ms, budget is {args.max_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
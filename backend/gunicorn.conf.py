@@ -0,0 +1,61 @@
+"""Gunicorn configuration for RoadWeave
+
+Every setting can be overridden from the environment (or backend/.env).
+Send HUP to the master to re-read this file and replace the workers
+gracefully; code changes need a full restart because the app is preloaded.
+"""
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '7300')}")
+
+# 'sync' serves one request per process; 'gthread' adds GUNICORN_THREADS threads
+# per process so slow AI ingest requests do not tie up a whole worker
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Live feed capacity: every open stream (/api/public/<token>/live) holds one
+# thread until LIVE_FEED_MAX_DURATION closes it, so each worker accepts at most
+# this many streams and keeps its other threads for normal requests. The whole
+# deployment serves workers * live_feed_streams readers at once (2 per worker,
+# 16 with 8 workers and GUNICORN_THREADS=4); raise GUNICORN_THREADS to serve more
+live_feed_streams = int(os.getenv('LIVE_FEED_MAX_SUBSCRIBERS', max(threads // 2, 1)))
+os.environ['LIVE_FEED_MAX_SUBSCRIBERS'] = str(live_feed_streams)
+
+# Import the app (and run migrations) once in the master before forking
+preload_app = True
+
+# Photo analysis, audio transcription and blog generation call Gemini inside
+# the request, which can take well over a minute for large uploads
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 180))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 60))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers periodically to bound memory growth of the in-process caches
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+proc_name = 'roadweave'
+
+def when_ready(server):
+    server.log.info(
+        "Live feed: %d stream(s) per worker, %d in total (each holds one of %d threads per worker)",
+        live_feed_streams, live_feed_streams * workers, threads
+    )
+
+def worker_exit(server, worker):
+    """Write buffered reaction counts and the last request metrics before the worker goes away"""
+    reaction_aggregator = worker.wsgi.extensions.get('reaction_aggregator')
+    if reaction_aggregator:
+        reaction_aggregator.stop()
+    request_metrics = worker.wsgi.extensions.get('request_metrics')
+    if request_metrics:
+        request_metrics.flush()
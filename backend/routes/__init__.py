@@ -0,0 +1 @@
+"""HTTP routes, one blueprint per module, registered by app.create_app()"""
@@ -0,0 +1,500 @@
+"""Admin API: trips, travelers, content pieces, archives, static exports and traces
+
+The blueprint is registered on the application by app.create_app().
+"""
+import os
+from datetime import datetime
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, create_access_token, get_jwt_identity
+
+from app import (
+    db, ContentEntry, Entry, SyncTombstone, Traveler, Trip, TripContent, ZipStream,
+    TRACE_BUFFER_SIZE, build_trip_archive, bump_trip_versions, close_live_feeds, count_trip_rows,
+    create_content_piece, format_timestamp_local, generate_token, get_content_pieces_for_entry,
+    get_entry_or_404, get_trip_or_404, import_trip_archive, local_date, lock_static_export,
+    prune_sync_tombstones, read_static_export_status, record_trip_events, static_export_dir,
+    token_cache, trace_to_dict, tracer
+)
+from serializers import timestamp_to_iso, trip_to_dict
+
+admin_api = Blueprint('admin_api', __name__)
+
+@admin_api.route('/api/admin/login', methods=['POST'])
+def admin_login():
+    data = request.get_json()
+    username = data.get('username')
+    password = data.get('password')
+    
+    if username == current_app.config['ADMIN_USERNAME'] and password == current_app.config['ADMIN_PASSWORD']:
+        token = create_access_token(identity='admin')
+        return jsonify({'token': token})
+    
+    return jsonify({'error': 'Invalid credentials'}), 401
+
+@admin_api.route('/api/admin/trips', methods=['POST'])
+@jwt_required()
+def create_trip():
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    data = request.get_json()
+    name = data.get('name')
+    description = data.get('description', '')
+    blog_language = data.get('blog_language', 'en')
+    
+    if not name:
+        return jsonify({'error': 'Trip name is required'}), 400
+    
+    admin_token = generate_token()
+    trip = Trip(name=name, description=description, admin_token=admin_token, blog_language=blog_language)
+    db.session.add(trip)
+    db.session.commit()
+    
+    return jsonify({
+        'id': trip.id,
+        'name': trip.name,
+        'description': trip.description,
+        'blog_language': trip.blog_language,
+        'admin_token': trip.admin_token,
+        'created_at': timestamp_to_iso(trip.created_at)
+    })
+
+@admin_api.route('/api/admin/trips', methods=['GET'])
+@jwt_required()
+def get_trips():
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trips = Trip.query.filter(Trip.deleted_at.is_(None)).all()
+    return jsonify([trip_to_dict(trip) for trip in trips])
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/travelers', methods=['POST'])
+@jwt_required()
+def add_traveler(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    data = request.get_json()
+    name = data.get('name')
+    
+    if not name:
+        return jsonify({'error': 'Traveler name is required'}), 400
+    
+    token = generate_token()
+    traveler = Traveler(name=name, token=token, trip_id=trip.id)
+    db.session.add(traveler)
+    db.session.commit()
+    token_cache.invalidate(('traveler', token))
+    
+    return jsonify({
+        'id': traveler.id,
+        'name': traveler.name,
+        'token': traveler.token,
+        'link': f'/traveler/{traveler.token}'
+    })
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/regenerate-blog', methods=['POST'])
+@jwt_required()
+def regenerate_blog(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    all_entries = Entry.query.filter_by(trip_id=trip_id).order_by(Entry.timestamp.asc()).all()
+    
+    # Filter out disabled entries
+    enabled_entries = [entry for entry in all_entries if not entry.disabled]
+    disabled_count = len(all_entries) - len(enabled_entries)
+    
+    # Clear existing content pieces and their entry links, leaving tombstones for delta sync and
+    # deletion events for the live feed (the bulk delete skips the flush hooks that write both)
+    trip_content_ids = db.session.query(TripContent.id).filter_by(trip_id=trip_id)
+    record_trip_events(db.session, [
+        (trip_id, 'content.deleted', {'id': content_id}) for (content_id,) in trip_content_ids
+    ])
+    bump_trip_versions([trip_id])
+    db.session.execute(SyncTombstone.__table__.insert().from_select(
+        ['trip_id', 'row_type', 'row_id', 'sync_version'],
+        db.select(TripContent.trip_id, db.literal('content'), TripContent.id, Trip.content_version).join(
+            Trip, Trip.id == TripContent.trip_id
+        ).where(TripContent.trip_id == trip_id)
+    ))
+    ContentEntry.query.filter(ContentEntry.content_piece_id.in_(trip_content_ids)).delete(synchronize_session=False)
+    TripContent.query.filter_by(trip_id=trip_id).delete()
+    prune_sync_tombstones(db.session, [trip_id])
+    
+    # Reset blog content (keep for backwards compatibility during transition)
+    trip.blog_content = f"# {trip.name}\n\n{trip.description}\n"
+    
+    # Process each enabled entry to create new content pieces
+    created_count = 0
+    for entry in enabled_entries:
+        try:
+            create_content_piece(trip, entry)
+            created_count += 1
+        except Exception as e:
+            print(f"Content piece creation failed for entry {entry.id}: {e}")
+    
+    db.session.commit()
+    
+    # Build informative response message
+    message = f'Blog regenerated successfully. Created {created_count} content pieces from {len(enabled_entries)} enabled entries.'
+    if disabled_count > 0:
+        message += f' Skipped {disabled_count} disabled entries.'
+    
+    return jsonify({'message': message})
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/migrate-content', methods=['POST'])
+@jwt_required()
+def migrate_existing_content(trip_id):
+    """Migrate existing blog_content to TripContent records"""
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    entries = Entry.query.filter_by(trip_id=trip_id).order_by(Entry.timestamp.asc()).all()
+    
+    # Check if migration is needed
+    if not trip.blog_content or trip.blog_content.strip() == f"# {trip.name}\n\n{trip.description}":
+        return jsonify({'message': 'No content to migrate or content already empty.'})
+    
+    # Check if TripContent records already exist
+    existing_content_count = TripContent.query.filter_by(trip_id=trip_id).count()
+    if existing_content_count > 0:
+        return jsonify({
+            'error': f'Trip already has {existing_content_count} content pieces. Use regenerate-blog to recreate them.'
+        }), 400
+    
+    try:
+        # Simple migration: create one content piece per entry based on timestamp
+        # This is a best-effort approach since we can't perfectly parse the monolithic content
+        migrated_count = 0
+        
+        for entry in entries:
+            # Create a simple content piece for each entry
+            content_text = f"**{format_timestamp_local(entry.timestamp)}** - {entry.traveler.name} shared a {entry.content_type}"
+            if entry.content:
+                content_text += f": {entry.content}"
+            
+            # Add photo marker if it's a photo
+            if entry.content_type == 'photo' and entry.filename:
+                content_text += f"\n\n[PHOTO:{entry.id}]"
+            
+            # Create TripContent record
+            trip_content = TripContent(
+                trip_id=trip.id,
+                timestamp=entry.timestamp,
+                generated_content=content_text,
+                latitude=entry.latitude,
+                longitude=entry.longitude,
+                original_text=entry.content,
+                entry_links=[ContentEntry(entry_id=entry.id)],
+                content_date=local_date(entry.timestamp)
+            )
+            
+            db.session.add(trip_content)
+            migrated_count += 1
+        
+        # Backup the original blog_content
+        trip.blog_content = f"# {trip.name}\n\n{trip.description}\n\n<!-- Original content migrated to individual pieces -->"
+        
+        db.session.commit()
+        
+        return jsonify({
+            'message': f'Migration completed successfully. Created {migrated_count} content pieces from {len(entries)} entries.',
+            'migrated_entries': migrated_count,
+            'total_entries': len(entries)
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': f'Migration failed: {str(e)}'
+        }), 500
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/language', methods=['PUT'])
+@jwt_required()
+def update_trip_language(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    data = request.get_json()
+    new_language = data.get('language')
+    
+    if not new_language:
+        return jsonify({'error': 'Language is required'}), 400
+    
+    trip.blog_language = new_language
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Language updated successfully',
+        'language': trip.blog_language
+    })
+
+@admin_api.route('/api/admin/trips/<int:trip_id>', methods=['DELETE'])
+@jwt_required()
+def delete_trip(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    # Hide the trip right away; rows and uploaded files are removed in the background
+    trip.deleted_at = datetime.utcnow()
+    close_live_feeds(db.session, trip.id)
+    db.session.commit()
+    token_cache.invalidate_trip(trip_id)
+    if current_app.config['TRIP_PURGE_BACKGROUND']:
+        current_app.extensions['trip_purger'].wake()
+    
+    return jsonify({
+        'message': 'Trip deletion started',
+        'status': 'deleting',
+        'remaining': count_trip_rows(trip_id),
+    }), 202
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/deletion', methods=['GET'])
+@jwt_required()
+def get_trip_deletion(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    deleted_at = db.session.query(Trip.deleted_at).filter(Trip.id == trip_id).first()
+    if deleted_at is None:
+        return jsonify({'status': 'deleted'})
+    if deleted_at[0] is None:
+        return jsonify({'error': 'Trip is not being deleted'}), 404
+    
+    return jsonify({
+        'status': 'deleting',
+        'deleted_at': timestamp_to_iso(deleted_at[0]),
+        'remaining': count_trip_rows(trip_id),
+    })
+
+@admin_api.route('/api/admin/traces', methods=['GET'])
+@jwt_required()
+def get_traces():
+    """Slowest recent traces of this worker process, with the time spent in each stage"""
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    limit = max(1, min(request.args.get('limit', 20, type=int), TRACE_BUFFER_SIZE))
+    name = request.args.get('name')
+    traces = [spans for spans in tracer.recent_traces() if not name or spans[0].name == name]
+    traces.sort(key=lambda spans: spans[0].end_time - spans[0].start_time, reverse=True)
+    
+    return jsonify({
+        'pid': os.getpid(),
+        'buffered': len(traces),
+        'traces': [trace_to_dict(spans) for spans in traces[:limit]],
+    })
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/public', methods=['PUT'])
+@jwt_required()
+def toggle_public_access(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    data = request.get_json()
+    enabled = data.get('enabled', False)
+    
+    old_token = trip.public_token
+    trip.public_enabled = enabled
+    if enabled and not trip.public_token:
+        trip.public_token = generate_token()
+    elif not enabled:
+        trip.public_token = None
+        close_live_feeds(db.session, trip.id)
+    
+    db.session.commit()
+    token_cache.invalidate_trip(trip.id)
+    for token in (old_token, trip.public_token):
+        token_cache.invalidate(('public', token))
+    
+    return jsonify({
+        'message': 'Public access updated successfully',
+        'public_enabled': trip.public_enabled,
+        'public_token': trip.public_token
+    })
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/export-static', methods=['POST'])
+@jwt_required()
+def export_static(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    if not trip.public_enabled:
+        return jsonify({'error': 'Enable public access before exporting the trip'}), 400
+    
+    lock_file = lock_static_export(trip.id)
+    if lock_file is None:
+        return jsonify({'error': 'An export of this trip is already running', **read_static_export_status(trip.id)}), 409
+    current_app.extensions['static_exporter'].start(trip.id, lock_file)
+    
+    return jsonify({
+        'message': 'Static export started',
+        'path': os.path.abspath(static_export_dir(trip.id)),
+        **read_static_export_status(trip.id)
+    }), 202
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/export-static', methods=['GET'])
+@jwt_required()
+def get_static_export(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    return jsonify({'path': os.path.abspath(static_export_dir(trip.id)), **read_static_export_status(trip.id)})
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/archive', methods=['GET'])
+@jwt_required()
+def export_trip_archive(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    archive = ZipStream(build_trip_archive(trip))
+    etag = archive.etag()
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{etag}"',
+        'Content-Disposition': f'attachment; filename="trip-{trip.id}.zip"',
+    }
+    
+    # Resume: a single byte range, honoured only while the archive is unchanged (If-Range)
+    byte_range = request.range
+    if byte_range and len(byte_range.ranges) == 1 and request.headers.get('If-Range', f'"{etag}"') == f'"{etag}"':
+        bounds = byte_range.range_for_length(archive.size)
+        if bounds is None:
+            return Response(status=416, headers={**headers, 'Content-Range': f'bytes */{archive.size}'})
+        start, stop = bounds
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{archive.size}'
+        headers['Content-Length'] = str(stop - start)
+        return Response(archive.iter_bytes(start, stop), status=206, mimetype='application/zip', headers=headers)
+    
+    headers['Content-Length'] = str(archive.size)
+    return Response(archive.iter_bytes(), mimetype='application/zip', headers=headers)
+
+@admin_api.route('/api/admin/trips/import', methods=['POST'])
+@jwt_required()
+def import_trip():
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    archive = request.files.get('archive')
+    if not archive:
+        return jsonify({'error': 'Trip archive file is required'}), 400
+    
+    try:
+        trip = import_trip_archive(archive.stream)
+    except ValueError as e:
+        return jsonify({'error': f'Invalid trip archive: {e}'}), 400
+    
+    return jsonify({
+        'message': 'Trip imported successfully',
+        **trip_to_dict(trip),
+    })
+
+@admin_api.route('/api/admin/trips/<int:trip_id>/reactions', methods=['PUT'])
+@jwt_required()
+def toggle_reactions(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    data = request.get_json()
+    enabled = data.get('enabled', True)
+    
+    trip.reactions_enabled = enabled
+    db.session.commit()
+    token_cache.invalidate_trip(trip.id)
+    
+    return jsonify({
+        'message': 'Reactions setting updated successfully',
+        'reactions_enabled': trip.reactions_enabled
+    })
+
+@admin_api.route('/api/admin/entries/<int:entry_id>/coordinates', methods=['PUT'])
+@jwt_required()
+def update_entry_coordinates(entry_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    entry = get_entry_or_404(entry_id)
+    data = request.get_json()
+    
+    latitude = data.get('latitude')
+    longitude = data.get('longitude')
+    
+    if latitude is not None and longitude is not None:
+        # Validate coordinate ranges
+        if not (-90 <= latitude <= 90):
+            return jsonify({'error': 'Latitude must be between -90 and 90'}), 400
+        if not (-180 <= longitude <= 180):
+            return jsonify({'error': 'Longitude must be between -180 and 180'}), 400
+        
+        entry.latitude = latitude
+        entry.longitude = longitude
+    else:
+        # Clear coordinates if null values are provided
+        entry.latitude = None
+        entry.longitude = None
+    
+    db.session.commit()
+    
+    return jsonify({
+        'message': 'Coordinates updated successfully',
+        'id': entry.id,
+        'latitude': entry.latitude,
+        'longitude': entry.longitude
+    })
+
+@admin_api.route('/api/admin/entries/<int:entry_id>/toggle-disabled', methods=['PUT'])
+@jwt_required()
+def toggle_entry_disabled(entry_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    entry = get_entry_or_404(entry_id)
+    
+    # Toggle the disabled state
+    entry.disabled = not entry.disabled
+    db.session.commit()
+    
+    return jsonify({
+        'message': f'Entry {"disabled" if entry.disabled else "enabled"} successfully',
+        'id': entry.id,
+        'disabled': entry.disabled
+    })
+
+@admin_api.route('/api/admin/entries/<int:entry_id>/regenerate', methods=['POST'])
+@jwt_required()
+def regenerate_entry_content(entry_id):
+    """Recreate only the content piece(s) of a single entry"""
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    entry = get_entry_or_404(entry_id)
+    
+    for content_piece in get_content_pieces_for_entry(entry.id):
+        db.session.delete(content_piece)
+    db.session.commit()
+    
+    if entry.disabled:
+        return jsonify({
+            'message': 'Entry is disabled - removed its content without regenerating',
+            'content_ids': []
+        })
+    
+    content_piece = create_content_piece(entry.trip, entry)
+    
+    return jsonify({
+        'message': 'Entry content regenerated successfully',
+        'content_ids': [content_piece.id]
+    })
@@ -0,0 +1,93 @@
+"""Uploads, health and metrics endpoints and the built React app
+
+The blueprint is registered on the application by app.create_app().
+"""
+import os
+import secrets
+
+from flask import Blueprint, Response, current_app, jsonify, request, send_from_directory
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from app import format_prometheus
+
+# Built with `cd frontend && npm run build`, served in production mode
+REACT_BUILD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'frontend', 'build')
+
+frontend = Blueprint('frontend', __name__)
+
+@frontend.route('/uploads/<filename>')
+def uploaded_file(filename):
+    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+
+@frontend.route('/api/health')
+def health():
+    return jsonify({'status': 'healthy'})
+
+@frontend.route('/metrics')
+def metrics():
+    """Prometheus metrics, for the admin or scrapers sending `Authorization: Bearer <METRICS_TOKEN>`"""
+    request_metrics = current_app.extensions.get('request_metrics')
+    if request_metrics is None:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    
+    metrics_token = current_app.config.get('METRICS_TOKEN')
+    authorization = request.headers.get('Authorization', '')
+    if not (metrics_token and secrets.compare_digest(authorization, f'Bearer {metrics_token}')):
+        verify_jwt_in_request()
+        if get_jwt_identity() != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+    
+    totals, live = request_metrics.collect()
+    body = format_prometheus(totals)
+    body += f'# HELP roadweave_worker_processes Processes reporting metrics\n# TYPE roadweave_worker_processes gauge\nroadweave_worker_processes {live}\n'
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+# Serve static files explicitly (before catch-all route)
+@frontend.route('/static/<path:filename>')
+def serve_static(filename):
+    """Serve static files from React build directory"""
+    if os.getenv('FLASK_ENV') == 'production' or os.getenv('FLASK_DEBUG', 'True').lower() == 'false':
+        static_dir = os.path.join(REACT_BUILD_DIR, 'static')
+        
+        if os.path.exists(static_dir):
+            response = send_from_directory(static_dir, filename)
+            
+            # Set correct MIME types
+            if filename.endswith('.css'):
+                response.headers['Content-Type'] = 'text/css'
+            elif filename.endswith('.js'):
+                response.headers['Content-Type'] = 'application/javascript'
+            elif filename.endswith('.map'):
+                response.headers['Content-Type'] = 'application/json'
+                
+            return response
+    return jsonify({'error': 'Static file not found'}), 404
+
+# Serve React App (production mode)
+@frontend.route('/', defaults={'path': ''})
+@frontend.route('/<path:path>')
+def serve_react_app(path):
+    """Serve React app for all non-API routes in production"""
+    # Check if we're in production mode
+    if os.getenv('FLASK_ENV') == 'production' or os.getenv('FLASK_DEBUG', 'True').lower() == 'false':
+        # If build directory doesn't exist, return error
+        if not os.path.exists(REACT_BUILD_DIR):
+            return jsonify({
+                'error': 'Frontend not built',
+                'message': 'Run "cd frontend && npm run build" first'
+            }), 500
+        
+        # Serve static files
+        if path and os.path.exists(os.path.join(REACT_BUILD_DIR, path)):
+            return send_from_directory(REACT_BUILD_DIR, path)
+        
+        # For all other routes, serve index.html (React Router will handle routing)
+        return send_from_directory(REACT_BUILD_DIR, 'index.html')
+    
+    # In development mode, return API info
+    return jsonify({
+        'message': 'RoadWeave API',
+        'status': 'Development mode',
+        'frontend': 'Run separately with npm start',
+        'version': '1.0.0'
+    })
@@ -0,0 +1,309 @@
+"""Public blog API for trips shared with a public token
+
+The blueprint is registered on the application by app.create_app().
+"""
+import queue
+import time
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import (
+    db, Entry, Trip, TripContent, LIVE_FEED_RETRY_MS, REACTION_TYPES, build_calendar_data,
+    build_reaction_upsert, cached_trip_response, changes_response, clusters_response,
+    conditional_json, format_sse, get_reaction_aggregator, get_reaction_counts,
+    get_trip_reaction_counts, load_trip_events, paginated_response, parse_date_param,
+    parse_date_range_args, query_date_range, resolve_public_trip, route_response, search_response,
+    serialize_date_range, stats_response, trip_bundle_response, viewport_response
+)
+from serializers import public_entry_to_dict, content_to_dict, blog_to_dict
+
+public_api = Blueprint('public_api', __name__)
+
+@public_api.route('/api/public/<token>')
+def get_public_blog(token):
+    public_trip = resolve_public_trip(token)
+    if not public_trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    trip = db.session.get(Trip, public_trip.id)
+    if trip is None or trip.deleted_at or not trip.public_enabled:  # changed since the lookup was cached
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    return jsonify({**blog_to_dict(trip), 'reactions_enabled': trip.reactions_enabled})
+
+@public_api.route('/api/public/<token>/entries')
+def get_public_entries(token):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    # Return all entries for blog content rendering, but include location info for mapping
+    entries = Entry.query.options(joinedload(Entry.traveler)).filter_by(trip_id=trip.id)
+    
+    return cached_trip_response(trip, lambda: paginated_response(entries, Entry, public_entry_to_dict))
+
+@public_api.route('/api/public/<token>/content')
+def get_public_trip_content(token):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter_by(trip_id=trip.id)
+    
+    return cached_trip_response(trip, lambda: paginated_response(content_pieces, TripContent, content_to_dict))
+
+@public_api.route('/api/public/<token>/content/calendar')
+def get_public_calendar_data(token):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return cached_trip_response(trip, lambda: jsonify(build_calendar_data(trip.id)))
+
+@public_api.route('/api/public/<token>/content/date/<date>')
+def get_public_content_by_date(token, date):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    target_date = parse_date_param(date)
+    if not target_date:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    def build():
+        entries, content_pieces = query_date_range(trip.id, target_date, target_date)
+        return jsonify({'date': date, **serialize_date_range(entries, content_pieces)})
+    
+    return cached_trip_response(trip, build)
+
+@public_api.route('/api/public/<token>/content/range')
+def get_public_content_by_range(token):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    start_date, end_date, error = parse_date_range_args()
+    if error:
+        return error
+    
+    def build():
+        entries, content_pieces = query_date_range(trip.id, start_date, end_date)
+        return jsonify({
+            'start': start_date.isoformat(),
+            'end': end_date.isoformat(),
+            **serialize_date_range(entries, content_pieces)
+        })
+    
+    return cached_trip_response(trip, build)
+
+@public_api.route('/api/public/<token>/viewport')
+def get_public_viewport(token):
+    """Geotagged entries (or content pieces) inside the visible map area"""
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return viewport_response(trip.id, public_entry_to_dict)
+
+@public_api.route('/api/public/<token>/clusters')
+def get_public_clusters(token):
+    """Map marker clusters for one zoom level"""
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return clusters_response(trip.id, public_entry_to_dict)
+
+@public_api.route('/api/public/<token>/route')
+def get_public_route(token):
+    """Simplified travel route as an encoded polyline"""
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return route_response(trip.id)
+
+@public_api.route('/api/public/<token>/stats')
+def get_public_stats(token):
+    """Travel statistics: distance, daily movement, per-traveler totals"""
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return stats_response(trip.id)
+
+@public_api.route('/api/public/<token>/search')
+def search_public_content(token):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return search_response(trip.id, include_entries=False)
+
+@public_api.route('/api/public/<token>/changes')
+def get_public_changes(token):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return cached_trip_response(trip, lambda: changes_response(trip.id, public_entry_to_dict))
+
+@public_api.route('/api/public/<token>/bundle')
+def get_public_bundle(token):
+    """Everything the public blog view loads on first paint, in one response"""
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    return trip_bundle_response(trip)
+
+@public_api.route('/api/public/<token>/reactions')
+def get_trip_reactions(token):
+    """Reaction counts of all content pieces of a trip, or of ?ids=1,2,3"""
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    content_ids = None
+    ids_param = request.args.get('ids')
+    if ids_param is not None:
+        try:
+            content_ids = {int(content_id) for content_id in ids_param.split(',') if content_id.strip()}
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of content IDs'}), 400
+    
+    all_counts = get_trip_reaction_counts(trip.id, content_ids)
+    
+    return conditional_json({
+        'reactions': {str(content_id): counts for content_id, counts in sorted(all_counts.items())}
+    })
+
+@public_api.route('/api/public/<token>/reactions/<int:content_id>')
+def get_reactions(token, content_id):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    # Check if content piece exists and belongs to this trip
+    content_piece = TripContent.query.filter_by(id=content_id, trip_id=trip.id).first()
+    if not content_piece:
+        return jsonify({'error': 'Content not found'}), 404
+    
+    return conditional_json(get_reaction_counts(content_id))
+
+@public_api.route('/api/public/<token>/reactions/<int:content_id>', methods=['POST'])
+def add_reaction(token, content_id):
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    # Check if content piece exists and belongs to this trip
+    content_piece = TripContent.query.filter_by(id=content_id, trip_id=trip.id).first()
+    if not content_piece:
+        return jsonify({'error': 'Content not found'}), 404
+    
+    data = request.get_json()
+    reaction_type = data.get('reaction_type')
+    action = data.get('action')  # 'add' or 'remove'
+    
+    # Validate reaction type
+    if reaction_type not in REACTION_TYPES:
+        return jsonify({'error': 'Invalid reaction type'}), 400
+    
+    # Validate action
+    if action not in ['add', 'remove']:
+        return jsonify({'error': 'Action must be "add" or "remove"'}), 400
+    
+    delta = 1 if action == 'add' else -1
+    
+    try:
+        reaction_aggregator = get_reaction_aggregator()
+        if reaction_aggregator:
+            reaction_aggregator.add(trip.id, content_id, reaction_type, delta)
+        else:
+            db.session.execute(build_reaction_upsert(trip.id, content_id, reaction_type, delta))
+            db.session.commit()
+            current_app.extensions['live_feed'].reactions_changed(trip.id, content_id)
+        
+        return jsonify({
+            'message': f'Reaction {action}ed successfully',
+            'reactions': get_reaction_counts(content_id)
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update reaction'}), 500
+
+@public_api.route('/api/public/<token>/live')
+def live_feed_stream(token):
+    """Server-Sent Events of new, updated and deleted content pieces and reaction counts
+    
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) and get the
+    events they missed replayed from the trip event log; a `reset` event means
+    the log no longer reaches back that far and the client should reload.
+    """
+    trip = resolve_public_trip(token)
+    if not trip:
+        return jsonify({'error': 'Blog not found or not publicly accessible'}), 404
+    
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({'error': 'Invalid Last-Event-ID'}), 400
+    
+    live_feed = current_app.extensions['live_feed']
+    subscription = live_feed.subscribe(trip.id)
+    if subscription is None:
+        return jsonify({'error': 'Too many live feed connections, try again later'}), 503
+    
+    try:
+        if last_event_id is not None:
+            replay, trimmed = load_trip_events(trip.id, last_event_id)
+        else:
+            replay, trimmed = [], False
+    except Exception:
+        live_feed.unsubscribe(subscription)
+        raise
+    heartbeat = current_app.config['LIVE_FEED_HEARTBEAT']
+    max_duration = current_app.config['LIVE_FEED_MAX_DURATION']
+    
+    def generate():
+        try:
+            yield f"retry: {LIVE_FEED_RETRY_MS}\n\n"
+            if trimmed:
+                yield "event: reset\ndata: {}\n\n"
+            sent_id = last_event_id or 0
+            for event in replay:
+                if event.event_type != 'closed':  # the trip has been public again since
+                    yield format_sse(event)
+                sent_id = event.id
+            
+            # Connections are closed after max_duration so threads are recycled;
+            # EventSource reconnects by itself with Last-Event-ID
+            deadline = time.monotonic() + max_duration
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event = subscription.events.get(timeout=min(heartbeat, remaining))
+                except queue.Empty:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:
+                    yield "event: reset\ndata: {}\n\n"
+                    return
+                if event.event_type == 'closed':
+                    yield "event: closed\ndata: {}\n\n"
+                    return
+                if event.id > sent_id:
+                    yield format_sse(event)
+                    sent_id = event.id
+        finally:
+            live_feed.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+    })
+    # The finally above only runs once iteration has started; HEAD requests and clients
+    # gone before the first byte close the response without iterating it
+    response.call_on_close(lambda: live_feed.unsubscribe(subscription))
+    return response
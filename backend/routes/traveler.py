@@ -0,0 +1,84 @@
+"""Traveler API: posting entries with a traveler token
+
+The blueprint is registered on the application by app.create_app().
+"""
+import os
+import uuid
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.utils import secure_filename
+
+from app import (
+    db, Entry, Traveler, allowed_file, create_content_piece, get_current_span, resolve_traveler,
+    traced, tracer
+)
+
+traveler_api = Blueprint('traveler_api', __name__)
+
+@traveler_api.route('/api/traveler/verify/<token>', methods=['GET'])
+def verify_traveler_token(token):
+    identity = resolve_traveler(token)
+    if not identity:
+        return jsonify({'error': 'Invalid token'}), 404
+    
+    traveler = db.session.get(Traveler, identity.id)
+    if traveler is None or traveler.trip.deleted_at:  # removed since the lookup was cached
+        return jsonify({'error': 'Invalid token'}), 404
+    return jsonify({
+        'traveler': {
+            'id': traveler.id,
+            'name': traveler.name,
+            'trip_name': traveler.trip.name,
+            'trip': {
+                'id': traveler.trip.id,
+                'name': traveler.trip.name,
+                'blog_language': traveler.trip.blog_language
+            }
+        }
+    })
+
+@traveler_api.route('/api/traveler/<token>/entries', methods=['POST'])
+@traced('create_entry')
+def create_entry(token):
+    traveler = resolve_traveler(token)
+    if not traveler:
+        return jsonify({'error': 'Invalid token'}), 404
+    
+    content_type = request.form.get('content_type')
+    get_current_span().set_attributes({'trip.id': traveler.trip_id, 'entry.content_type': content_type or ''})
+    content = request.form.get('content', '')
+    latitude = request.form.get('latitude', type=float)
+    longitude = request.form.get('longitude', type=float)
+    
+    filename = None
+    if 'file' in request.files:
+        file = request.files['file']
+        if file and file.filename and allowed_file(file.filename):
+            filename = secure_filename(f"{uuid.uuid4()}_{file.filename}")
+            with tracer.start_as_current_span('file.save'):
+                file.save(os.path.join(current_app.config['UPLOAD_FOLDER'], filename))
+    
+    entry = Entry(
+        trip_id=traveler.trip_id,
+        traveler_id=traveler.id,
+        content_type=content_type,
+        content=content,
+        latitude=latitude,
+        longitude=longitude,
+        filename=filename
+    )
+    
+    with tracer.start_as_current_span('entry.commit'):
+        db.session.add(entry)
+        db.session.commit()
+    
+    # Create AI-generated content piece
+    try:
+        create_content_piece(entry.trip, entry)
+    except Exception as e:
+        print(f"Content piece creation failed: {e}")
+    
+    return jsonify({
+        'id': entry.id,
+        'message': 'Entry created successfully'
+    })
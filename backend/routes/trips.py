@@ -0,0 +1,156 @@
+"""Admin views of a trip: entries, content, calendar, map and statistics
+
+The blueprint is registered on the application by app.create_app().
+"""
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import (
+    Entry, TripContent, build_calendar_data, changes_response, clusters_response, get_trip_or_404,
+    paginated_response, parse_date_param, parse_date_range_args, query_date_range, route_response,
+    search_response, serialize_date_range, stats_response, viewport_response
+)
+from serializers import entry_to_dict, content_to_dict, blog_to_dict, traveler_to_dict
+
+trips_api = Blueprint('trips_api', __name__)
+
+@trips_api.route('/api/trips/<int:trip_id>/travelers', methods=['GET'])
+def get_travelers(trip_id):
+    trip = get_trip_or_404(trip_id)
+    return jsonify([traveler_to_dict(traveler) for traveler in trip.travelers])
+
+@trips_api.route('/api/trips/<int:trip_id>/blog', methods=['GET'])
+@jwt_required()
+def get_blog(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+        
+    trip = get_trip_or_404(trip_id)
+    return jsonify(blog_to_dict(trip))
+
+@trips_api.route('/api/trips/<int:trip_id>/entries', methods=['GET'])
+@jwt_required()
+def get_entries(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+        
+    trip = get_trip_or_404(trip_id)
+    entries = Entry.query.options(joinedload(Entry.traveler)).filter_by(trip_id=trip.id)
+    
+    return paginated_response(entries, Entry, entry_to_dict)
+
+@trips_api.route('/api/trips/<int:trip_id>/content', methods=['GET'])
+@jwt_required()
+def get_trip_content(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    content_pieces = TripContent.query.options(selectinload(TripContent.entry_links)).filter_by(trip_id=trip.id)
+    
+    return paginated_response(content_pieces, TripContent, content_to_dict)
+
+@trips_api.route('/api/trips/<int:trip_id>/viewport', methods=['GET'])
+@jwt_required()
+def get_viewport(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return viewport_response(trip.id, entry_to_dict)
+
+@trips_api.route('/api/trips/<int:trip_id>/clusters', methods=['GET'])
+@jwt_required()
+def get_clusters(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return clusters_response(trip.id, entry_to_dict)
+
+@trips_api.route('/api/trips/<int:trip_id>/route', methods=['GET'])
+@jwt_required()
+def get_route(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return route_response(trip.id)
+
+@trips_api.route('/api/trips/<int:trip_id>/stats', methods=['GET'])
+@jwt_required()
+def get_stats(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return stats_response(trip.id)
+
+@trips_api.route('/api/trips/<int:trip_id>/search', methods=['GET'])
+@jwt_required()
+def search_trip_content(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return search_response(trip.id, include_entries=True)
+
+@trips_api.route('/api/trips/<int:trip_id>/content/calendar', methods=['GET'])
+@jwt_required()
+def get_calendar_data(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return jsonify(build_calendar_data(trip.id))
+
+@trips_api.route('/api/trips/<int:trip_id>/content/date/<date>', methods=['GET'])
+@jwt_required()
+def get_content_by_date(trip_id, date):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    target_date = parse_date_param(date)
+    if not target_date:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    
+    trip = get_trip_or_404(trip_id)
+    entries, content_pieces = query_date_range(trip.id, target_date, target_date)
+    
+    return jsonify({'date': date, **serialize_date_range(entries, content_pieces)})
+
+@trips_api.route('/api/trips/<int:trip_id>/content/range', methods=['GET'])
+@jwt_required()
+def get_content_by_range(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    start_date, end_date, error = parse_date_range_args()
+    if error:
+        return error
+    
+    trip = get_trip_or_404(trip_id)
+    entries, content_pieces = query_date_range(trip.id, start_date, end_date)
+    
+    return jsonify({
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        **serialize_date_range(entries, content_pieces)
+    })
+
+@trips_api.route('/api/trips/<int:trip_id>/changes', methods=['GET'])
+@jwt_required()
+def get_trip_changes(trip_id):
+    if get_jwt_identity() != 'admin':
+        return jsonify({'error': 'Admin access required'}), 403
+    
+    trip = get_trip_or_404(trip_id)
+    
+    return changes_response(trip.id, entry_to_dict)
@@ -0,0 +1,164 @@
+"""Row-to-dict serializers and JSON encoding shared by the RoadWeave API
+
+Every listing builds its dicts with the functions defined here, so an entry or
+content piece has the same shape in all routes. The serializers read attributes
+by name and work on any object with those attributes (ORM rows, named tuples).
+"""
+import operator
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # Optional: faster JSON encoding of API responses
+except ImportError:
+    orjson = None
+
+def timestamp_to_iso(utc_timestamp):
+    """Convert UTC timestamp to ISO format with timezone info"""
+    try:
+        if utc_timestamp.tzinfo is None:
+            # Stored timestamps are naive UTC: append the offset instead of localizing via pytz
+            return utc_timestamp.isoformat() + '+00:00'
+        return utc_timestamp.isoformat()
+    except AttributeError as e:
+        print(f"ISO timestamp conversion error: {e}")
+        return str(utc_timestamp) if utc_timestamp is not None else None
+
+def optional_isoformat(value):
+    return value.isoformat() if value is not None else None
+
+def make_serializer(*fields):
+    """Build a row-to-dict function from (key, attribute) or (key, attribute, converter) fields
+    
+    All attributes are read with one operator.attrgetter call into a tuple;
+    dotted attributes follow relationships (e.g. 'traveler.name') and load
+    them if needed.
+    """
+    keys = tuple(field[0] for field in fields)
+    attributes = [field[1] for field in fields]
+    getter = operator.attrgetter(*attributes)
+    if len(attributes) == 1:
+        # attrgetter returns a bare value rather than a 1-tuple for one attribute
+        getter = lambda row, get=getter: (get(row),)
+    converters = tuple((index, field[2]) for index, field in enumerate(fields) if len(field) > 2)
+    
+    if not converters:
+        def serialize(row):
+            return dict(zip(keys, getter(row)))
+    else:
+        def serialize(row):
+            values = list(getter(row))
+            for index, convert in converters:
+                values[index] = convert(values[index])
+            return dict(zip(keys, values))
+    return serialize
+
+# Admin entries listing
+entry_to_dict = make_serializer(
+    ('id', 'id'),
+    ('content_type', 'content_type'),
+    ('content', 'content'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('place_name', 'place_name'),
+    ('timestamp', 'timestamp', timestamp_to_iso),
+    ('traveler_name', 'traveler.name'),
+    ('filename', 'filename'),
+    ('disabled', 'disabled'),
+)
+
+# Public entries listing (no text content)
+public_entry_to_dict = make_serializer(
+    ('id', 'id'),
+    ('content_type', 'content_type'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('place_name', 'place_name'),
+    ('timestamp', 'timestamp', timestamp_to_iso),
+    ('traveler_name', 'traveler.name'),
+    ('filename', 'filename'),
+)
+
+# Entries of the date and range endpoints
+date_range_entry_to_dict = make_serializer(
+    ('id', 'id'),
+    ('content_type', 'content_type'),
+    ('content', 'content'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('place_name', 'place_name'),
+    ('timestamp', 'timestamp', timestamp_to_iso),
+    ('entry_date', 'entry_date', optional_isoformat),
+    ('traveler_name', 'traveler.name'),
+    ('filename', 'filename'),
+)
+
+# Content listings
+content_to_dict = make_serializer(
+    ('id', 'id'),
+    ('timestamp', 'timestamp', timestamp_to_iso),
+    ('generated_content', 'generated_content'),
+    ('latitude', 'latitude'),
+    ('longitude', 'longitude'),
+    ('original_text', 'original_text'),
+    ('entry_ids', 'entry_id_list'),
+    ('content_date', 'content_date', date.isoformat),
+)
+
+# Admin trip listing
+trip_to_dict = make_serializer(
+    ('id', 'id'),
+    ('name', 'name'),
+    ('description', 'description'),
+    ('blog_language', 'blog_language'),
+    ('public_enabled', 'public_enabled'),
+    ('public_token', 'public_token'),
+    ('reactions_enabled', 'reactions_enabled'),
+    ('created_at', 'created_at', timestamp_to_iso),
+    ('traveler_count', 'travelers', len),
+    ('entry_count', 'entries', len),
+    ('storage_bytes', 'storage_bytes'),
+)
+
+# Blog views (admin and public)
+blog_to_dict = make_serializer(
+    ('trip_name', 'name'),
+    ('description', 'description'),
+    ('blog_content', 'blog_content'),
+    ('blog_language', 'blog_language'),
+    ('created_at', 'created_at', timestamp_to_iso),
+)
+
+traveler_to_dict = make_serializer(
+    ('id', 'id'),
+    ('name', 'name'),
+    ('token', 'token'),
+    ('created_at', 'created_at', timestamp_to_iso),
+)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider encoding responses with orjson, installed by create_app() when available
+    
+    Output matches the stdlib provider (sorted keys, non-string keys converted,
+    dates as HTTP dates) apart from orjson writing UTF-8 instead of \\u escapes
+    and null for NaN. Pretty-printed debug output and calls with extra json.dumps
+    arguments fall back to the stdlib encoder.
+    """
+    
+    OPTIONS = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+               | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+    
+    def encode(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.OPTIONS)
+    
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.encode(obj).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj) + b'\n', mimetype=self.mimetype)
@@ -7,8 +7,9 @@ os.environ['ADMIN_USERNAME'] = 'admin'
 os.environ['ADMIN_PASSWORD'] = 'test_password'
 os.environ['SECRET_KEY'] = 'test-secret-key'
 os.environ['JWT_SECRET_KEY'] = 'test-jwt-secret'
+os.environ['GEOCODER_CACHE_DIR'] = tempfile.mkdtemp()
 
-from app import app, db, Trip, Traveler, Entry, TripContent, PostReaction
+from app import create_app, db, trip_cache, response_cache, token_cache, Trip, Traveler, Entry, TripContent, PostReaction
 import factory
 from faker import Faker
 
@@ -20,16 +21,24 @@ def test_app():
     # Create temporary database
     db_fd, db_path = tempfile.mkstemp()
     
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
-    app.config['WTF_CSRF_ENABLED'] = False
-    app.config['SECRET_KEY'] = 'test-secret-key'
-    app.config['JWT_SECRET_KEY'] = 'test-jwt-secret'
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'WTF_CSRF_ENABLED': False,
+        'SECRET_KEY': 'test-secret-key',
+        'JWT_SECRET_KEY': 'test-jwt-secret',
+        'TRIP_PURGE_BACKGROUND': False,  # Tests purge deleted trips explicitly
+        'STATIC_EXPORT_BACKGROUND': False,  # Exports finish before the request returns
+        'METRICS_DIR': tempfile.mkdtemp(),
+    })
     
     with app.app_context():
         db.create_all()
         yield app
         db.drop_all()
+        trip_cache.clear()
+        response_cache.clear()
+        token_cache.clear()
     
     os.close(db_fd)
     os.unlink(db_path)
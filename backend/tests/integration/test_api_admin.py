@@ -1,6 +1,11 @@
 import pytest
+import io
 import json
-from app import db, Trip, Traveler
+import time
+import zipfile
+from datetime import date
+from unittest.mock import patch
+from app import db, Trip, Traveler, TripContent, TripEvent, ContentEntry, PostReaction, rebuild_search_indexes
 
 @pytest.mark.integration
 class TestAdminAPI:
@@ -130,6 +135,36 @@ class TestAdminAPI:
         data = response.get_json()
         assert data['reactions_enabled'] is False
     
+    def test_token_cache_invalidation(self, client, admin_auth_headers, sample_trip, sample_traveler):
+        """Test admin changes take effect immediately despite cached token lookups"""
+        response = client.put(f'/api/admin/trips/{sample_trip.id}/public',
+                              json={'enabled': True}, headers=admin_auth_headers)
+        public_url = f"/api/public/{response.get_json()['public_token']}"
+        assert client.get(public_url).get_json()['reactions_enabled'] is True
+        
+        client.put(f'/api/admin/trips/{sample_trip.id}/reactions',
+                   json={'enabled': False}, headers=admin_auth_headers)
+        assert client.get(public_url).get_json()['reactions_enabled'] is False
+        
+        client.put(f'/api/admin/trips/{sample_trip.id}/public',
+                   json={'enabled': False}, headers=admin_auth_headers)
+        assert client.get(public_url).status_code == 404
+        
+        traveler_url = f'/api/traveler/verify/{sample_traveler.token}'
+        assert client.get(traveler_url).status_code == 200
+        client.delete(f'/api/admin/trips/{sample_trip.id}', headers=admin_auth_headers)
+        assert client.get(traveler_url).status_code == 404
+    
+    def test_stale_token_lookup(self, client, sample_trip, sample_traveler):
+        """Test a cached token lookup whose trip or traveler is gone since returns 404, not 500"""
+        from app import token_cache, PublicTrip, TravelerIdentity
+        token_cache.set(('public', 'purged'), PublicTrip(9999, True), 9999)
+        token_cache.set(('traveler', 'purged'), TravelerIdentity(9999, 9999), 9999)
+        
+        assert client.get('/api/public/purged').status_code == 404
+        assert client.get('/api/public/purged/bundle').status_code == 404
+        assert client.get('/api/traveler/verify/purged').status_code == 404
+    
     def test_delete_trip(self, client, admin_auth_headers, sample_trip):
         """Test deleting trip"""
         trip_id = sample_trip.id
@@ -137,11 +172,55 @@ class TestAdminAPI:
         response = client.delete(f'/api/admin/trips/{trip_id}',
                                headers=admin_auth_headers)
         
-        assert response.status_code == 200
+        assert response.status_code == 202
+        assert response.get_json()['status'] == 'deleting'
+        
+        # Hidden right away, removed by the background purge
+        assert client.get(f'/api/trips/{trip_id}/blog', headers=admin_auth_headers).status_code == 404
+        assert client.get('/api/admin/trips', headers=admin_auth_headers).get_json() == []
+        assert client.delete(f'/api/admin/trips/{trip_id}', headers=admin_auth_headers).status_code == 404
+        
+        client.application.extensions['trip_purger'].run_pending()
         
         # Verify trip is deleted
-        trip = Trip.query.get(trip_id)
+        trip = Trip.query.filter_by(id=trip_id).first()
         assert trip is None
+        assert client.get(f'/api/admin/trips/{trip_id}/deletion', headers=admin_auth_headers).get_json() == {'status': 'deleted'}
+    
+    def test_delete_trip_purges_in_chunks_and_resumes(self, client, test_app, admin_auth_headers, sample_trip, sample_traveler, tmp_path):
+        """Test a deleted trip is removed chunk by chunk, files included, and an interrupted purge resumes"""
+        from app import purge_trip_chunk, Entry
+        from tests.conftest import EntryFactory, TripContentFactory, TravelerFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        entries = []
+        for i in range(5):
+            (tmp_path / f'photo{i}.jpg').write_bytes(b'jpeg')
+            entries.append(EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='photo', filename=f'photo{i}.jpg'))
+        for entry in entries:
+            content = TripContentFactory(trip=sample_trip, entry_links=[ContentEntry(entry_id=entry.id)])
+            db.session.add(PostReaction(trip_id=sample_trip.id, content_piece=content, reaction_type='like', count=1))
+        db.session.commit()
+        other = TravelerFactory()
+        (tmp_path / 'keep.jpg').write_bytes(b'jpeg')
+        EntryFactory(trip=other.trip, traveler=other, content_type='photo', filename='keep.jpg')
+        trip_id, other_trip_id = sample_trip.id, other.trip.id
+        
+        response = client.delete(f'/api/admin/trips/{trip_id}', headers=admin_auth_headers)
+        assert response.get_json()['remaining'] == {'entries': 5, 'content': 5, 'travelers': 1, 'reactions': 5, 'files': 5}
+        
+        # A purge that stops half way (e.g. the process crashed) leaves a consistent trip behind
+        for _ in range(4):
+            assert purge_trip_chunk(trip_id, chunk_size=2)
+        progress = client.get(f'/api/admin/trips/{trip_id}/deletion', headers=admin_auth_headers).get_json()
+        assert progress['status'] == 'deleting'
+        assert progress['remaining'] == {'entries': 3, 'content': 0, 'travelers': 1, 'reactions': 0, 'files': 3}
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['keep.jpg', 'photo2.jpg', 'photo3.jpg', 'photo4.jpg']
+        
+        assert test_app.extensions['trip_purger'].run_pending() == 1
+        assert db.session.query(Trip.id).all() == [(other_trip_id,)]
+        assert db.session.query(ContentEntry).count() == 0
+        assert Entry.query.filter_by(trip_id=other_trip_id).count() == 1
+        assert [path.name for path in tmp_path.iterdir()] == ['keep.jpg']
     
     def test_regenerate_blog(self, client, admin_auth_headers, sample_trip):
         """Test blog regeneration trigger"""
@@ -151,4 +230,592 @@ class TestAdminAPI:
         assert response.status_code == 200
         data = response.get_json()
         assert 'message' in data
-        assert 'regenerated successfully' in data['message']
\ No newline at end of file
+        assert 'regenerated successfully' in data['message']
+    
+    def test_get_entries_paginated(self, client, admin_auth_headers, sample_trip, sample_traveler):
+        """Test admin entries listing with a page limit"""
+        from tests.conftest import EntryFactory
+        for _ in range(3):
+            EntryFactory(trip=sample_trip, traveler=sample_traveler)
+        
+        response = client.get(f'/api/trips/{sample_trip.id}/entries?limit=2',
+                             headers=admin_auth_headers)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['items']) == 2
+        assert data['next'] is not None
+        assert 'disabled' in data['items'][0]
+        
+        response = client.get(f'/api/trips/{sample_trip.id}/entries?limit=2&cursor={data["next"]}',
+                             headers=admin_auth_headers)
+        data = response.get_json()
+        assert len(data['items']) == 1
+        assert data['next'] is None
+    
+    @patch('google.generativeai.GenerativeModel', side_effect=Exception('AI unavailable'))
+    def test_regenerate_entry_content(self, mock_model, client, admin_auth_headers, sample_trip, sample_entry):
+        """Test regenerating the content of a single entry"""
+        from tests.conftest import TripContentFactory
+        old_content = TripContentFactory(trip=sample_trip, entry_links=[ContentEntry(entry_id=sample_entry.id)])
+        unrelated = TripContentFactory(trip=sample_trip)
+        old_content_id = old_content.id
+        
+        response = client.post(f'/api/admin/entries/{sample_entry.id}/regenerate',
+                              headers=admin_auth_headers)
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert len(data['content_ids']) == 1
+        
+        assert db.session.get(TripContent, old_content_id) is None
+        assert db.session.get(TripContent, unrelated.id) is not None
+        new_content = db.session.get(TripContent, data['content_ids'][0])
+        assert new_content.entry_id_list == [sample_entry.id]
+        
+        # Content listing emits entry_ids from the link table
+        response = client.get(f'/api/trips/{sample_trip.id}/content', headers=admin_auth_headers)
+        by_id = {c['id']: c for c in response.get_json()}
+        assert by_id[new_content.id]['entry_ids'] == [sample_entry.id]
+        assert by_id[unrelated.id]['entry_ids'] == []
+    
+    def test_search_includes_entries(self, client, admin_auth_headers, sample_trip, sample_traveler):
+        """Test admin search covers raw entries as well as content pieces"""
+        from tests.conftest import EntryFactory, TripContentFactory
+        entry = EntryFactory(trip=sample_trip, traveler=sample_traveler, content='Café crème at the harbour')
+        content = TripContentFactory(trip=sample_trip, generated_content='Morning coffee by the harbour.')
+        
+        # Accents are ignored and the index can be rebuilt from scratch
+        db.session.execute(db.text("INSERT INTO entry_fts(entry_fts) VALUES ('delete-all')"))
+        db.session.commit()
+        rebuild_search_indexes()
+        
+        response = client.get(f'/api/trips/{sample_trip.id}/search?q=cafe', headers=admin_auth_headers)
+        results = response.get_json()['results']
+        assert [(r['type'], r['id']) for r in results] == [('entry', entry.id)]
+        
+        response = client.get(f'/api/trips/{sample_trip.id}/search?q=harbour', headers=admin_auth_headers)
+        assert {(r['type'], r['id']) for r in response.get_json()['results']} == {
+            ('entry', entry.id), ('content', content.id)
+        }
+    
+    def test_regenerate_blog_bumps_content_version(self, client, admin_auth_headers, sample_trip):
+        """Test the bulk content delete of a regeneration invalidates cached public responses"""
+        from tests.conftest import TripContentFactory
+        content_id = TripContentFactory(trip=sample_trip).id
+        version = sample_trip.content_version
+        
+        client.post(f'/api/admin/trips/{sample_trip.id}/regenerate-blog', headers=admin_auth_headers)
+        
+        db.session.expire(sample_trip)
+        assert sample_trip.content_version > version
+        assert TripContent.query.filter_by(trip_id=sample_trip.id).count() == 0
+        delta = client.get(f'/api/trips/{sample_trip.id}/changes?since={version}', headers=admin_auth_headers).get_json()
+        assert delta['deleted']['content_pieces'] == [content_id]
+        
+        # Live feed readers are told about the deleted pieces too
+        deleted_events = TripEvent.query.filter_by(trip_id=sample_trip.id, event_type='content.deleted').all()
+        assert [json.loads(event.data) for event in deleted_events] == [{'id': content_id}]
+    
+    def test_viewport_follows_coordinate_updates(self, client, admin_auth_headers, sample_trip, sample_entry):
+        """Test editing entry coordinates moves it in the spatial index"""
+        client.put(f'/api/admin/entries/{sample_entry.id}/coordinates',
+                   json={'latitude': 35.68, 'longitude': 139.69},
+                   headers=admin_auth_headers)
+        
+        tokyo_url = f'/api/trips/{sample_trip.id}/viewport?bbox=139,35,140,36'
+        response = client.get(tokyo_url, headers=admin_auth_headers)
+        assert [item['id'] for item in response.get_json()['items']] == [sample_entry.id]
+        
+        # Clearing coordinates removes it from every viewport
+        client.put(f'/api/admin/entries/{sample_entry.id}/coordinates',
+                   json={'latitude': None, 'longitude': None},
+                   headers=admin_auth_headers)
+        response = client.get(tokyo_url, headers=admin_auth_headers)
+        assert response.get_json()['items'] == []
+    
+    def test_stats_follow_coordinate_updates(self, client, admin_auth_headers, sample_trip, sample_entry):
+        """Test editing entry coordinates invalidates the cached statistics"""
+        url = f'/api/trips/{sample_trip.id}/stats'
+        client.put(f'/api/admin/entries/{sample_entry.id}/coordinates',
+                   json={'latitude': 35.68, 'longitude': 139.69},
+                   headers=admin_auth_headers)
+        assert client.get(url, headers=admin_auth_headers).get_json()['bbox'] == [139.69, 35.68, 139.69, 35.68]
+        
+        client.put(f'/api/admin/entries/{sample_entry.id}/coordinates',
+                   json={'latitude': None, 'longitude': None},
+                   headers=admin_auth_headers)
+        stats = client.get(url, headers=admin_auth_headers).get_json()
+        assert stats['points'] == 0
+        assert stats['bbox'] is None
+    
+    def test_clusters_follow_coordinate_updates(self, client, admin_auth_headers, sample_trip, sample_entry):
+        """Test editing entry coordinates invalidates the cached clusters"""
+        url = f'/api/trips/{sample_trip.id}/clusters?zoom=10'
+        before = client.get(url, headers=admin_auth_headers).get_json()['clusters']
+        
+        client.put(f'/api/admin/entries/{sample_entry.id}/coordinates',
+                   json={'latitude': 35.68, 'longitude': 139.69},
+                   headers=admin_auth_headers)
+        
+        clusters = client.get(url, headers=admin_auth_headers).get_json()['clusters']
+        assert clusters != before
+        assert clusters[0]['latitude'] == pytest.approx(35.68)
+        assert clusters[0]['entry']['id'] == sample_entry.id
+    
+    def test_changes_since_cursor(self, client, admin_auth_headers, sample_trip, sample_entry):
+        """Test the delta sync endpoint returns only changes and deletions after the cursor"""
+        from tests.conftest import TripContentFactory
+        content = TripContentFactory(trip=sample_trip)
+        db.session.add(content)
+        db.session.commit()
+        content_id = content.id
+        url = f'/api/trips/{sample_trip.id}/changes'
+        
+        snapshot = client.get(url, headers=admin_auth_headers).get_json()
+        assert [entry['id'] for entry in snapshot['entries']] == [sample_entry.id]
+        assert [piece['id'] for piece in snapshot['content_pieces']] == [content_id]
+        assert snapshot['deleted'] == {'entries': [], 'content_pieces': []}
+        
+        cursor = snapshot['cursor']
+        nothing = client.get(f'{url}?since={cursor}', headers=admin_auth_headers).get_json()
+        assert nothing['entries'] == nothing['content_pieces'] == []
+        assert nothing['cursor'] == cursor
+        
+        client.put(f'/api/admin/entries/{sample_entry.id}/toggle-disabled', headers=admin_auth_headers)
+        db.session.delete(db.session.get(TripContent, content_id))
+        db.session.commit()
+        
+        delta = client.get(f'{url}?since={cursor}', headers=admin_auth_headers).get_json()
+        assert [(entry['id'], entry['disabled']) for entry in delta['entries']] == [(sample_entry.id, True)]
+        assert delta['content_pieces'] == []
+        assert delta['deleted'] == {'entries': [], 'content_pieces': [content_id]}
+        assert int(delta['cursor']) > int(cursor)
+        
+        assert client.get(f'{url}?since=-1', headers=admin_auth_headers).status_code == 400
+        assert client.get(f'{url}?since=abc', headers=admin_auth_headers).status_code == 400
+    
+    def test_changes_entry_links(self, client, admin_auth_headers, sample_trip, sample_entry):
+        """Test linking or unlinking an entry reports the content piece as changed"""
+        from tests.conftest import TripContentFactory
+        content = TripContentFactory(trip=sample_trip)
+        db.session.commit()
+        url = f'/api/trips/{sample_trip.id}/changes'
+        cursor = client.get(url, headers=admin_auth_headers).get_json()['cursor']
+        
+        db.session.add(ContentEntry(content_piece_id=content.id, entry_id=sample_entry.id))
+        db.session.commit()
+        delta = client.get(f'{url}?since={cursor}', headers=admin_auth_headers).get_json()
+        assert [(piece['id'], piece['entry_ids']) for piece in delta['content_pieces']] == [(content.id, [sample_entry.id])]
+        
+        entry_id = sample_entry.id
+        db.session.delete(sample_entry)
+        db.session.commit()
+        delta = client.get(f"{url}?since={delta['cursor']}", headers=admin_auth_headers).get_json()
+        assert [(piece['id'], piece['entry_ids']) for piece in delta['content_pieces']] == [(content.id, [])]
+        assert delta['deleted']['entries'] == [entry_id]
+    
+    def test_changes_tombstone_retention(self, client, admin_auth_headers, sample_trip, monkeypatch):
+        """Test old tombstones are pruned and a cursor from before them gets a full resync"""
+        import app as app_module
+        from tests.conftest import TripContentFactory
+        monkeypatch.setattr(app_module, 'SYNC_TOMBSTONE_RETENTION', 2)
+        content_ids = [TripContentFactory(trip=sample_trip).id for _ in range(4)]
+        db.session.commit()
+        url = f'/api/trips/{sample_trip.id}/changes'
+        old_cursor = client.get(url, headers=admin_auth_headers).get_json()['cursor']
+        
+        for content_id in content_ids[:3]:
+            db.session.delete(db.session.get(TripContent, content_id))
+            db.session.commit()
+            if content_id == content_ids[0]:
+                recent_cursor = client.get(url, headers=admin_auth_headers).get_json()['cursor']
+        assert app_module.SyncTombstone.query.filter_by(trip_id=sample_trip.id).count() == 2
+        
+        delta = client.get(f'{url}?since={recent_cursor}', headers=admin_auth_headers).get_json()
+        assert delta['reset'] is False
+        assert delta['deleted']['content_pieces'] == content_ids[1:3]
+        
+        resync = client.get(f'{url}?since={old_cursor}', headers=admin_auth_headers).get_json()
+        assert resync['reset'] is True
+        assert resync['since'] == '0'
+        assert [piece['id'] for piece in resync['content_pieces']] == content_ids[3:]
+    
+    def test_export_static_site(self, client, test_app, admin_auth_headers, sample_trip, sample_traveler, tmp_path):
+        """Test exporting a public trip as a static site, then re-exporting incrementally"""
+        from PIL import Image
+        from tests.conftest import EntryFactory, TripContentFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+        test_app.config['STATIC_EXPORT_FOLDER'] = str(tmp_path / 'exports')
+        (tmp_path / 'uploads').mkdir()
+        Image.new('RGB', (3000, 2000), 'teal').save(tmp_path / 'uploads' / 'sunset.png')
+        
+        url = f'/api/admin/trips/{sample_trip.id}/export-static'
+        assert client.post(url, headers=admin_auth_headers).status_code == 400  # not public
+        sample_trip.public_enabled = True
+        photo = EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='photo', filename='sunset.png')
+        content = TripContentFactory(trip=sample_trip, generated_content=f'## Sunset\n\nGolden light.\n\n[PHOTO:{photo.id}]',
+                                     content_date=date(2024, 6, 1), entry_links=[ContentEntry(entry_id=photo.id)])
+        later = TripContentFactory(trip=sample_trip, generated_content='Onwards.', content_date=date(2024, 6, 3))
+        db.session.add_all([content, later])
+        db.session.commit()
+        
+        response = client.post(url, headers=admin_auth_headers)
+        assert response.status_code == 202
+        stats = response.get_json()
+        assert stats['status'] == 'done'
+        assert stats['media_written'] == 1
+        assert client.get(url, headers=admin_auth_headers).get_json()['media_done'] == 1
+        export_dir = tmp_path / 'exports' / f'trip-{sample_trip.id}'
+        
+        media = list((export_dir / 'media').iterdir())
+        assert len(media) == 1 and media[0].name.startswith('sunset.') and media[0].suffix == '.jpg'
+        assert max(Image.open(media[0]).size) == 1600
+        day_page = (export_dir / 'days' / '2024-06-01.html').read_text()
+        assert '<h2>Sunset</h2>' in day_page
+        assert f'src="../media/{media[0].name}"' in day_page
+        assert list((export_dir / 'assets').iterdir())[0].name.startswith('style.')
+        assert json.loads((export_dir / 'data' / 'entries.json').read_text())[0]['media'] == f'media/{media[0].name}'
+        
+        # Nothing changed: nothing is rewritten
+        stats = client.post(url, headers=admin_auth_headers).get_json()
+        assert stats['pages_written'] == stats['media_written'] == 0
+        assert stats['media_unchanged'] == 1
+        
+        # Editing one day rewrites its page; the other day page is left alone
+        first_day_written = (export_dir / 'days' / '2024-06-01.html').stat().st_mtime_ns
+        later.generated_content = 'Onwards to the coast.'
+        db.session.commit()
+        client.post(url, headers=admin_auth_headers)
+        assert 'Onwards to the coast.' in (export_dir / 'days' / '2024-06-03.html').read_text()
+        assert (export_dir / 'days' / '2024-06-01.html').stat().st_mtime_ns == first_day_written
+        
+        # Deleting the content piece of a day removes its page
+        db.session.delete(content)
+        db.session.commit()
+        stats = client.post(url, headers=admin_auth_headers).get_json()
+        assert not (export_dir / 'days' / '2024-06-01.html').exists()
+        assert stats['files_removed'] >= 1
+    
+    def test_export_static_site_lock(self, client, test_app, admin_auth_headers, sample_trip, tmp_path, monkeypatch):
+        """Test a second export of a trip is refused while one runs, and a dead export shows as failed"""
+        from app import lock_static_export
+        test_app.config['STATIC_EXPORT_FOLDER'] = str(tmp_path)
+        sample_trip.public_enabled = True
+        db.session.commit()
+        url = f'/api/admin/trips/{sample_trip.id}/export-static'
+        assert client.get(url, headers=admin_auth_headers).get_json()['status'] == 'idle'
+        
+        lock_file = lock_static_export(sample_trip.id)
+        (tmp_path / f'trip-{sample_trip.id}.status.json').write_text('{"status": "running", "media_done": 3}')
+        response = client.post(url, headers=admin_auth_headers)
+        assert response.status_code == 409
+        assert response.get_json()['media_done'] == 3
+        assert client.get(url, headers=admin_auth_headers).get_json()['status'] == 'running'
+        
+        lock_file.close()
+        status = client.get(url, headers=admin_auth_headers).get_json()
+        assert status['status'] == 'failed' and 'interrupted' in status['error']
+        
+        # In the background the request returns at once; the status endpoint follows the export
+        monkeypatch.setattr(test_app.extensions['static_exporter'], 'background', True)
+        assert client.post(url, headers=admin_auth_headers).status_code == 202
+        deadline = time.monotonic() + 10
+        while (status := client.get(url, headers=admin_auth_headers).get_json())['status'] == 'running':
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        assert status['status'] == 'done', status
+        assert (tmp_path / f'trip-{sample_trip.id}' / 'index.html').exists()
+    
+    def test_export_static_command_process_pool(self, test_app, sample_trip, sample_traveler, tmp_path):
+        """Test the export command resizes photos in worker processes"""
+        from PIL import Image
+        from tests.conftest import EntryFactory, TripContentFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path / 'uploads')
+        test_app.config['STATIC_EXPORT_FOLDER'] = str(tmp_path / 'exports')
+        (tmp_path / 'uploads').mkdir()
+        for i in range(3):
+            Image.new('RGB', (2400, 1200), (i * 80, 0, 0)).save(tmp_path / 'uploads' / f'photo{i}.jpg')
+            EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='photo', filename=f'photo{i}.jpg')
+        db.session.add(TripContentFactory(trip=sample_trip))
+        db.session.commit()
+        
+        args = ['export-static', str(sample_trip.id), '--output', str(tmp_path / 'site'), '--workers', '2']
+        result = test_app.test_cli_runner().invoke(args=args)
+        assert result.exit_code != 0 and 'not public' in result.output
+        
+        with patch('app.STATIC_EXPORT_POOL_MIN', 2):
+            result = test_app.test_cli_runner().invoke(args=args + ['--force'])
+        
+        assert result.exit_code == 0, result.output
+        assert '3 media file(s) written' in result.output
+        assert sorted(max(Image.open(path).size) for path in (tmp_path / 'site' / 'media').iterdir()) == [1600] * 3
+    
+    def test_trip_archive_export_and_import(self, client, test_app, admin_auth_headers, sample_trip, sample_traveler, tmp_path):
+        """Test streaming a trip archive, resuming it with a range request and importing it as a new trip"""
+        from tests.conftest import EntryFactory, TripContentFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        (tmp_path / 'photo.jpg').write_bytes(b'\xff\xd8' + bytes(range(256)) * 400)
+        photo = EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='photo', filename='photo.jpg')
+        note = EntryFactory(trip=sample_trip, traveler=sample_traveler, content='Lunch by the river')
+        content = TripContentFactory(trip=sample_trip, generated_content='## Lunch\n\nFish and sun.', content_date=date(2024, 6, 1),
+                                     entry_links=[ContentEntry(entry_id=photo.id), ContentEntry(entry_id=note.id)])
+        db.session.add(content)
+        db.session.flush()
+        db.session.add(PostReaction(trip_id=sample_trip.id, content_piece_id=content.id, reaction_type='love', count=3))
+        db.session.commit()
+        
+        url = f'/api/admin/trips/{sample_trip.id}/archive'
+        response = client.get(url, headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert response.headers['Accept-Ranges'] == 'bytes'
+        archive = response.data
+        assert int(response.headers['Content-Length']) == len(archive)
+        
+        with zipfile.ZipFile(io.BytesIO(archive)) as bundle:
+            assert bundle.testzip() is None
+            assert bundle.read('media/photo.jpg') == (tmp_path / 'photo.jpg').read_bytes()
+            assert len(json.loads(bundle.read('entries.json'))) == 2
+            assert json.loads(bundle.read('content.json'))[0]['entry_ids'] == sorted([photo.id, note.id])
+            assert '## 2024-06-01' in bundle.read('blog.md').decode()
+        
+        # Resume from the middle of the photo; a stale If-Range gets the whole archive again
+        etag = response.headers['ETag']
+        partial = client.get(url, headers={**admin_auth_headers, 'Range': 'bytes=2000-', 'If-Range': etag})
+        assert partial.status_code == 206
+        assert partial.headers['Content-Range'] == f'bytes 2000-{len(archive) - 1}/{len(archive)}'
+        assert partial.data == archive[2000:]
+        assert client.get(url, headers={**admin_auth_headers, 'Range': 'bytes=-50'}).data == archive[-50:]
+        assert client.get(url, headers={**admin_auth_headers, 'Range': 'bytes=2000-', 'If-Range': '"stale"'}).status_code == 200
+        assert client.get(url, headers={**admin_auth_headers, 'Range': f'bytes={len(archive)}-'}).status_code == 416
+        
+        response = client.post('/api/admin/trips/import', headers=admin_auth_headers,
+                               data={'archive': (io.BytesIO(archive), 'trip.zip')}, content_type='multipart/form-data')
+        assert response.status_code == 200
+        imported = db.session.get(Trip, response.get_json()['id'])
+        assert imported.id != sample_trip.id and imported.name == sample_trip.name
+        assert imported.admin_token != sample_trip.admin_token  # still in use by the original trip
+        assert len(imported.entries) == 2 and len(imported.content_pieces) == 1
+        assert sorted(link.entry.content_type for link in imported.content_pieces[0].entry_links) == ['photo', 'text']
+        assert [(reaction.reaction_type, reaction.count) for reaction in imported.reactions] == [('love', 3)]
+        copied = next(entry.filename for entry in imported.entries if entry.content_type == 'photo')
+        assert copied != 'photo.jpg' and (tmp_path / copied).read_bytes() == (tmp_path / 'photo.jpg').read_bytes()
+    
+    def test_trip_archive_zip64_records(self, client, test_app, admin_auth_headers, sample_trip, sample_traveler, tmp_path):
+        """Test archives larger than the ZIP64 limit stay readable (limit lowered to exercise the records)"""
+        from tests.conftest import EntryFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        (tmp_path / 'clip.m4a').write_bytes(b'audio' * 1000)
+        EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='audio', filename='clip.m4a')
+        
+        with patch('app.ARCHIVE_ZIP64_LIMIT', 100):
+            archive = client.get(f'/api/admin/trips/{sample_trip.id}/archive', headers=admin_auth_headers).data
+        
+        with zipfile.ZipFile(io.BytesIO(archive)) as bundle:
+            assert bundle.testzip() is None
+            assert bundle.read('media/clip.m4a') == b'audio' * 1000
+    
+    def test_trip_archive_import_rejects_invalid_archives(self, client, admin_auth_headers, tmp_path):
+        """Test importing something that is not a trip archive fails without creating a trip"""
+        not_a_trip = io.BytesIO()
+        with zipfile.ZipFile(not_a_trip, 'w') as bundle:
+            bundle.writestr('manifest.json', json.dumps({'format': 'something-else'}))
+        
+        for payload in (b'not a zip', not_a_trip.getvalue()):
+            response = client.post('/api/admin/trips/import', headers=admin_auth_headers,
+                                   data={'archive': (io.BytesIO(payload), 'trip.zip')}, content_type='multipart/form-data')
+            assert response.status_code == 400
+        assert Trip.query.count() == 0
+    
+    def test_trip_storage_totals(self, client, test_app, admin_auth_headers, sample_trip, sample_traveler, tmp_path):
+        """Test the per-trip storage total follows the uploads of inserted and deleted entries"""
+        from tests.conftest import EntryFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        (tmp_path / 'a.jpg').write_bytes(b'x' * 1000)
+        (tmp_path / 'b.m4a').write_bytes(b'x' * 500)
+        photo = EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='photo', filename='a.jpg')
+        EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='audio', filename='b.m4a')
+        EntryFactory(trip=sample_trip, traveler=sample_traveler)
+        
+        trips = client.get('/api/admin/trips', headers=admin_auth_headers).get_json()
+        assert trips[0]['storage_bytes'] == 1500
+        
+        db.session.delete(photo)
+        db.session.commit()
+        assert db.session.get(Trip, sample_trip.id).storage_bytes == 500
+    
+    def test_collect_uploads_command(self, test_app, sample_trip, sample_traveler, tmp_path):
+        """Test orphaned uploads are deleted after the grace period and storage totals recomputed"""
+        import os
+        import time
+        from tests.conftest import EntryFactory
+        test_app.config['UPLOAD_FOLDER'] = str(tmp_path)
+        (tmp_path / 'kept.jpg').write_bytes(b'x' * 300)
+        EntryFactory(trip=sample_trip, traveler=sample_traveler, content_type='photo', filename='kept.jpg')
+        (tmp_path / 'old-orphan.jpg').write_bytes(b'x' * 200)
+        day_ago = time.time() - 2 * 24 * 3600
+        os.utime(tmp_path / 'old-orphan.jpg', (day_ago, day_ago))
+        (tmp_path / 'new-orphan.jpg').write_bytes(b'x' * 100)  # e.g. an entry still being created
+        sample_trip.storage_bytes = 0  # drifted, e.g. after manual database edits
+        db.session.commit()
+        runner = test_app.test_cli_runner()
+        
+        result = runner.invoke(args=['collect-uploads', '--dry-run'])
+        assert result.exit_code == 0, result.output
+        assert '2 orphaned' in result.output and '0 deleted' in result.output
+        assert len(list(tmp_path.iterdir())) == 3
+        
+        result = runner.invoke(args=['collect-uploads'])
+        assert result.exit_code == 0, result.output
+        assert '1 deleted (200 B)' in result.output
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['kept.jpg', 'new-orphan.jpg']
+        db.session.expire_all()
+        assert db.session.get(Trip, sample_trip.id).storage_bytes == 300
+    
+    def test_metrics_endpoint(self, client, test_app, admin_auth_headers, sample_trip):
+        """Test request metrics are recorded per route and exposed to the admin in Prometheus format"""
+        assert client.get('/metrics').status_code == 401
+        
+        # Requests are recorded when the server closes the response
+        client.get('/api/admin/trips', headers=admin_auth_headers).close()
+        client.get('/api/admin/trips', headers=admin_auth_headers).close()
+        client.get('/api/public/unknown-token').close()
+        
+        response = client.get('/metrics', headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        lines = response.get_data(as_text=True).splitlines()
+        assert 'roadweave_http_requests_total{route="/api/admin/trips",method="GET",status="200"} 2' in lines
+        assert 'roadweave_http_requests_total{route="/api/public/<token>",method="GET",status="404"} 1' in lines
+        assert 'roadweave_http_request_duration_seconds_bucket{route="/api/admin/trips",method="GET",le="+Inf"} 2' in lines
+        assert 'roadweave_http_request_db_statements_bucket{route="/api/admin/trips",le="0"} 0' in lines  # every listing queries
+        assert any(line.startswith('roadweave_http_requests_in_flight ') for line in lines)
+        assert 'roadweave_worker_processes 1' in lines
+        
+        test_app.config['METRICS_TOKEN'] = 'scraper-secret'
+        assert client.get('/metrics', headers={'Authorization': 'Bearer scraper-secret'}).status_code == 200
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    
+    def test_metrics_aggregate_worker_processes(self, client, test_app, admin_auth_headers):
+        """Test metrics of other worker processes are added, and those of exited workers kept"""
+        import os
+        import subprocess
+        metrics_dir = test_app.config['METRICS_DIR']
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        route = ['/api/health', 'GET', '200']
+        for pid, count in ((os.getppid(), 5), (exited.pid, 7)):
+            with open(os.path.join(metrics_dir, f'{pid}.json'), 'w') as snapshot:
+                json.dump({'roadweave_http_requests_total': [[route, count]],
+                           'roadweave_http_requests_in_flight': [[[], 2]]}, snapshot)
+        
+        for _ in range(2):  # the exited worker's counts are moved to retired.json on the first scrape
+            lines = client.get('/metrics', headers=admin_auth_headers).get_data(as_text=True).splitlines()
+            assert 'roadweave_http_requests_total{route="/api/health",method="GET",status="200"} 12' in lines
+            assert 'roadweave_worker_processes 2' in lines
+        assert not os.path.exists(os.path.join(metrics_dir, f'{exited.pid}.json'))
+    
+    def post_traced_entry(self, client, traveler, generate_content):
+        """Post an entry with the Gemini model replaced by a mock"""
+        with patch('app.get_genai') as get_genai:
+            get_genai.return_value.GenerativeModel.return_value.generate_content.side_effect = generate_content
+            response = client.post(f'/api/traveler/{traveler.token}/entries', data={
+                'content_type': 'text',
+                'content': 'Lunch by the harbour'
+            })
+        assert response.status_code == 200
+        return response.json['id']
+    
+    def test_entry_traces(self, client, test_app, admin_auth_headers, sample_traveler):
+        """Test entry creation is traced per stage and the slowest traces are listed for the admin"""
+        from unittest.mock import Mock
+        from app import tracer
+        tracer.traces.clear()
+        
+        entry_id = self.post_traced_entry(client, sample_traveler, lambda prompt: Mock(text='A sunny lunch.'))
+        self.post_traced_entry(client, sample_traveler, RuntimeError('quota exceeded'))
+        
+        assert client.get('/api/admin/traces').status_code == 401
+        response = client.get('/api/admin/traces?name=create_entry', headers=admin_auth_headers)
+        assert response.status_code == 200
+        traces = response.json['traces']
+        assert len(traces) == 2
+        assert traces[0]['duration_ms'] >= traces[1]['duration_ms']
+        
+        succeeded = next(trace for trace in traces if trace['status'] == 'ok')
+        stages = {stage['name']: stage for stage in succeeded['stages']}
+        assert list(stages) == ['create_entry', 'entry.commit', 'create_content_piece', 'gemini.generate', 'content.commit']
+        assert stages['create_entry']['depth'] == 0
+        assert stages['create_entry']['attributes']['entry.content_type'] == 'text'
+        assert stages['create_content_piece']['parent_span_id'] == stages['create_entry']['span_id']
+        assert stages['create_content_piece']['attributes']['entry.id'] == entry_id
+        assert stages['gemini.generate']['depth'] == 2
+        assert stages['gemini.generate']['attributes']['gen_ai.request.model'] == 'gemini-2.5-flash-lite'
+        assert all(0 <= stage['offset_ms'] <= succeeded['duration_ms'] for stage in succeeded['stages'])
+        
+        # A failed generation is recorded on its stage, and the fallback content is still committed
+        failed = next(trace for trace in traces if trace['status'] == 'error')
+        stages = {stage['name']: stage for stage in failed['stages']}
+        assert stages['gemini.generate']['status'] == 'error'
+        assert 'quota exceeded' in stages['gemini.generate']['error']
+        assert stages['content.commit']['attributes'] == {'content.fallback': True}
+        
+        assert client.get('/api/admin/traces?name=export_trip', headers=admin_auth_headers).json['traces'] == []
+        assert len(client.get('/api/admin/traces?limit=1', headers=admin_auth_headers).json['traces']) == 1
+    
+    def test_trace_exporters(self, client, test_app, sample_traveler, tmp_path):
+        """Test finished traces are appended to a JSON-lines file and sent to an OTLP collector"""
+        import threading
+        from http.server import BaseHTTPRequestHandler, HTTPServer
+        from unittest.mock import Mock
+        from app import tracer, configure_tracing
+        
+        received = []
+        
+        class Collector(BaseHTTPRequestHandler):
+            """Stand-in for an OpenTelemetry collector's OTLP/HTTP receiver"""
+            def do_POST(self):
+                received.append((self.path, self.headers['Content-Type'], json.loads(self.rfile.read(int(self.headers['Content-Length'])))))
+                self.send_response(200)
+                self.end_headers()
+            
+            def log_message(self, *args):
+                pass
+        
+        collector = HTTPServer(('127.0.0.1', 0), Collector)
+        threading.Thread(target=collector.serve_forever, daemon=True).start()
+        try:
+            test_app.config['TRACE_EXPORT_FILE'] = str(tmp_path / 'traces.jsonl')
+            test_app.config['OTLP_TRACES_ENDPOINT'] = f'http://127.0.0.1:{collector.server_port}/v1/traces'
+            configure_tracing(test_app)
+            jsonl_exporter, otlp_exporter = tracer.exporters
+            
+            with patch.object(otlp_exporter, '_run'):  # flushed below instead of by the background thread
+                self.post_traced_entry(client, sample_traveler, lambda prompt: Mock(text='A sunny lunch.'))
+                assert otlp_exporter.flush() == 5
+        finally:
+            collector.shutdown()
+            collector.server_close()
+            tracer.exporters = []
+        
+        lines = (tmp_path / 'traces.jsonl').read_text().splitlines()
+        assert len(lines) == 1
+        exported = json.loads(lines[0])
+        assert exported['name'] == 'create_entry'
+        assert [stage['name'] for stage in exported['stages']][-1] == 'content.commit'
+        
+        assert len(received) == 1
+        path, content_type, payload = received[0]
+        assert path == '/v1/traces'
+        assert content_type == 'application/json'
+        resource_spans = payload['resourceSpans'][0]
+        assert {'key': 'service.name', 'value': {'stringValue': 'roadweave'}} in resource_spans['resource']['attributes']
+        spans = resource_spans['scopeSpans'][0]['spans']
+        assert {span['traceId'] for span in spans} == {exported['trace_id']}
+        root = next(span for span in spans if span['name'] == 'create_entry')
+        assert 'parentSpanId' not in root
+        assert len(root['spanId']) == 16 and len(root['traceId']) == 32
+        assert int(root['endTimeUnixNano']) > int(root['startTimeUnixNano'])
+        assert root['status'] == {'code': 0}
+        generate = next(span for span in spans if span['name'] == 'gemini.generate')
+        assert {'key': 'gen_ai.request.model', 'value': {'stringValue': 'gemini-2.5-flash-lite'}} in generate['attributes']
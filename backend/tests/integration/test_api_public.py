@@ -1,6 +1,12 @@
 import pytest
 import json
-from app import db, PostReaction, TripContent
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from datetime import datetime, date, timedelta
+import numpy as np
+from sqlalchemy import event
+from app import db, Entry, PostReaction, TripContent, TripEvent, ReactionAggregator, LiveFeed
 
 @pytest.mark.integration  
 class TestPublicAPI:
@@ -155,4 +161,658 @@ class TestPublicAPI:
         assert response.status_code == 200
         # Reactions should work even when disabled in this implementation
         data = response.get_json()
-        assert 'message' in data or 'error' in data
\ No newline at end of file
+        assert 'message' in data or 'error' in data
+    
+    def test_get_content_by_range(self, client, public_trip):
+        """Test getting entries and content for a multi-day window"""
+        from tests.conftest import TravelerFactory, EntryFactory, TripContentFactory
+        traveler = TravelerFactory(trip=public_trip)
+        EntryFactory(trip=public_trip, traveler=traveler, timestamp=datetime(2024, 3, 1, 10, 0, 0))
+        EntryFactory(trip=public_trip, traveler=traveler, timestamp=datetime(2024, 3, 3, 10, 0, 0))
+        EntryFactory(trip=public_trip, traveler=traveler, timestamp=datetime(2024, 3, 9, 10, 0, 0))
+        TripContentFactory(trip=public_trip, content_date=date(2024, 3, 2))
+        TripContentFactory(trip=public_trip, content_date=date(2024, 3, 10))
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/content/range?start=2024-03-01&end=2024-03-07')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['start'] == '2024-03-01'
+        assert data['end'] == '2024-03-07'
+        assert [e['entry_date'] for e in data['entries']] == ['2024-03-01', '2024-03-03']
+        assert [c['content_date'] for c in data['content_pieces']] == ['2024-03-02']
+    
+    def test_get_content_by_invalid_range(self, client, public_trip):
+        """Test range endpoint parameter validation"""
+        base_url = f'/api/public/{public_trip.public_token}/content/range'
+        
+        assert client.get(base_url).status_code == 400
+        assert client.get(f'{base_url}?start=2024-03-01&end=bad').status_code == 400
+        assert client.get(f'{base_url}?start=2024-03-07&end=2024-03-01').status_code == 400
+    
+    def test_calendar_counts_by_entry_date(self, client, public_trip):
+        """Test calendar data groups entries per day and type"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip)
+        EntryFactory(trip=public_trip, traveler=traveler, content_type='text', timestamp=datetime(2024, 3, 1, 10, 0, 0))
+        EntryFactory(trip=public_trip, traveler=traveler, content_type='photo', timestamp=datetime(2024, 3, 1, 12, 0, 0))
+        EntryFactory(trip=public_trip, traveler=traveler, content_type='photo', timestamp=datetime(2024, 3, 2, 12, 0, 0))
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/content/calendar')
+        
+        data = response.get_json()
+        assert data['date_range'] == {'start': '2024-03-01', 'end': '2024-03-02'}
+        first_day = data['calendar_data'][0]
+        assert first_day['date'] == '2024-03-01'
+        assert first_day['text_count'] == 1
+        assert first_day['photo_count'] == 1
+        assert first_day['total_count'] == 2
+    
+    def test_public_content_keyset_pagination(self, client, public_trip):
+        """Test walking the content listing page by page with cursors"""
+        from tests.conftest import TripContentFactory
+        for day in range(1, 6):
+            TripContentFactory(trip=public_trip, timestamp=datetime(2024, 3, day, 12, 0, 0))
+        # Two pieces sharing a timestamp must not be skipped or repeated
+        TripContentFactory(trip=public_trip, timestamp=datetime(2024, 3, 3, 12, 0, 0))
+        
+        url = f'/api/public/{public_trip.public_token}/content'
+        expected_ids = [c['id'] for c in client.get(url).get_json()]
+        
+        seen_ids = []
+        response = client.get(f'{url}?limit=4')
+        while True:
+            data = response.get_json()
+            assert len(data['items']) <= 4
+            seen_ids.extend(item['id'] for item in data['items'])
+            if not data['next']:
+                break
+            response = client.get(f'{url}?limit=4&cursor={data["next"]}')
+        
+        assert seen_ids == expected_ids
+        assert len(seen_ids) == 6
+    
+    def test_public_entries_ndjson_stream(self, client, public_trip):
+        """Test streaming the entries listing as newline-delimited JSON"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip)
+        for hour in range(3):
+            EntryFactory(trip=public_trip, traveler=traveler, timestamp=datetime(2024, 3, 1, hour, 0, 0))
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/entries?format=ndjson')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [row['timestamp'][:19] for row in rows] == [
+            '2024-03-01T02:00:00', '2024-03-01T01:00:00', '2024-03-01T00:00:00'
+        ]
+        assert all(row['traveler_name'] == traveler.name for row in rows)
+        assert 'X-Next-Cursor' not in response.headers
+        
+        # limit and cursor page through the stream like through the JSON listing
+        url = f'/api/public/{public_trip.public_token}/entries?format=ndjson&limit=2'
+        response = client.get(url)
+        first_page = [json.loads(line)['timestamp'][:19] for line in response.get_data(as_text=True).splitlines()]
+        assert first_page == ['2024-03-01T02:00:00', '2024-03-01T01:00:00']
+        
+        response = client.get(f"{url}&cursor={response.headers['X-Next-Cursor']}")
+        second_page = [json.loads(line)['timestamp'][:19] for line in response.get_data(as_text=True).splitlines()]
+        assert second_page == ['2024-03-01T00:00:00']
+        assert 'X-Next-Cursor' not in response.headers
+    
+    def test_public_content_invalid_cursor(self, client, public_trip):
+        """Test malformed cursors and limits are rejected"""
+        response = client.get(f'/api/public/{public_trip.public_token}/content?cursor=not-a-cursor')
+        
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+        
+        for query in ('limit=abc', 'limit=abc&format=ndjson'):
+            response = client.get(f'/api/public/{public_trip.public_token}/content?{query}')
+            assert response.status_code == 400
+            assert response.get_json() == {'error': 'Invalid limit'}
+    
+    def test_remove_reaction_never_negative(self, client, public_trip, trip_content):
+        """Test removing a reaction that was never added keeps the count at zero"""
+        url = f'/api/public/{public_trip.public_token}/reactions/{trip_content.id}'
+        
+        response = client.post(url, json={'reaction_type': 'funny', 'action': 'remove'})
+        assert response.get_json()['reactions']['funny'] == 0
+        
+        client.post(url, json={'reaction_type': 'funny', 'action': 'add'})
+        client.post(url, json={'reaction_type': 'funny', 'action': 'add'})
+        response = client.post(url, json={'reaction_type': 'funny', 'action': 'remove'})
+        assert response.get_json()['reactions']['funny'] == 1
+    
+    @pytest.mark.slow
+    def test_concurrent_reactions_are_exact(self, test_app, public_trip, trip_content):
+        """Test thousands of parallel reaction clicks lose no updates"""
+        url = f'/api/public/{public_trip.public_token}/reactions/{trip_content.id}'
+        total_clicks = 2000
+        
+        def click(_):
+            with test_app.test_client() as thread_client:
+                return thread_client.post(url, json={'reaction_type': 'like', 'action': 'add'}).status_code
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            status_codes = list(executor.map(click, range(total_clicks)))
+        
+        assert status_codes == [200] * total_clicks
+        db.session.expire_all()
+        reaction = PostReaction.query.filter_by(content_piece_id=trip_content.id, reaction_type='like').one()
+        assert reaction.count == total_clicks
+    
+    def test_reaction_aggregator_write_behind(self, test_app, public_trip, trip_content):
+        """Test buffered reaction deltas are written in one flush"""
+        aggregator = ReactionAggregator(test_app)
+        trip_id, content_id = public_trip.id, trip_content.id
+        
+        def click(_):
+            aggregator.add(trip_id, content_id, 'love', 1)
+        
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(click, range(1000)))
+        aggregator.add(public_trip.id, trip_content.id, 'support', -1)
+        
+        assert aggregator.pending_for(trip_content.id) == {'love': 1000, 'support': -1}
+        assert PostReaction.query.filter_by(content_piece_id=trip_content.id).count() == 0
+        
+        assert aggregator.flush() == 2
+        assert aggregator.pending_for(trip_content.id) == {}
+        
+        db.session.expire_all()
+        counts = {r.reaction_type: r.count for r in PostReaction.query.filter_by(content_piece_id=trip_content.id)}
+        assert counts == {'love': 1000, 'support': 0}
+        assert aggregator.flush() == 0
+    
+    def test_get_trip_reactions_batched(self, client, public_trip, trip_content):
+        """Test fetching reaction counts for all content pieces in one request"""
+        from tests.conftest import TripContentFactory
+        other_piece = TripContentFactory(trip=public_trip)
+        foreign_piece = TripContentFactory()  # belongs to another trip
+        db.session.add(PostReaction(trip_id=public_trip.id, content_piece_id=trip_content.id,
+                                    reaction_type='like', count=3))
+        db.session.commit()
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/reactions')
+        
+        assert response.status_code == 200
+        reactions = response.get_json()['reactions']
+        assert set(reactions) == {str(trip_content.id), str(other_piece.id)}
+        assert reactions[str(trip_content.id)]['like'] == 3
+        assert reactions[str(other_piece.id)] == {
+            'like': 0, 'applause': 0, 'support': 0, 'love': 0, 'insightful': 0, 'funny': 0
+        }
+        
+        # Selecting ids only returns pieces of this trip
+        response = client.get(f'/api/public/{public_trip.public_token}/reactions?ids={other_piece.id},{foreign_piece.id}')
+        assert set(response.get_json()['reactions']) == {str(other_piece.id)}
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/reactions?ids=1,abc')
+        assert response.status_code == 400
+    
+    def test_get_trip_reactions_etag(self, client, public_trip, trip_content):
+        """Test unchanged reaction counts are answered with 304 Not Modified"""
+        url = f'/api/public/{public_trip.public_token}/reactions'
+        
+        response = client.get(url)
+        etag = response.headers['ETag']
+        assert etag
+        
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        
+        client.post(f'{url}/{trip_content.id}', json={'reaction_type': 'like', 'action': 'add'})
+        
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert response.get_json()['reactions'][str(trip_content.id)]['like'] == 1
+    
+    def test_public_search(self, client, public_trip):
+        """Test full-text search over a trip's blog content"""
+        from tests.conftest import TripContentFactory
+        ramen = TripContentFactory(trip=public_trip, generated_content='We found the best ramen place near Shibuya station.')
+        TripContentFactory(trip=public_trip, generated_content='A quiet morning at the temple.')
+        TripContentFactory(generated_content='Ramen in another trip')  # different trip
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/search?q=ramen plac')
+        
+        assert response.status_code == 200
+        results = response.get_json()['results']
+        assert [r['id'] for r in results] == [ramen.id]
+        assert results[0]['type'] == 'content'
+        assert '<mark>ramen</mark>' in results[0]['snippet']
+        
+        # Stored text is escaped, only the highlighting is markup
+        TripContentFactory(trip=public_trip, generated_content='<img src=x onerror=alert(1)> Sushi & "tea"')
+        snippet = client.get(f'/api/public/{public_trip.public_token}/search?q=sushi').get_json()['results'][0]['snippet']
+        assert snippet == '&lt;img src=x onerror=alert(1)&gt; <mark>Sushi</mark> &amp; &quot;tea&quot;'
+        
+        # Updates and deletes are reflected immediately
+        ramen.generated_content = 'We found the best udon place.'
+        db.session.commit()
+        assert client.get(f'/api/public/{public_trip.public_token}/search?q=ramen').get_json()['results'] == []
+        assert len(client.get(f'/api/public/{public_trip.public_token}/search?q=udon').get_json()['results']) == 1
+        
+        db.session.delete(ramen)
+        db.session.commit()
+        assert client.get(f'/api/public/{public_trip.public_token}/search?q=udon').get_json()['results'] == []
+    
+    def test_public_search_requires_query(self, client, public_trip):
+        """Test search rejects empty queries and ignores FTS syntax"""
+        assert client.get(f'/api/public/{public_trip.public_token}/search').status_code == 400
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/search?q=" OR NEAR(*')
+        assert response.status_code == 200
+        assert response.get_json()['results'] == []
+    
+    def test_invalid_tokens_are_cached(self, client, public_trip):
+        """Test repeated lookups of unknown tokens do not reach the database"""
+        statements = []
+        def count_statements(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        assert client.get('/api/public/no-such-token/content').status_code == 404
+        event.listen(db.engine, 'before_cursor_execute', count_statements)
+        try:
+            assert client.get('/api/public/no-such-token/entries').status_code == 404
+            assert client.get('/api/public/no-such-token/content/calendar').status_code == 404
+            assert client.get(f'/api/public/{public_trip.public_token}').status_code == 200
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statements)
+        
+        # Only the valid token's first lookup and trip load hit the database
+        assert len(statements) == 2
+    
+    def test_public_response_cache(self, client, public_trip):
+        """Test public listings are served from the cache with ETags until the trip changes"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip)
+        entry = EntryFactory(trip=public_trip, traveler=traveler, timestamp=datetime(2023, 12, 1, 10, 0))
+        url = f'/api/public/{public_trip.public_token}/entries'
+        
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        
+        # Different query parameters are cached separately
+        page = client.get(f'{url}?limit=1')
+        assert page.headers['ETag'] != etag
+        assert page.get_json()['items'][0]['id'] == entry.id
+        
+        # Cache hits skip the database queries entirely
+        with patch('routes.public.paginated_response', side_effect=AssertionError('not cached')):
+            assert client.get(url).headers['ETag'] == etag
+        
+        # Any write to the trip is visible immediately
+        entry.latitude, entry.longitude = 35.68, 139.69
+        db.session.commit()
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()[0]['latitude'] == 35.68
+        
+        # Calendar and date views are cached the same way
+        calendar_url = f'/api/public/{public_trip.public_token}/content/calendar'
+        calendar_etag = client.get(calendar_url).headers['ETag']
+        assert client.get(calendar_url, headers={'If-None-Match': calendar_etag}).status_code == 304
+        date_url = f'/api/public/{public_trip.public_token}/content/date/2023-12-01'
+        assert client.get(date_url).get_json()['entries'][0]['id'] == entry.id
+        assert client.get(f'/api/public/{public_trip.public_token}/content/date/bad').status_code == 400
+    
+    def test_traveler_rename_refreshes_cache(self, client, public_trip):
+        """Test renaming a traveler refreshes cached listings and reports their entries to delta sync"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip, name='Anna')
+        entry = EntryFactory(trip=public_trip, traveler=traveler)
+        db.session.commit()
+        url = f'/api/public/{public_trip.public_token}/entries'
+        changes_url = f'/api/public/{public_trip.public_token}/changes'
+        assert client.get(url).get_json()[0]['traveler_name'] == 'Anna'
+        cursor = client.get(changes_url).get_json()['cursor']
+        
+        traveler.name = 'Anna Schmidt'
+        db.session.commit()
+        
+        assert client.get(url).get_json()[0]['traveler_name'] == 'Anna Schmidt'
+        delta = client.get(f'{changes_url}?since={cursor}').get_json()
+        assert [(row['id'], row['traveler_name']) for row in delta['entries']] == [(entry.id, 'Anna Schmidt')]
+    
+    def test_public_viewport(self, client, public_trip):
+        """Test only geotagged entries inside the bounding box are returned"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip)
+        munich = EntryFactory(trip=public_trip, traveler=traveler, latitude=48.137, longitude=11.575)
+        EntryFactory(trip=public_trip, traveler=traveler, latitude=52.52, longitude=13.405)  # Berlin
+        EntryFactory(trip=public_trip, traveler=traveler, latitude=None, longitude=None)
+        EntryFactory(latitude=48.14, longitude=11.58)  # other trip
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/viewport?bbox=11.0,47.5,12.0,48.5')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [item['id'] for item in data['items']] == [munich.id]
+        assert data['truncated'] is False
+        
+        # Deleted entries leave the index
+        db.session.delete(munich)
+        db.session.commit()
+        response = client.get(f'/api/public/{public_trip.public_token}/viewport?bbox=11.0,47.5,12.0,48.5')
+        assert response.get_json()['items'] == []
+    
+    def test_public_viewport_antimeridian_and_content(self, client, public_trip):
+        """Test boxes crossing the antimeridian and the content layer"""
+        from tests.conftest import TravelerFactory, EntryFactory, TripContentFactory
+        traveler = TravelerFactory(trip=public_trip)
+        fiji = EntryFactory(trip=public_trip, traveler=traveler, latitude=-17.7, longitude=178.0)
+        samoa = EntryFactory(trip=public_trip, traveler=traveler, latitude=-13.8, longitude=-172.1)
+        piece = TripContentFactory(trip=public_trip, latitude=-17.7, longitude=178.0)
+        
+        url = f'/api/public/{public_trip.public_token}/viewport?bbox=170,-20,-170,-10'
+        assert {item['id'] for item in client.get(url).get_json()['items']} == {fiji.id, samoa.id}
+        assert [item['id'] for item in client.get(f'{url}&layer=content').get_json()['items']] == [piece.id]
+    
+    def test_public_viewport_invalid_bbox(self, client, public_trip):
+        """Test malformed bounding boxes are rejected"""
+        base_url = f'/api/public/{public_trip.public_token}/viewport'
+        
+        assert client.get(base_url).status_code == 400
+        assert client.get(f'{base_url}?bbox=1,2,3').status_code == 400
+        assert client.get(f'{base_url}?bbox=0,50,10,40').status_code == 400  # south > north
+        assert client.get(f'{base_url}?bbox=0,40,10,50&layer=photos').status_code == 400
+    
+    def test_public_clusters(self, client, public_trip):
+        """Test nearby entries merge into one cluster when zoomed out and split when zoomed in"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip)
+        EntryFactory(trip=public_trip, traveler=traveler, latitude=48.1370, longitude=11.5750,
+                     timestamp=datetime(2023, 12, 1, 10, 0))
+        newest = EntryFactory(trip=public_trip, traveler=traveler, latitude=48.1390, longitude=11.5790,
+                              timestamp=datetime(2023, 12, 1, 12, 0))
+        berlin = EntryFactory(trip=public_trip, traveler=traveler, latitude=52.52, longitude=13.405)
+        EntryFactory(trip=public_trip, traveler=traveler, latitude=None, longitude=None)
+        base_url = f'/api/public/{public_trip.public_token}/clusters'
+        
+        response = client.get(f'{base_url}?zoom=0')
+        assert response.status_code == 200
+        clusters = response.get_json()['clusters']
+        assert [c['count'] for c in clusters] == [3]
+        assert clusters[0]['bounds'] == [11.575, 48.137, 13.405, 52.52]
+        
+        clusters = client.get(f'{base_url}?zoom=8').get_json()['clusters']
+        assert [c['count'] for c in clusters] == [2, 1]
+        assert clusters[0]['entry']['id'] == newest.id  # newest entry represents the cluster
+        assert clusters[0]['latitude'] == pytest.approx(48.138)
+        assert clusters[1]['entry']['id'] == berlin.id
+        
+        clusters = client.get(f'{base_url}?zoom=18').get_json()['clusters']
+        assert [c['count'] for c in clusters] == [1, 1, 1]
+        
+        # Only clusters overlapping the bounding box are returned
+        data = client.get(f'{base_url}?zoom=8&bbox=13,52,14,53').get_json()
+        assert [c['entry']['id'] for c in data['clusters']] == [berlin.id]
+        
+        # New entries invalidate the cached pyramid
+        EntryFactory(trip=public_trip, traveler=traveler, latitude=52.521, longitude=13.406)
+        clusters = client.get(f'{base_url}?zoom=8').get_json()['clusters']
+        assert [c['count'] for c in clusters] == [2, 2]
+    
+    def test_public_route(self, client, public_trip):
+        """Test the route is simplified per zoom level and returned as an encoded polyline"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        traveler = TravelerFactory(trip=public_trip)
+        # A 5,000 point track heading east from Munich, with GPS jitter of about a meter
+        count = 5000
+        jitter = np.sin(np.arange(count)) * 0.00001
+        for i in range(count):
+            db.session.add(Entry(trip_id=public_trip.id, traveler_id=traveler.id, content_type='text',
+                                 latitude=48.0 + float(jitter[i]), longitude=11.0 + i * 0.0002,
+                                 timestamp=datetime(2023, 12, 1) + timedelta(seconds=i)))
+        db.session.commit()
+        base_url = f'/api/public/{public_trip.public_token}/route'
+        
+        response = client.get(f'{base_url}?zoom=10')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['total_points'] == count
+        assert data['points'] == 2
+        assert len(response.get_data()) < 1024
+        
+        # Full detail keeps the jitter
+        assert client.get(base_url).get_json()['points'] > 1000
+        
+        # Unchanged routes are answered with 304
+        etag = response.headers['ETag']
+        assert client.get(f'{base_url}?zoom=10', headers={'If-None-Match': etag}).status_code == 304
+        
+        # A detour invalidates the cached route
+        EntryFactory(trip=public_trip, traveler=traveler, latitude=48.5, longitude=12.0,
+                     timestamp=datetime(2023, 12, 2))
+        assert client.get(f'{base_url}?zoom=10').get_json()['points'] == 3
+        assert client.get(f'{base_url}?zoom=19').status_code == 400
+    
+    def test_public_stats(self, client, public_trip):
+        """Test distance, per-day and per-traveler statistics"""
+        from tests.conftest import TravelerFactory, EntryFactory
+        anna = TravelerFactory(trip=public_trip, name='Anna')
+        ben = TravelerFactory(trip=public_trip, name='Ben')
+        # Anna drives Munich -> Berlin on day one and stays, Ben posts twice from Munich
+        EntryFactory(trip=public_trip, traveler=anna, latitude=48.137, longitude=11.575,
+                     timestamp=datetime(2023, 12, 1, 8, 0))
+        EntryFactory(trip=public_trip, traveler=anna, latitude=52.52, longitude=13.405,
+                     timestamp=datetime(2023, 12, 1, 16, 0))
+        EntryFactory(trip=public_trip, traveler=anna, latitude=52.5201, longitude=13.4051,
+                     timestamp=datetime(2023, 12, 2, 10, 0))
+        EntryFactory(trip=public_trip, traveler=ben, latitude=48.137, longitude=11.575,
+                     timestamp=datetime(2023, 12, 2, 11, 0))
+        EntryFactory(trip=public_trip, traveler=ben, latitude=48.137, longitude=11.575,
+                     timestamp=datetime(2023, 12, 2, 13, 0))
+        EntryFactory(trip=public_trip, traveler=ben, latitude=None, longitude=None)
+        
+        response = client.get(f'/api/public/{public_trip.public_token}/stats')
+        
+        assert response.status_code == 200
+        stats = response.get_json()
+        assert stats['points'] == 5
+        assert stats['bbox'] == [11.575, 48.137, 13.4051, 52.5201]
+        assert stats['start'].startswith('2023-12-01T08:00:00')
+        # Combined route: Munich -> Berlin -> Berlin -> Munich -> Munich
+        assert stats['distance_km'] == pytest.approx(2 * 504.4, abs=1)
+        assert [(d['date'], d['points']) for d in stats['days']] == [('2023-12-01', 2), ('2023-12-02', 3)]
+        assert stats['days'][0]['distance_km'] == pytest.approx(504.4, abs=0.5)
+        
+        travelers = {t['traveler_name']: t for t in stats['travelers']}
+        assert travelers['Anna']['distance_km'] == pytest.approx(504.4, abs=0.5)
+        assert travelers['Anna']['stationary_hours'] == 18.0
+        assert travelers['Ben']['distance_km'] == 0
+        assert travelers['Ben']['stationary_hours'] == 2.0
+    
+    def test_public_clusters_invalid_zoom(self, client, public_trip):
+        """Test zoom is required and bounded"""
+        base_url = f'/api/public/{public_trip.public_token}/clusters'
+        
+        assert client.get(base_url).status_code == 400
+        assert client.get(f'{base_url}?zoom=19').status_code == 400
+        assert client.get(f'{base_url}?zoom=3&bbox=1,2').status_code == 400
+        assert client.get(f'{base_url}?zoom=3').get_json()['clusters'] == []
+    
+    def test_live_feed_replay(self, client, test_app, public_trip, trip_content):
+        """Test the live feed replays content and reaction events after Last-Event-ID"""
+        test_app.config['LIVE_FEED_MAX_DURATION'] = 0
+        url = f'/api/public/{public_trip.public_token}/live'
+        
+        response = client.get(url, headers={'Last-Event-ID': '0'})
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+        assert 'event: content.created' in body
+        events = [json.loads(line[6:]) for line in body.splitlines() if line.startswith('data: ')]
+        assert events[0]['id'] == trip_content.id
+        last_id = max(int(line[4:]) for line in body.splitlines() if line.startswith('id: '))
+        
+        client.post(f'/api/public/{public_trip.public_token}/reactions/{trip_content.id}',
+                    json={'reaction_type': 'love', 'action': 'add'})
+        test_app.extensions['live_feed'].record_reactions()  # normally done by the live feed thread
+        db.session.delete(trip_content)
+        db.session.commit()
+        
+        body = client.get(url, headers={'Last-Event-ID': str(last_id)}).get_data(as_text=True)
+        assert 'content.created' not in body
+        assert body.index('event: reactions') < body.index('event: content.deleted')
+        events = [json.loads(line[6:]) for line in body.splitlines() if line.startswith('data: ')]
+        assert events[0] == {'content_id': trip_content.id, 'reactions': {**events[0]['reactions'], 'love': 1}}
+        assert events[1] == {'id': trip_content.id}
+        
+        # Without Last-Event-ID nothing is replayed
+        assert 'event:' not in client.get(url).get_data(as_text=True)
+        assert client.get(f'{url}?last_event_id=abc').status_code == 400
+        assert client.get('/api/public/invalid_token/live').status_code == 404
+    
+    def test_live_feed_trimmed_log(self, client, test_app, public_trip):
+        """Test the event log is bounded per trip and a client behind it gets a reset"""
+        from tests.conftest import TripContentFactory
+        test_app.config['LIVE_FEED_MAX_DURATION'] = 0
+        
+        with patch('app.TRIP_EVENT_LOG_SIZE', 2):
+            for _ in range(3):
+                db.session.add(TripContentFactory(trip=public_trip))
+                db.session.commit()
+            
+            assert TripEvent.query.filter_by(trip_id=public_trip.id).count() == 2
+            body = client.get(f'/api/public/{public_trip.public_token}/live',
+                              headers={'Last-Event-ID': '0'}).get_data(as_text=True)
+        assert body.count('event: content.created') == 2
+        assert 'event: reset' in body
+    
+    def test_reaction_events_batched(self, client, test_app, public_trip, trip_content):
+        """Test reaction clicks only write their counter; the live feed thread logs one event per post"""
+        live_feed = test_app.extensions['live_feed']
+        url = f'/api/public/{public_trip.public_token}/reactions/{trip_content.id}'
+        events = TripEvent.query.filter_by(trip_id=public_trip.id, event_type='reactions')
+        
+        with patch.object(live_feed, 'reactions_changed') as reactions_changed:
+            for reaction_type in ('like', 'love', 'like'):
+                assert client.post(url, json={'reaction_type': reaction_type, 'action': 'add'}).status_code == 200
+        assert events.count() == 0
+        assert reactions_changed.call_count == 3
+        
+        for args in reactions_changed.call_args_list:
+            live_feed.reactions_changed(*args.args)
+        live_feed.record_reactions()
+        assert events.count() == 1
+        assert json.loads(events.one().data)['reactions'] == {**json.loads(events.one().data)['reactions'], 'like': 2, 'love': 1}
+    
+    def test_live_feed_closed(self, client, test_app, public_trip, admin_auth_headers):
+        """Test open streams end with a closed event when public access is turned off"""
+        test_app.config['LIVE_FEED_MAX_DURATION'] = 30
+        url = f'/api/public/{public_trip.public_token}/live'
+        
+        response = client.get(url, buffered=False)
+        assert response.status_code == 200
+        client.put(f'/api/admin/trips/{public_trip.id}/public', json={'enabled': False}, headers=admin_auth_headers)
+        
+        started = time.monotonic()
+        body = response.get_data(as_text=True)
+        assert time.monotonic() - started < 10
+        assert body.endswith('event: closed\ndata: {}\n\n')
+        assert client.get(url).status_code == 404
+    
+    def test_live_feed_unconsumed_streams(self, client, test_app, public_trip):
+        """Test HEAD requests and streams closed before the first byte free their subscriber slot"""
+        live_feed = test_app.extensions['live_feed']
+        url = f'/api/public/{public_trip.public_token}/live'
+        
+        for _ in range(3):
+            response = client.head(url)
+            assert response.status_code == 200
+            response.close()  # as the WSGI server does once the (empty) body is sent
+        assert live_feed._count == 0
+        
+        response = client.get(url, buffered=False)
+        assert live_feed._count == 1
+        response.close()
+        assert live_feed._count == 0
+    
+    def test_live_feed_fan_out(self, test_app, public_trip):
+        """Test subscribers of one trip share each polled event"""
+        from tests.conftest import TripContentFactory
+        live_feed = LiveFeed(test_app, poll_interval=60)
+        subscriptions = [live_feed.subscribe(public_trip.id) for _ in range(3)]
+        
+        content = TripContentFactory(trip=public_trip)
+        db.session.add(content)
+        db.session.commit()
+        live_feed.poll()
+        
+        try:
+            for subscription in subscriptions:
+                event = subscription.events.get(timeout=5)
+                assert event.event_type == 'content.created'
+                assert json.loads(event.data)['id'] == content.id
+                assert subscription.events.empty()
+        finally:
+            for subscription in subscriptions:
+                live_feed.unsubscribe(subscription)
+        
+        assert live_feed.poll() == 0
+    
+    def test_public_changes(self, client, public_trip, trip_content):
+        """Test public delta sync omits entry text and reports new content after the cursor"""
+        from tests.conftest import TripContentFactory
+        url = f'/api/public/{public_trip.public_token}/changes'
+        
+        snapshot = client.get(url).get_json()
+        assert [piece['id'] for piece in snapshot['content_pieces']] == [trip_content.id]
+        
+        new_content = TripContentFactory(trip=public_trip)
+        db.session.add(new_content)
+        db.session.commit()
+        
+        delta = client.get(f"{url}?since={snapshot['cursor']}").get_json()
+        assert [piece['id'] for piece in delta['content_pieces']] == [new_content.id]
+        assert client.get('/api/public/invalid_token/changes').status_code == 404
+    
+    def test_public_bundle(self, client, public_trip, trip_content):
+        """Test the bundle combines trip, first content page, entries, calendar and reactions"""
+        from tests.conftest import EntryFactory, TravelerFactory
+        entry = EntryFactory(trip=public_trip, traveler=TravelerFactory(trip=public_trip), content_type='photo')
+        db.session.add(entry)
+        db.session.commit()
+        client.post(f'/api/public/{public_trip.public_token}/reactions/{trip_content.id}',
+                    json={'reaction_type': 'like', 'action': 'add'})
+        url = f'/api/public/{public_trip.public_token}/bundle'
+        
+        response = client.get(url)
+        assert response.status_code == 200
+        bundle = response.get_json()
+        assert set(bundle) == {'trip', 'content', 'entries', 'calendar', 'reactions'}
+        assert bundle['trip']['trip_name'] == public_trip.name
+        assert [item['id'] for item in bundle['content']['items']] == [trip_content.id]
+        assert bundle['content']['next'] is None
+        assert [item['id'] for item in bundle['entries']] == [entry.id]
+        assert 'content' not in bundle['entries'][0]
+        assert bundle['calendar'] == client.get(f'/api/public/{public_trip.public_token}/content/calendar').get_json()
+        assert bundle['reactions'][str(trip_content.id)]['like'] == 1
+        
+        # The ETag covers the reaction counts too
+        etag = response.headers['ETag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        client.post(f'/api/public/{public_trip.public_token}/reactions/{trip_content.id}',
+                    json={'reaction_type': 'like', 'action': 'add'})
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+    
+    def test_public_bundle_field_selector(self, client, public_trip, trip_content):
+        """Test ?fields= limits the bundle and rejects unknown fields"""
+        url = f'/api/public/{public_trip.public_token}/bundle'
+        
+        bundle = client.get(f'{url}?fields=trip,calendar').get_json()
+        assert set(bundle) == {'trip', 'calendar'}
+        
+        bundle = client.get(f'{url}?fields=reactions').get_json()
+        assert set(bundle) == {'reactions'}
+        assert str(trip_content.id) in bundle['reactions']
+        
+        assert client.get(f'{url}?fields=trip,secrets').status_code == 400
+        assert client.get('/api/public/invalid_token/bundle').status_code == 404
@@ -1,6 +1,12 @@
 import pytest
+import os
+from unittest.mock import patch
 from datetime import datetime, date
-from app import db, Trip, Traveler, Entry, TripContent, PostReaction
+from app import (
+    db, Trip, Traveler, Entry, TripContent, PostReaction, ContentEntry,
+    get_content_pieces_for_entry, backfill_content_entries, backfill_content_dates, backfill_place_names,
+    entry_to_dict
+)
 
 @pytest.mark.unit
 class TestModels:
@@ -97,6 +103,55 @@ class TestModels:
         assert entry.trip == sample_trip
         assert entry.traveler == sample_traveler
     
+    @patch.dict(os.environ, {'TIMEZONE': 'Europe/Berlin'})
+    def test_entry_date_uses_local_timezone(self, app_context, sample_trip, sample_traveler):
+        """Test entry_date is derived from the timestamp in the trip timezone"""
+        entry = Entry(
+            trip_id=sample_trip.id,
+            traveler_id=sample_traveler.id,
+            content_type="text",
+            content="Late night in Berlin",
+            timestamp=datetime(2023, 12, 1, 23, 30, 0)  # 00:30 on Dec 2 in Berlin
+        )
+        
+        db.session.add(entry)
+        db.session.commit()
+        
+        assert entry.entry_date == date(2023, 12, 2)
+        
+        # Moving the timestamp updates the stored day
+        entry.timestamp = datetime(2023, 12, 5, 10, 0, 0)
+        db.session.commit()
+        
+        assert entry.entry_date == date(2023, 12, 5)
+    
+    def test_entry_place_name(self, app_context, sample_trip, sample_traveler):
+        """Test the nearest place name is cached on the entry and follows coordinate changes"""
+        entry = Entry(
+            trip_id=sample_trip.id,
+            traveler_id=sample_traveler.id,
+            content_type="text",
+            content="Coffee at the Viktualienmarkt",
+            latitude=48.135,
+            longitude=11.576
+        )
+        db.session.add(entry)
+        db.session.commit()
+        
+        assert entry.place_name == 'Munich, Bavaria, Germany'
+        
+        entry.latitude, entry.longitude = 47.80, 13.04
+        db.session.commit()
+        assert entry.place_name == 'Salzburg, Austria'
+        
+        # Unrelated edits keep the cached name, clearing coordinates clears it
+        entry.disabled = True
+        db.session.commit()
+        assert entry.place_name == 'Salzburg, Austria'
+        entry.latitude = entry.longitude = None
+        db.session.commit()
+        assert entry.place_name is None
+    
     def test_trip_content_model_creation(self, app_context, sample_trip):
         """Test TripContent model creation"""
         content_date = date(2023, 12, 1)
@@ -125,6 +180,145 @@ class TestModels:
         # Test relationship
         assert content.trip == sample_trip
     
+    def test_content_entry_links(self, app_context, sample_trip, sample_entry):
+        """Test linking content pieces to entries and the reverse lookup"""
+        content = TripContent(
+            trip_id=sample_trip.id,
+            generated_content="Linked content",
+            content_date=date(2023, 12, 1),
+            entry_links=[ContentEntry(entry_id=sample_entry.id)]
+        )
+        other = TripContent(
+            trip_id=sample_trip.id,
+            generated_content="Unrelated content",
+            content_date=date(2023, 12, 1)
+        )
+        db.session.add_all([content, other])
+        db.session.commit()
+        
+        assert content.entry_id_list == [sample_entry.id]
+        assert get_content_pieces_for_entry(sample_entry.id) == [content]
+        
+        # Deleting the content piece removes its links
+        db.session.delete(content)
+        db.session.commit()
+        assert ContentEntry.query.count() == 0
+    
+    def test_backfill_content_entries(self, app_context, sample_trip, sample_traveler):
+        """Test links are created from the legacy JSON entry_ids column"""
+        from tests.conftest import EntryFactory
+        first = EntryFactory(trip=sample_trip, traveler=sample_traveler)
+        second = EntryFactory(trip=sample_trip, traveler=sample_traveler)
+        content = TripContent(
+            trip_id=sample_trip.id,
+            generated_content="Legacy content",
+            content_date=date(2023, 12, 1),
+            entry_ids=f'[{first.id}, {second.id}, 999999]'  # 999999 no longer exists
+        )
+        broken = TripContent(
+            trip_id=sample_trip.id,
+            generated_content="Broken content",
+            content_date=date(2023, 12, 1),
+            entry_ids='not json'
+        )
+        db.session.add_all([content, broken])
+        db.session.commit()
+        
+        assert backfill_content_entries() == 2
+        db.session.expire_all()
+        assert content.entry_id_list == [first.id, second.id]
+        assert broken.entry_id_list == []
+        
+        # Running again is a no-op
+        assert backfill_content_entries() == 0
+    
+    def test_backfill_content_dates(self, app_context, sample_trip):
+        """Test content dated by its UTC day moves to the local day, once"""
+        late_evening = TripContent(
+            trip_id=sample_trip.id,
+            generated_content="After midnight in Berlin",
+            timestamp=datetime(2023, 12, 1, 23, 30),  # 00:30 on December 2nd in Europe/Berlin
+            content_date=date(2023, 12, 1)
+        )
+        midday = TripContent(
+            trip_id=sample_trip.id,
+            generated_content="Lunch",
+            timestamp=datetime(2023, 12, 1, 12, 0),
+            content_date=date(2023, 12, 1)
+        )
+        db.session.add_all([late_evening, midday])
+        db.session.commit()
+        version = sample_trip.content_version
+        
+        with patch.dict(os.environ, {'TIMEZONE': 'Europe/Berlin'}):
+            assert backfill_content_dates() == 1
+            db.session.expire_all()
+            assert late_evening.content_date == date(2023, 12, 2)
+            assert midday.content_date == date(2023, 12, 1)
+            assert sample_trip.content_version > version
+            
+            # Runs once: later content is dated by the local day when created
+            late_evening.content_date = date(2023, 12, 1)
+            db.session.commit()
+            assert backfill_content_dates() == 0
+    
+    def test_backfill_place_names(self, app_context, sample_trip, sample_traveler):
+        """Test legacy entries get place names and checked entries are not looked up again"""
+        munich = Entry(trip_id=sample_trip.id, traveler_id=sample_traveler.id, content_type="text",
+                       content="Viktualienmarkt", latitude=48.135, longitude=11.576)
+        ocean = Entry(trip_id=sample_trip.id, traveler_id=sample_traveler.id, content_type="text",
+                      content="Mid-Atlantic", latitude=30.0, longitude=-40.0)
+        db.session.add_all([munich, ocean])
+        db.session.commit()
+        db.session.execute(Entry.__table__.update().values(place_name=None))
+        db.session.commit()
+        version = sample_trip.content_version
+        
+        assert backfill_place_names(batch_size=1) == 1
+        db.session.expire_all()
+        assert munich.place_name == 'Munich, Bavaria, Germany'
+        assert ocean.place_name is None
+        assert sample_trip.content_version > version
+        
+        with patch('app.reverse_geocode') as mock_geocode:
+            assert backfill_place_names() == 0
+            mock_geocode.assert_not_called()
+    
+    def test_trip_content_version(self, app_context, sample_trip, sample_traveler):
+        """Test every change to a trip, its entries or content bumps content_version"""
+        def version():
+            db.session.expire(sample_trip)
+            return sample_trip.content_version
+        
+        start = version()
+        entry = Entry(trip_id=sample_trip.id, traveler_id=sample_traveler.id, content_type="text", content="Hi")
+        db.session.add(entry)
+        db.session.commit()
+        assert version() == start + 1
+        
+        # Several changes in one flush count once
+        entry.disabled = True
+        db.session.add(TripContent(trip_id=sample_trip.id, generated_content="Hi", content_date=date(2023, 12, 1)))
+        db.session.commit()
+        assert version() == start + 2
+        
+        sample_trip.public_enabled = True
+        db.session.commit()
+        assert version() == start + 3
+        
+        # Nothing changed, nothing bumped
+        db.session.commit()
+        assert version() == start + 3
+    
+    def test_entry_serializer_expired_rows(self, app_context, sample_entry):
+        """Test serializing an entry reads the same values with loaded and expired attributes"""
+        loaded = entry_to_dict(sample_entry)
+        db.session.expire(sample_entry)
+        
+        assert entry_to_dict(sample_entry) == loaded
+        assert loaded['traveler_name'] == sample_entry.traveler.name
+        assert loaded['timestamp'].endswith('+00:00')
+    
     def test_post_reaction_model_creation(self, app_context, sample_trip):
         """Test PostReaction model creation"""
         # Create content first
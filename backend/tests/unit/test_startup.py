@@ -0,0 +1,44 @@
+import pytest
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.mark.unit
+class TestStartup:
+    """Test importing the backend stays cheap (see benchmarks/startup.py for timings)"""
+    
+    def test_heavy_modules_load_lazily(self, tmp_path):
+        """Test the AI SDK, Pillow, numpy, pytz and dotenv are not imported by importing the app or building it"""
+        code = (
+            "import sys, app\n"
+            "app.create_app()\n"
+            "lazy = ('google.generativeai', 'PIL.Image', 'numpy', 'pytz', 'dotenv')\n"
+            "print('loaded:', [m for m in lazy if m in sys.modules])\n"
+        )
+        env = dict(os.environ, UPLOAD_FOLDER=str(tmp_path / 'uploads'), GEOCODER_CACHE_DIR=str(tmp_path / 'geocoder'))
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        
+        assert result.stdout.strip().splitlines()[-1] == 'loaded: []'
+    
+    def test_create_app_is_independent(self, tmp_path):
+        """Test each application gets its own configuration"""
+        from app import create_app
+        first = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/first.db', 'UPLOAD_FOLDER': str(tmp_path / 'a')})
+        second = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/second.db', 'UPLOAD_FOLDER': str(tmp_path / 'b')})
+        
+        assert first.config['UPLOAD_FOLDER'] != second.config['UPLOAD_FOLDER']
+        assert {'admin_api', 'trips_api', 'traveler_api', 'public_api', 'frontend'} <= set(first.blueprints)
+    
+    def test_init_database_closes_connections(self, tmp_path):
+        """Test no pooled connection is left open for forked workers to inherit"""
+        from app import create_app, db, init_database
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path}/roadweave.db', 'UPLOAD_FOLDER': str(tmp_path / 'uploads')})
+        init_database(app)
+        
+        with app.app_context():
+            assert db.engine.pool.checkedin() == 0
+            assert db.engine.pool.checkedout() == 0
@@ -3,10 +3,14 @@ import os
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 import pytz
+import numpy as np
 from app import (
     generate_random_password, generate_token, format_timestamp_local,
     timestamp_to_iso, allowed_file, is_image_file, is_audio_file,
-    check_daily_limit, increment_daily_usage, daily_usage_tracker
+    check_daily_limit, increment_daily_usage, daily_usage_tracker,
+    local_date, parse_date_param, encode_polyline, simplify_track,
+    haversine_km, reverse_geocode, build_kdtree, unit_vectors, ReverseGeocoder, TokenCache,
+    TripCache, load_generated_password, OrjsonProvider, orjson, render_markdown
 )
 
 @pytest.mark.unit
@@ -80,6 +84,199 @@ class TestUtilityFunctions:
         iso_string_aware = timestamp_to_iso(utc_time_aware)
         assert '2023-12-01T12:00:00+00:00' in iso_string_aware
     
+    def test_timestamp_to_iso_matches_pytz(self):
+        """Test the naive-UTC fast path gives the same string as localizing with pytz"""
+        for utc_time in (datetime(2023, 12, 1, 12, 0, 0), datetime(2024, 2, 29, 23, 59, 59, 123456)):
+            assert timestamp_to_iso(utc_time) == pytz.utc.localize(utc_time).isoformat()
+
+    def test_timestamp_to_iso_other_inputs(self):
+        """Test non-UTC offsets are kept and non-datetime values do not raise"""
+        berlin_time = pytz.timezone('Europe/Berlin').localize(datetime(2023, 7, 1, 14, 30, 0))
+        assert timestamp_to_iso(berlin_time) == '2023-07-01T14:30:00+02:00'
+
+        assert timestamp_to_iso(None) is None
+        assert timestamp_to_iso('2023-12-01 12:00:00') == '2023-12-01 12:00:00'
+
+    def test_make_serializer(self):
+        """Test serializers read plain, dotted and converted attributes"""
+        from types import SimpleNamespace
+        from serializers import make_serializer
+
+        row = SimpleNamespace(id=7, name='Anna', traveler=SimpleNamespace(name='Ben'), tags=['a', 'b'])
+        assert make_serializer(('id', 'id'))(row) == {'id': 7}
+        serialize = make_serializer(('id', 'id'), ('traveler_name', 'traveler.name'), ('tag_count', 'tags', len))
+        assert serialize(row) == {'id': 7, 'traveler_name': 'Ben', 'tag_count': 2}
+
+    @pytest.mark.skipif(orjson is None, reason='orjson is not installed')
+    def test_orjson_provider_matches_stdlib(self, test_app):
+        """Test the orjson provider encodes API payloads like the stdlib provider"""
+        from flask.json.provider import DefaultJSONProvider
+        payload = {'b': [1, 2.5, None, True], 'a': {3: 'drei', 4: 'über'}, 'day': datetime(2024, 6, 1).date()}
+        
+        with test_app.app_context():
+            fast = OrjsonProvider(test_app).response(payload)
+            stdlib = DefaultJSONProvider(test_app).response(payload)
+        
+        assert fast.mimetype == stdlib.mimetype
+        assert fast.get_json() == stdlib.get_json()
+        assert list(fast.get_json()) == ['a', 'b', 'day']  # sorted keys
+    
+    def test_render_markdown(self):
+        """Test generated blog markdown is rendered to escaped HTML with photo markers replaced"""
+        text = "## Rome\n\nWe **loved** the <old> *forum*.\n\n[PHOTO:7]\n\n- pasta\n- gelato\n\nSee [PHOTO:8] and [map](https://example.com/?a=1&b=2)"
+        rendered = render_markdown(text, lambda entry_id: f'<img data-entry="{entry_id}">')
+        
+        assert rendered.split('\n') == [
+            '<h2>Rome</h2>',
+            '<p>We <strong>loved</strong> the &lt;old&gt; <em>forum</em>.</p>',
+            '<img data-entry="7">',
+            '<ul><li>pasta</li><li>gelato</li></ul>',
+            '<p>See <img data-entry="8"> and <a href="https://example.com/?a=1&amp;b=2">map</a></p>',
+        ]
+    
+    @patch.dict(os.environ, {'TIMEZONE': 'America/New_York'})
+    def test_local_date(self):
+        """Test calendar day conversion into the configured timezone"""
+        from datetime import date
+        
+        # 03:00 UTC is still the previous evening in New York
+        assert local_date(datetime(2023, 12, 2, 3, 0, 0)) == date(2023, 12, 1)
+        assert local_date(datetime(2023, 12, 2, 12, 0, 0)) == date(2023, 12, 2)
+        
+        # Timezone-aware timestamps are converted as well
+        assert local_date(pytz.utc.localize(datetime(2023, 12, 2, 3, 0, 0))) == date(2023, 12, 1)
+    
+    def test_parse_date_param(self):
+        """Test YYYY-MM-DD parameter parsing"""
+        from datetime import date
+        
+        assert parse_date_param('2023-12-01') == date(2023, 12, 1)
+        assert parse_date_param('01.12.2023') is None
+        assert parse_date_param('') is None
+        assert parse_date_param(None) is None
+    
+    def test_encode_polyline(self):
+        """Test the Google encoded polyline algorithm against its reference example"""
+        latitudes = np.array([38.5, 40.7, 43.252])
+        longitudes = np.array([-120.2, -120.95, -126.453])
+        
+        assert encode_polyline(latitudes, longitudes) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+        assert encode_polyline(np.array([]), np.array([])) == ''
+    
+    def test_simplify_track(self):
+        """Test Douglas-Peucker keeps the end points and corners only"""
+        # An L-shaped track with slight noise along both legs
+        x = np.array([0.0, 1.0, 2.0, 3.0, 3.0, 3.0, 3.0])
+        y = np.array([0.0, 0.01, -0.01, 0.0, 1.0, 2.0, 3.0])
+        
+        assert simplify_track(x, y, 0.1).tolist() == [0, 3, 6]
+        assert simplify_track(x, y, 0.001).tolist() == [0, 1, 2, 3, 6]
+        assert simplify_track(x[:2], y[:2], 0.1).tolist() == [0, 1]
+    
+    def test_haversine_km(self):
+        """Test vectorized great-circle distances"""
+        # Munich -> Berlin and Munich -> Munich
+        distances = haversine_km(np.array([48.137, 48.137]), np.array([11.575, 11.575]),
+                                 np.array([52.52, 48.137]), np.array([13.405, 11.575]))
+        
+        assert distances[0] == pytest.approx(504.4, abs=0.5)
+        assert distances[1] == 0
+        
+        # Crossing the antimeridian takes the short way
+        assert haversine_km(0.0, 179.5, 0.0, -179.5) == pytest.approx(111.2, abs=0.1)
+    
+    def test_reverse_geocode(self):
+        """Test offline lookups against the bundled places dataset"""
+        assert reverse_geocode(48.14, 11.58) == 'Munich, Bavaria, Germany'
+        assert reverse_geocode(52.51, 13.39) == 'Berlin, Germany'  # duplicate admin area collapsed
+        assert reverse_geocode(-17.75, 177.45) == 'Nadi, Western, Fiji'
+        
+        # Mid-Atlantic is too far from any known place
+        assert reverse_geocode(35.0, -40.0) is None
+        assert reverse_geocode(None, 11.58) is None
+    
+    def test_kdtree_matches_brute_force(self, tmp_path):
+        """Test the k-d tree returns the same nearest place as a linear scan"""
+        rng = np.random.default_rng(42)
+        latitudes, longitudes = rng.uniform(-80, 80, 2000), rng.uniform(-180, 180, 2000)
+        dataset = tmp_path / 'places.tsv'
+        dataset.write_text('name\tadmin1\tcountry\tlatitude\tlongitude\n' + ''.join(
+            f'Place {i}\t\t\t{lat}\t{lng}\n' for i, (lat, lng) in enumerate(zip(latitudes, longitudes))
+        ))
+        geocoder = ReverseGeocoder(str(dataset), str(tmp_path / 'cache'), max_distance_km=20000)
+        points = unit_vectors(latitudes, longitudes)
+        
+        for lat, lng in zip(rng.uniform(-90, 90, 200), rng.uniform(-180, 180, 200)):
+            expected = int(np.argmin(((points - unit_vectors(lat, lng)[0]) ** 2).sum(axis=1)))
+            assert geocoder.lookup(lat, lng) == f'Place {expected}'
+        
+        # A second instance memory-maps the saved index instead of rebuilding it
+        reloaded = ReverseGeocoder(str(dataset), str(tmp_path / 'cache'), max_distance_km=20000)
+        assert reloaded.lookup(latitudes[7], longitudes[7]) == 'Place 7'
+        assert len(list((tmp_path / 'cache').iterdir())) == 1
+    
+    def test_token_cache_expiry(self):
+        """Test cached token lookups expire, misses sooner than hits"""
+        cache = TokenCache(ttl=60, negative_ttl=5)
+        with patch('app.time.monotonic', return_value=1000.0):
+            cache.set(('public', 'good'), 'trip', trip_id=1)
+            cache.set(('public', 'bad'), None)
+            assert cache.get(('public', 'good')) == (True, 'trip')
+            assert cache.get(('public', 'bad')) == (True, None)
+        
+        with patch('app.time.monotonic', return_value=1010.0):
+            assert cache.get(('public', 'good')) == (True, 'trip')
+            assert cache.get(('public', 'bad')) == (False, None)
+            
+            cache.invalidate_trip(1)
+            assert cache.get(('public', 'good')) == (False, None)
+    
+    def test_token_cache_shared_invalidation(self, tmp_path):
+        """Test an invalidation in one worker process empties the token caches of the others"""
+        path = str(tmp_path / 'token-cache.generation')
+        worker, other_worker = TokenCache(), TokenCache()
+        worker.attach(path)
+        other_worker.attach(path)
+        
+        worker.set(('public', 'good'), 'trip', trip_id=1)
+        worker.set(('traveler', 'other'), 'traveler', trip_id=2)
+        other_worker.invalidate_trip(1)
+        assert worker.get(('public', 'good')) == (False, None)
+        assert worker.get(('traveler', 'other')) == (False, None)
+        
+        # A lookup read from the database before another worker's invalidation is not stored
+        generation = worker.generation()
+        other_worker.invalidate(('public', 'good'))
+        worker.set(('public', 'good'), 'stale trip', trip_id=1, generation=generation)
+        assert worker.get(('public', 'good')) == (False, None)
+        
+        worker.set(('public', 'good'), 'trip', trip_id=1, generation=worker.generation())
+        assert worker.get(('public', 'good')) == (True, 'trip')
+    
+    def test_trip_cache_version(self):
+        """Test cached trip values are recomputed when the trip's content_version changes"""
+        cache = TripCache()
+        calls = []
+        def compute():
+            calls.append(1)
+            return len(calls)
+        
+        assert cache.get_or_compute(1, 'stats', compute, version=3) == 1
+        assert cache.get_or_compute(1, 'stats', compute, version=3) == 1
+        # Another worker committed a change: the stored value is stale
+        assert cache.get_or_compute(1, 'stats', compute, version=4) == 2
+        assert cache.get_or_compute(1, 'stats', compute, version=4) == 2
+    
+    def test_load_generated_password(self, tmp_path):
+        """Test the generated admin password is created once and shared by later callers"""
+        path = str(tmp_path / 'instance' / 'admin_password')
+        password, created = load_generated_password(path)
+        assert created is True
+        assert len(password) == 12
+        assert oct(os.stat(path).st_mode & 0o777) == '0o600'
+        
+        assert load_generated_password(path) == (password, False)
+    
     def test_allowed_file(self):
         """Test file extension validation"""
         # Test allowed extensions
@@ -0,0 +1,100 @@
+"""Trip statistics: distances, daily movement, per-traveler totals and stationary time
+computed with numpy over a trip's track
+
+The functions here work on plain arrays; app.py loads the track from the
+database and adds the traveler names.
+"""
+from datetime import datetime, timedelta
+
+from serializers import timestamp_to_iso
+
+EARTH_RADIUS_KM = 6371.0088
+STATIONARY_RADIUS_KM = 0.2  # Consecutive points closer than this count as not moving
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance in kilometers, element-wise over coordinate arrays"""
+    import numpy as np
+    lat1, lng1, lat2, lng2 = (np.radians(values) for values in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def julian_day_to_datetime(value):
+    return datetime(1970, 1, 1) + timedelta(seconds=round((value - UNIX_EPOCH_JULIAN_DAY) * 86400))
+
+def summarize_track(latitudes, longitudes, times, days, travelers, names):
+    """Distance, daily movement, per-traveler totals, bounding box and stationary time of a trip
+    
+    Trip and per-day figures follow the combined route through all entries (as
+    drawn by the route endpoint), per-traveler figures each traveler's own
+    track. Time between consecutive points less than STATIONARY_RADIUS_KM
+    apart counts as stationary. The arrays are those of load_trip_track() in
+    app.py, names maps traveler ids to names.
+    """
+    import numpy as np
+    count = len(latitudes)
+    stats = {
+        'points': count,
+        'distance_km': 0.0,
+        'stationary_hours': 0.0,
+        'bbox': None,
+        'start': None,
+        'end': None,
+        'days': [],
+        'travelers': []
+    }
+    if not count:
+        return stats
+    
+    distances = haversine_km(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+    hours = np.diff(times) * 24
+    stats.update({
+        'distance_km': round(float(distances.sum()), 3),
+        'stationary_hours': round(float(hours[distances < STATIONARY_RADIUS_KM].sum()), 2),
+        'bbox': [float(longitudes.min()), float(latitudes.min()), float(longitudes.max()), float(latitudes.max())],
+        'start': timestamp_to_iso(julian_day_to_datetime(times[0])),
+        'end': timestamp_to_iso(julian_day_to_datetime(times[-1]))
+    })
+    
+    # Each segment counts towards the local day its end point was recorded on
+    day_values, day_index, day_points = np.unique(days, return_inverse=True, return_counts=True)
+    day_distances = np.bincount(day_index[1:], weights=distances, minlength=len(day_values))
+    stats['days'] = [
+        {
+            'date': julian_day_to_datetime(day).date().isoformat(),
+            'points': int(points),
+            'distance_km': round(float(distance), 3)
+        }
+        for day, points, distance in zip(day_values, day_points, day_distances)
+        if not np.isnan(day)
+    ]
+    
+    # Regroup by traveler, keeping time order, and only join points of the same traveler
+    order = np.lexsort((np.arange(count), travelers))
+    latitudes, longitudes, times, travelers = latitudes[order], longitudes[order], times[order], travelers[order]
+    same_traveler = travelers[1:] == travelers[:-1]
+    traveler_distances = np.where(
+        same_traveler, haversine_km(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:]), 0.0
+    )
+    traveler_hours = np.where(
+        same_traveler & (traveler_distances < STATIONARY_RADIUS_KM), np.diff(times) * 24, 0.0
+    )
+    
+    traveler_ids, traveler_index, traveler_points = np.unique(travelers, return_inverse=True, return_counts=True)
+    size = len(traveler_ids)
+    stats['travelers'] = [
+        {
+            'traveler_id': int(traveler_id),
+            'traveler_name': names.get(int(traveler_id)),
+            'points': int(points),
+            'distance_km': round(float(distance), 3),
+            'stationary_hours': round(float(stationary), 2)
+        }
+        for traveler_id, points, distance, stationary in zip(
+            traveler_ids, traveler_points,
+            np.bincount(traveler_index[1:], weights=traveler_distances, minlength=size),
+            np.bincount(traveler_index[1:], weights=traveler_hours, minlength=size)
+        )
+    ]
+    
+    return stats
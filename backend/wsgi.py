@@ -0,0 +1,18 @@
+"""Production WSGI entry point
+
+Run with gunicorn (see gunicorn.conf.py):
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app the module is imported once in the master process, so the
+database is created and migrated before any worker is forked. .env is
+loaded before app is imported, since app reads its settings at import time.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app, init_database  # noqa: E402
+
+app = create_app()
+init_database(app)
@@ -71,7 +71,9 @@ sudo -u $DEPLOY_USER bash -c "
     cd $PROJECT_DIR
     
     # Copy new code
-    cp -r backend/app.py $DEPLOY_PATH/backend/
+    cp -r backend/app.py backend/serializers.py backend/trip_stats.py backend/wsgi.py backend/gunicorn.conf.py $DEPLOY_PATH/backend/
+    cp -r backend/routes $DEPLOY_PATH/backend/
+    cp -r backend/data $DEPLOY_PATH/backend/
     cp -r backend/requirements.txt $DEPLOY_PATH/backend/
     cp -r frontend/ $DEPLOY_PATH/
     
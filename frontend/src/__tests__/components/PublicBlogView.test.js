@@ -34,50 +34,44 @@ describe('PublicBlogView Component', () => {
     mockedAxios.get.mockReset();
     mockedAxios.post.mockReset();
     
-    // Mock all API calls that PublicBlogView makes
+    // The initial load is one bundle request
     mockedAxios.get.mockImplementation((url) => {
-      if (url.includes('/api/public/public-token') && !url.includes('/entries') && !url.includes('/calendar') && !url.includes('/content')) {
+      if (url.includes('/api/public/public-token/bundle')) {
         return Promise.resolve({
           data: {
             trip: {
-              id: 1,
-              name: 'European Adventure',
+              trip_name: 'European Adventure',
               description: 'Amazing journey',
               reactions_enabled: true
-            }
+            },
+            content: {
+              items: [
+                {
+                  id: 1,
+                  content_date: '2023-12-01',
+                  timestamp: '2023-12-01T18:30:00Z',
+                  generated_content: 'Amazing day in Paris!\n\nWe explored the beautiful streets of the City of Light.'
+                }
+              ],
+              next: null
+            },
+            entries: [
+              {
+                id: 1,
+                content: '# Day 1\nStarted our journey in Paris!',
+                traveler_name: 'John Doe',
+                timestamp: '2023-12-01T18:30:00Z',
+                latitude: 48.8566,
+                longitude: 2.3522,
+                content_type: 'text'
+              }
+            ],
+            calendar: {
+              '2023-12-01': 1
+            },
+            reactions: {}
           }
         });
-      } else if (url.includes('/api/public/public-token/entries')) {
-        return Promise.resolve({
-          data: [
-            {
-              id: 1,
-              content: '# Day 1\nStarted our journey in Paris!',
-              traveler_name: 'John Doe',
-              timestamp: '2023-12-01T18:30:00Z',
-              latitude: 48.8566,
-              longitude: 2.3522,
-              content_type: 'text'
-            }
-          ]
-        });
-      } else if (url.includes('/api/public/public-token/content/calendar')) {
-        return Promise.resolve({
-          data: {
-            '2023-12-01': 1
-          }
-        });
-      } else if (url.includes('/api/public/public-token/content') && !url.includes('/calendar')) {
-        return Promise.resolve({
-          data: [
-            {
-              id: 1,
-              content_date: '2023-12-01',
-              timestamp: '2023-12-01T18:30:00Z',
-              generated_content: 'Amazing day in Paris!\n\nWe explored the beautiful streets of the City of Light.'
-            }
-          ]
-        });
       }
       return Promise.reject(new Error('Unexpected API call: ' + url));
     });
@@ -255,4 +249,75 @@ describe('PublicBlogView Component', () => {
     // Should not show reaction buttons
     expect(screen.queryByText('👍')).not.toBeInTheDocument();
   });
-});
\ No newline at end of file
+
+  test('loads the blog and reaction counts in one request', async () => {
+    mockedAxios.get.mockImplementation((url) => {
+      if (url.includes('/api/public/public-token/bundle')) {
+        return Promise.resolve({
+          data: {
+            trip: { trip_name: 'European Adventure', reactions_enabled: true },
+            content: {
+              items: [{ id: 1, content_date: '2023-12-01', timestamp: '2023-12-01T18:30:00Z', generated_content: 'Amazing day in Paris!' }],
+              next: null
+            },
+            entries: [],
+            calendar: {},
+            reactions: { 1: { like: 5, applause: 0, support: 0, love: 8, insightful: 0, funny: 0 } }
+          }
+        });
+      }
+      return Promise.reject(new Error('Unexpected API call: ' + url));
+    });
+
+    renderWithProviders(<PublicBlogView />);
+
+    await waitFor(() => {
+      expect(screen.getByText('8')).toBeInTheDocument();
+    });
+    expect(screen.getByText('5')).toBeInTheDocument();
+
+    // No post requested its own counts
+    expect(mockedAxios.get).toHaveBeenCalledTimes(1);
+  });
+
+  test('loads the remaining content pages of long trips', async () => {
+    const piece = (id) => ({ id, content_date: '2023-12-01', timestamp: '2023-12-01T18:30:00Z', generated_content: `Post ${id}` });
+    mockedAxios.get.mockImplementation((url) => {
+      if (url.includes('/api/public/public-token/bundle')) {
+        return Promise.resolve({
+          data: {
+            trip: { trip_name: 'European Adventure', reactions_enabled: true },
+            content: { items: [piece(2)], next: 'cursor-1' },
+            entries: [],
+            calendar: {},
+            reactions: { 2: { like: 3, applause: 0, support: 0, love: 0, insightful: 0, funny: 0 } }
+          }
+        });
+      } else if (url.includes('/api/public/public-token/content') && url.includes('cursor=cursor-1')) {
+        return Promise.resolve({ data: { items: [piece(1)], next: null } });
+      } else if (url.endsWith('/api/public/public-token/reactions')) {
+        return Promise.resolve({
+          data: { reactions: {
+            1: { like: 0, applause: 0, support: 0, love: 7, insightful: 0, funny: 0 },
+            2: { like: 3, applause: 0, support: 0, love: 0, insightful: 0, funny: 0 }
+          } }
+        });
+      }
+      return Promise.reject(new Error('Unexpected API call: ' + url));
+    });
+
+    renderWithProviders(<PublicBlogView />);
+
+    await waitFor(() => {
+      expect(screen.getByText('Post 1')).toBeInTheDocument();
+    });
+    await waitFor(() => {
+      expect(screen.getByText('7')).toBeInTheDocument();
+    });
+    expect(screen.getByText('Post 2')).toBeInTheDocument();
+    expect(screen.getByText('3')).toBeInTheDocument();
+
+    const reactionCalls = mockedAxios.get.mock.calls.filter(([url]) => url.includes('/reactions'));
+    expect(reactionCalls).toHaveLength(1);
+  });
+});
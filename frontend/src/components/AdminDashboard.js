@@ -338,7 +338,7 @@ function AdminDashboard() {
                       <h4>{trip.name}</h4>
                       <p>{trip.description}</p>
                       <div className="trip-stats">
-                        {trip.traveler_count} travelers, {trip.entry_count} entries
+                        {trip.traveler_count} travelers, {trip.entry_count} entries, {((trip.storage_bytes || 0) / (1024 * 1024)).toFixed(1)}MB uploads
                       </div>
                       {regeneratingTrips.has(trip.id) && (
                         <div className="trip-processing">
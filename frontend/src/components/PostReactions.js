@@ -3,7 +3,7 @@ import axios from 'axios';
 import { getApiUrl } from '../config/api';
 import ReactionButton from './ReactionButton';
 
-const PostReactions = ({ token, contentId }) => {
+const PostReactions = ({ token, contentId, initialReactions }) => {
   const [reactions, setReactions] = useState({
     like: 0,
     applause: 0,
@@ -30,12 +30,17 @@ const PostReactions = ({ token, contentId }) => {
     }
   };
 
-  // Load reactions on component mount
+  // Load reactions on component mount, unless the parent already fetched them in bulk
+  // (a post missing from the bulk response, e.g. one added since, loads its own)
   useEffect(() => {
     const storedReaction = getUserReaction();
     setUserReaction(storedReaction);
-    loadReactions();
-  }, [contentId, token]);
+    if (initialReactions) {
+      setReactions(initialReactions);
+    } else {
+      loadReactions();
+    }
+  }, [contentId, token, initialReactions]);
 
   const loadReactions = async () => {
     try {
@@ -86,14 +91,12 @@ const PostReactions = ({ token, contentId }) => {
       setUserReaction(newUserReaction);
       setUserReactionInStorage(newUserReaction);
 
-      // Send request to backend
-      await axios.post(getApiUrl(`/api/public/${token}/reactions/${contentId}`), {
+      // Send request to backend; the response carries the actual counts
+      const response = await axios.post(getApiUrl(`/api/public/${token}/reactions/${contentId}`), {
         reaction_type: reactionType,
         action: action
       });
-
-      // Reload actual data to ensure consistency
-      await loadReactions();
+      setReactions(response.data.reactions);
 
     } catch (error) {
       console.error('Failed to update reaction:', error);
@@ -122,14 +125,14 @@ const PostReactions = ({ token, contentId }) => {
       }
 
       // Add new reaction
-      await axios.post(getApiUrl(`/api/public/${token}/reactions/${contentId}`), {
+      const response = await axios.post(getApiUrl(`/api/public/${token}/reactions/${contentId}`), {
         reaction_type: newReactionType,
         action: 'add'
       });
 
       setUserReaction(newReactionType);
       setUserReactionInStorage(newReactionType);
-      await loadReactions();
+      setReactions(response.data.reactions);
 
     } catch (error) {
       console.error('Failed to change reaction:', error);
@@ -64,6 +64,9 @@ function MapBoundsFitter({ entries }) {
   return null;
 }
 
+// Content pieces per bundle and content page request (the server maximum)
+const CONTENT_PAGE_SIZE = 500;
+
 function PublicBlogView() {
   const { token } = useParams();
   const [blog, setBlog] = useState(null);
@@ -82,15 +85,13 @@ function PublicBlogView() {
   const [showMiniMap, setShowMiniMap] = useState(false);
   const [isMapCollapsed, setIsMapCollapsed] = useState(true);
   const [isCalendarCollapsed, setIsCalendarCollapsed] = useState(true);
+  const [reactionCounts, setReactionCounts] = useState({});
+  const [reactionsLoaded, setReactionsLoaded] = useState(false);
 
   useEffect(() => {
-    loadBlogData();
-    loadEntries();
-    loadCalendarData();
-    loadContentPieces();
+    loadBundle();
   }, [token]);
 
-
   // Update filtered entries and content when entries or selected date changes
   useEffect(() => {
     if (selectedDate) {
@@ -118,55 +119,72 @@ function PublicBlogView() {
     }
   }, [entries, selectedDate, contentPieces]);
 
-  const loadBlogData = async () => {
-    try {
-      const response = await axios.get(getApiUrl(`/api/public/${token}`));
-      setBlog(response.data);
-    } catch (err) {
-      if (err.response?.status === 404) {
-        setError('Blog not found or not publicly accessible');
-      } else {
-        setError('Failed to load blog data');
-      }
-    }
-  };
-
-  const loadEntries = async () => {
+  // Trip, entries, calendar, content and reaction counts in one request
+  const loadBundle = async () => {
     try {
-      const response = await axios.get(getApiUrl(`/api/public/${token}/entries`));
-      const entriesData = response.data;
+      const response = await axios.get(getApiUrl(`/api/public/${token}/bundle?limit=${CONTENT_PAGE_SIZE}`));
+      const { trip, content, entries: entriesData, calendar, reactions } = response.data;
+      setBlog(trip);
       setEntries(entriesData);
+      setCalendarData(calendar);
+      setContentPieces(content.items);
       
       // Set map center to the first entry with location
       const entryWithLocation = entriesData.find(entry => entry.latitude && entry.longitude);
       if (entryWithLocation) {
         setMapCenter([entryWithLocation.latitude, entryWithLocation.longitude]);
       }
+      
+      if (content.next) {
+        // Long trips: the bundle holds the newest page, fetch the rest and then all counts
+        setReactionsLoaded(false);
+        loadRemainingContent(content.items, content.next).then(() => {
+          if (trip.reactions_enabled) {
+            loadReactionCounts();
+          }
+        });
+      } else {
+        setReactionCounts(reactions || {});
+        setReactionsLoaded(true);
+      }
     } catch (err) {
-      setError('Failed to load entries');
+      if (err.response?.status === 404) {
+        setError('Blog not found or not publicly accessible');
+      } else {
+        setError('Failed to load blog data');
+      }
     } finally {
       setLoading(false);
     }
   };
 
-  const loadCalendarData = async () => {
+  const loadRemainingContent = async (items, cursor) => {
+    let loaded = items;
     try {
-      const response = await axios.get(getApiUrl(`/api/public/${token}/content/calendar`));
-      setCalendarData(response.data);
+      while (cursor) {
+        const response = await axios.get(
+          getApiUrl(`/api/public/${token}/content?limit=${CONTENT_PAGE_SIZE}&cursor=${cursor}`)
+        );
+        loaded = [...loaded, ...response.data.items];
+        cursor = response.data.next;
+      }
     } catch (err) {
-      console.error('Failed to load calendar data:', err);
-      // Don't show error to user - calendar is optional
+      console.error('Failed to load content pieces:', err);
+      // Keep the pages loaded so far
     }
+    setContentPieces(loaded);
   };
 
-  const loadContentPieces = async () => {
+  const loadReactionCounts = async () => {
+    setReactionsLoaded(false);
     try {
-      const response = await axios.get(getApiUrl(`/api/public/${token}/content`));
-      setContentPieces(response.data);
+      const response = await axios.get(getApiUrl(`/api/public/${token}/reactions`));
+      setReactionCounts(response.data.reactions || {});
     } catch (err) {
-      console.error('Failed to load content pieces:', err);
-      // Fallback to empty array - we'll use the old blog_content method
-      setContentPieces([]);
+      console.error('Failed to load reactions:', err);
+      // PostReactions falls back to loading its own counts
+    } finally {
+      setReactionsLoaded(true);
     }
   };
 
@@ -341,13 +359,15 @@ function PublicBlogView() {
         </div>
       );
 
-      // Add reactions component for this piece (only if enabled)
-      if (blog?.reactions_enabled) {
+      // Add reactions component for this piece (only if enabled), once the bulk counts are in
+      // so that posts do not each request their own counts while it is still loading
+      if (blog?.reactions_enabled && reactionsLoaded) {
         elements.push(
           <PostReactions
             key={`reactions-${piece.id}`}
             token={token}
             contentId={piece.id}
+            initialReactions={reactionCounts[piece.id]}
           />
         );
       }
@@ -623,13 +643,7 @@ function PublicBlogView() {
     const scrollPosition = window.scrollY;
     
     try {
-      // Load all data in parallel
-      await Promise.all([
-        loadBlogData(),
-        loadEntries(),
-        loadCalendarData(),
-        loadContentPieces()
-      ]);
+      await loadBundle();
       
       // Show success feedback
       setShowRefreshFeedback(true);